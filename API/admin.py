@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Plant, UserPlant, Site, UserPlantTask, TaskToCheck
+from .models import Plant, UserPlant, Site, UserPlantTask, TaskToCheck, TaskHistory
 
 # Register your models here.
 
@@ -35,8 +35,20 @@ class UserPlantTaskAdmin(admin.ModelAdmin):
 class TaskToCheckAdmin(admin.ModelAdmin):
     list_display = ('id','user_plant_task', 'due_date', 'is_completed', 'completed_at')  # Display these fields in the list
     search_fields = ('user_plant_task__name', 'user_plant_task__user_plant__nickname', 'user_plant_task__user_plant__user__username')  # Searchable fields
-    list_filter = ('is_completed', 'user_plant_task__user_plant__user')  # Filter tasks by completion status and user
+    list_filter = ('is_completed', 'owner')  # Filter tasks by completion status and user
     list_editable = ('is_completed',)  # Allow marking tasks as completed from the list view
 
 
 
+
+
+@admin.register(TaskHistory)
+class TaskHistoryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'owner', 'user_plant_task', 'task_type', 'completed_at')
+    list_filter = ('task_type',)
+    # Append-only: rows are written by the archive_tasks command
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'API'
+
+    def ready(self):
+        # Register the cache invalidation handlers
+        from . import signals  # noqa: F401
+        # Deployment checks of the shared cache
+        from . import checks  # noqa: F401
@@ -0,0 +1,104 @@
+from asgiref.sync import sync_to_async
+from django.utils.dateparse import parse_date
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+from plantApp.renderers import JsonResponse
+from .calendar_cache import aget_homepage_feed
+from .feed import plant_task_checks, partition_task_checks
+from .history import acompleted_task_details
+from .models import UserPlant, UserPlantTask
+from .serializers import UserPlantSerializer
+
+
+# Async (ASGI) versions of the read-heavy task endpoints. They return the same
+# payloads as the APIView versions in views.py, but wait on the database with
+# the async ORM instead of holding a worker thread.
+
+
+def api_response(data, status=200):
+    # Same encoding as the sync views and DRF's Response
+    return JsonResponse(data, status=status, safe=False)
+
+
+async def authenticate(request):
+    """Run the configured DRF authenticators (token, basic) and return the user, or None."""
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        user_auth = await sync_to_async(authentication_class().authenticate)(request)
+        if user_auth is not None:
+            return user_auth[0]
+    return None
+
+
+def not_authenticated(request, detail):
+    # 401 with the WWW-Authenticate challenge of the first authenticator, as DRF sends it
+    response = api_response({'detail': detail}, status=401)
+    response['WWW-Authenticate'] = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]().authenticate_header(request)
+    return response
+
+
+class AsyncAPIView(View):
+    """Async view that requires an authenticated user, like IsAuthenticated on the APIViews."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            user = await authenticate(request)
+        except exceptions.AuthenticationFailed as e:
+            return not_authenticated(request, str(e.detail))
+        if user is None:
+            return not_authenticated(request, 'Authentication credentials were not provided.')
+
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncHomepageTasksView(AsyncAPIView):
+    async def get(self, request):
+        return api_response(await aget_homepage_feed(request.user))
+
+
+class AsyncUserPlantDetailView(AsyncAPIView):
+    async def get(self, request, userPlant_id):
+        try:
+            user_plant = await UserPlant.objects.select_related('plant', 'site').aget(pk=userPlant_id, user=request.user)
+        except UserPlant.DoesNotExist:
+            return api_response({'error': 'Not found'}, status=404)
+
+        user_plant_data = await sync_to_async(
+            lambda: UserPlantSerializer(user_plant, context={'request': request}).data
+        )()
+
+        task_data = [
+            {
+                'name': task.name,
+                'frequency': f"every {task.interval} {task.unit}(s)",
+                'interval': task.interval,
+                'unit': task.unit
+            }
+            async for task in UserPlantTask.objects.filter(user_plant=user_plant)
+        ]
+
+        # Incomplete checks with their parent task (one query), split by due date in one pass
+        task_checks = partition_task_checks([check async for check in plant_task_checks(user_plant)])
+
+        return api_response({
+            'user_plant': user_plant_data,
+            'tasks': task_data,
+            'task_checks': task_checks,
+        })
+
+
+class AsyncCompletedTasksView(AsyncAPIView):
+    async def get(self, request, date_str):
+        # Parse the date from URL parameter
+        try:
+            date = parse_date(date_str)
+        except ValueError:
+            date = None
+        if not date:
+            return api_response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
+
+        # Tasks completed on the specified date, recent or archived (two queries)
+        task_data = await acompleted_task_details(request.user, date, date)
+
+        return api_response(task_data)
@@ -0,0 +1,273 @@
+"""
+Versioned offline bundles of the Plant and Pet catalogs.
+
+export_bundle() writes the whole catalog (rows as the plant/pet detail
+endpoints return them, with relative media URLs) to a gzipped JSON
+snapshot, numbered 1, 2, 3... A new version is only written when the
+content changed. The deltas from the previous versions still kept to the
+new one are computed at the same time, so clients are served files that
+were built once per catalog change:
+
+    catalog-<version>.json.gz                  {"type": "full", "version", "plants": [...], "pets": [...]}
+    catalog-<since>-<version>.delta.json.gz    {"type": "delta", "since", "version",
+                                                "plants": {"upsert": [...], "delete": [ids]}, "pets": {...}}
+
+manifest.json lists the versions kept (CATALOG_BUNDLE_KEEP), newest last.
+
+Exports run on a background worker, queued by the catalog_changed signal
+(and by the bundle endpoint when it finds the last export out of date), or
+by `manage.py export_catalog_bundle`. Requests are only served files
+already written.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.timezone import now
+from plantApp.renderers import dumps
+from .catalog import catalog_cache, get_catalog_version
+
+
+# Versions (and deltas to the newest one) kept on disk. Clients older than that get the full bundle.
+CATALOG_BUNDLE_KEEP = getattr(settings, 'CATALOG_BUNDLE_KEEP', 10)
+
+# (catalog version of API.catalog, bundle version) of the last check of the bundle
+BUNDLE_SOURCE_KEY = 'catalog-bundle-source'
+
+# Held while a bundle is exported, so concurrent requests don't export (and
+# number) the same version twice. Expires on its own if the exporter dies.
+BUNDLE_EXPORT_LOCK_KEY = 'catalog-bundle-export-lock'
+BUNDLE_EXPORT_LOCK_TIMEOUT = 120  # seconds
+
+MANIFEST_NAME = 'manifest.json'
+
+# Seconds a client is told to wait (Retry-After) while the first bundle is being exported
+BUNDLE_RETRY_AFTER = 10
+
+logger = logging.getLogger(__name__)
+
+# One background exporter: a burst of catalog writes queues a single export
+# (it reads the catalog when it starts, so it covers the writes made until then)
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='catalog-bundle')
+_export_queued = threading.Lock()
+
+
+class BundleNotReady(Exception):
+    """No bundle has been written yet (the first export is queued)."""
+
+
+def bundle_dir():
+    return str(getattr(settings, 'CATALOG_BUNDLE_DIR', settings.BASE_DIR / 'catalog_bundles'))
+
+
+def bundle_name(version):
+    return f"catalog-{version}.json.gz"
+
+
+def delta_name(since, version):
+    return f"catalog-{since}-{version}.delta.json.gz"
+
+
+def read_manifest():
+    try:
+        with open(os.path.join(bundle_dir(), MANIFEST_NAME)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'versions': []}
+
+
+def _write(name, content):
+    """Write a file of the bundle directory atomically (readers never see it half written)."""
+    directory = bundle_dir()
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    os.replace(temporary, os.path.join(directory, name))
+
+
+def _compress(data):
+    return gzip.compress(dumps(data), compresslevel=9, mtime=0)
+
+
+def _read(name):
+    with gzip.open(os.path.join(bundle_dir(), name)) as f:
+        return json.load(f)
+
+
+def catalog_rows():
+    """The serialized plants and pets, ordered by id."""
+    from API_pets.fast_serializers import PetFastSerializer
+    from API_pets.models import Pet
+    from .fast_serializers import PlantFastSerializer
+    from .models import Plant
+
+    rows = {}
+    for key, serializer, queryset in (
+        ('plants', PlantFastSerializer(), Plant.objects.order_by('pk')),
+        ('pets', PetFastSerializer(), Pet.objects.order_by('pk')),
+    ):
+        rows[key] = serializer.data(serializer.values(queryset).iterator(chunk_size=2000))
+    return rows
+
+
+def catalog_delta(old, new):
+    """{'upsert': [rows new or changed], 'delete': [ids]} turning the `old` rows into the `new` ones."""
+    old_rows = {row['id']: row for row in old}
+    new_ids = {row['id'] for row in new}
+    return {
+        'upsert': [row for row in new if old_rows.get(row['id']) != row],
+        'delete': sorted(set(old_rows) - new_ids),
+    }
+
+
+def export_bundle(keep=None):
+    """
+    Write a new bundle version if the catalog changed since the newest one.
+    Returns (version, created).
+    """
+    keep = keep or CATALOG_BUNDLE_KEEP
+    os.makedirs(bundle_dir(), exist_ok=True)
+    manifest = read_manifest()
+    versions = manifest['versions']
+
+    rows = catalog_rows()
+    digest = hashlib.sha256(dumps(rows)).hexdigest()
+    if versions and versions[-1]['sha256'] == digest and os.path.exists(
+            os.path.join(bundle_dir(), bundle_name(versions[-1]['version']))):
+        return versions[-1]['version'], False
+
+    version = versions[-1]['version'] + 1 if versions else 1
+    _write(bundle_name(version), _compress({
+        'type': 'full', 'version': version, 'created_at': now(), **rows,
+    }))
+
+    # Deltas from every version kept (their snapshots are still on disk)
+    kept = versions[-(keep - 1):] if keep > 1 else []
+    for entry in kept:
+        old = _read(bundle_name(entry['version']))
+        _write(delta_name(entry['version'], version), _compress({
+            'type': 'delta', 'since': entry['version'], 'version': version,
+            **{key: catalog_delta(old[key], rows[key]) for key in rows},
+        }))
+
+    manifest['versions'] = kept + [{
+        'version': version, 'sha256': digest, 'created_at': now().isoformat(),
+        'plants': len(rows['plants']), 'pets': len(rows['pets']),
+    }]
+    _write(MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+    _prune({entry['version'] for entry in manifest['versions']}, version)
+    return version, True
+
+
+def _prune(kept_versions, version):
+    """Delete the snapshots and deltas no longer listed in the manifest."""
+    keep_names = {bundle_name(v) for v in kept_versions} | {delta_name(v, version) for v in kept_versions}
+    for name in os.listdir(bundle_dir()):
+        if name.startswith('catalog-') and name not in keep_names:
+            os.remove(os.path.join(bundle_dir(), name))
+
+
+def newest_bundle_version():
+    """The newest version written, or None when there is none yet."""
+    versions = read_manifest()['versions']
+    if versions and os.path.exists(os.path.join(bundle_dir(), bundle_name(versions[-1]['version']))):
+        return versions[-1]['version']
+    return None
+
+
+def refresh_bundle(keep=None):
+    """
+    Export the bundle (see export_bundle) and record the catalog version it
+    covers. Only one exporter runs at a time, across processes: this waits
+    for the one holding the lock. Returns (version, created).
+    """
+    # Read before the rows: a write made during the export leaves the bundle out of date
+    catalog_version = get_catalog_version()
+    while not catalog_cache().add(BUNDLE_EXPORT_LOCK_KEY, True, BUNDLE_EXPORT_LOCK_TIMEOUT):
+        time.sleep(0.5)
+    try:
+        version, created = export_bundle(keep=keep)
+        catalog_cache().set(BUNDLE_SOURCE_KEY, (catalog_version, version), None)
+    finally:
+        catalog_cache().delete(BUNDLE_EXPORT_LOCK_KEY)
+    return version, created
+
+
+def _export_in_background():
+    # Released first: writes made from now on queue the next export
+    _export_queued.release()
+    try:
+        refresh_bundle()
+    except Exception:
+        logger.exception("Could not export the catalog bundle")
+    finally:
+        connection.close()
+
+
+def _queue_export():
+    if _export_queued.acquire(blocking=False):
+        _executor.submit(_export_in_background)
+
+
+def schedule_export():
+    """Queue a background export once the current transaction commits (unless one is queued already)."""
+    if getattr(settings, 'CATALOG_BUNDLE_BACKGROUND_EXPORT', True):
+        transaction.on_commit(_queue_export)
+
+
+def current_bundle_version():
+    """
+    Newest bundle version written, or None when there is none yet. When the
+    catalog changed since the last export (or its files are gone), an export
+    is queued and the newest bundle written so far is served meanwhile.
+    """
+    checked = catalog_cache().get(BUNDLE_SOURCE_KEY)
+    if checked and checked[0] == get_catalog_version() and os.path.exists(
+            os.path.join(bundle_dir(), bundle_name(checked[1]))):
+        return checked[1]
+    schedule_export()
+    return newest_bundle_version()
+
+
+def bundle_file(since=None):
+    """
+    (path, version, is_delta) of what a client holding version `since` (None: nothing)
+    should download. None when it is already up to date. Raises BundleNotReady
+    when no bundle has been written yet.
+    """
+    version = current_bundle_version()
+    if version is None:
+        raise BundleNotReady()
+    if since == version:
+        return None
+    if since is not None:
+        delta_path = os.path.join(bundle_dir(), delta_name(since, version))
+        if os.path.exists(delta_path):
+            return delta_path, version, True
+    return os.path.join(bundle_dir(), bundle_name(version)), version, False
+
+
+def open_bundle_file(since=None):
+    """
+    bundle_file(), with the file opened for reading. A background export can
+    prune it between the lookup and the open: it is then looked up again, once
+    (an open file stays readable after it is pruned). Raises
+    FileNotFoundError if it was pruned again.
+    """
+    for attempt in range(2):
+        found = bundle_file(since)
+        if found is None:
+            return None
+        path, version, is_delta = found
+        try:
+            return open(path, 'rb'), version, is_delta
+        except FileNotFoundError:
+            if attempt:
+                raise
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.timezone import timedelta
+from .feed import feed_window, feed_tasks, afeed_tasks, bucket_feed
+
+
+# Extra days of tasks kept in the cached entry beyond the 30-day window, so the
+# calendar can roll over at midnight by re-bucketing instead of re-querying
+CALENDAR_CACHE_SLACK_DAYS = getattr(settings, 'CALENDAR_CACHE_SLACK_DAYS', 7)
+
+# How long an untouched calendar stays cached (seconds)
+CALENDAR_CACHE_TIMEOUT = getattr(settings, 'CALENDAR_CACHE_TIMEOUT', 60 * 60 * 24)
+
+# Which entry of settings.CACHES holds the calendars
+CALENDAR_CACHE_ALIAS = getattr(settings, 'CALENDAR_CACHE_ALIAS', 'default')
+
+
+def _cache():
+    return caches[CALENDAR_CACHE_ALIAS]
+
+
+def calendar_cache_key(user_id):
+    return f"homepage-calendar:{user_id}"
+
+
+def get_homepage_feed(user, today=None):
+    """
+    Return the homepage calendar of a user, served from the cache when possible.
+
+    The cached entry holds the user's serialized tasks up to a horizon a few
+    days past the current window. "overdue" and "today" are recomputed from
+    those tasks on every read, so a new day only triggers a rebuild once the
+    window moves past the horizon.
+    """
+    today, end_date = feed_window(today)
+    key = calendar_cache_key(user.pk)
+    cache = _cache()
+
+    entry = cache.get(key)
+    if entry is None or entry['horizon'] < end_date:
+        horizon = end_date + timedelta(days=CALENDAR_CACHE_SLACK_DAYS)
+        entry = {'horizon': horizon, 'tasks': feed_tasks(user, horizon)}
+        cache.set(key, entry, CALENDAR_CACHE_TIMEOUT)
+
+    return bucket_feed(entry['tasks'], today, end_date)
+
+
+async def aget_homepage_feed(user, today=None):
+    """Async version of get_homepage_feed."""
+    today, end_date = feed_window(today)
+    key = calendar_cache_key(user.pk)
+    cache = _cache()
+
+    entry = await cache.aget(key)
+    if entry is None or entry['horizon'] < end_date:
+        horizon = end_date + timedelta(days=CALENDAR_CACHE_SLACK_DAYS)
+        entry = {'horizon': horizon, 'tasks': await afeed_tasks(user, horizon)}
+        await cache.aset(key, entry, CALENDAR_CACHE_TIMEOUT)
+
+    return bucket_feed(entry['tasks'], today, end_date)
+
+
+def invalidate_calendar(user_id):
+    """Drop the cached calendar of a user after one of their tasks, plants or sites changed."""
+    if user_id is not None:
+        _cache().delete(calendar_cache_key(user_id))
@@ -0,0 +1,74 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.dispatch import Signal
+
+
+# Which entry of settings.CACHES holds the version counters (and the bundle
+# state of API.bundles). Must be shared by all the workers.
+CATALOG_CACHE_ALIAS = getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')
+
+# Cache keys of the version counters behind the catalog ETags
+CATALOG_VERSION_KEY = 'catalog-version'
+USER_PETS_VERSION_KEY = 'user-pets-version:{user_id}'
+
+# Sent on every catalog version bump (Plant/Pet writes, imports, new image derivatives)
+catalog_changed = Signal()
+
+
+def catalog_cache():
+    return caches[CATALOG_CACHE_ALIAS]
+
+
+def _get_version(key):
+    cache = catalog_cache()
+    version = cache.get(key)
+    if version is None:
+        # Unknown (first use or evicted): start a new version so stale ETags never match
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    catalog_cache().set(key, time.time_ns(), None)
+
+
+def get_catalog_version():
+    """Version of the Plant/Pet catalog, changed on every Plant or Pet write."""
+    return _get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    _bump_version(CATALOG_VERSION_KEY)
+    catalog_changed.send(sender=None)
+
+
+def get_user_pets_version(user_id):
+    """Version of a user's pet collection, changed on every write to their UserPets."""
+    return _get_version(USER_PETS_VERSION_KEY.format(user_id=user_id))
+
+
+def bump_user_pets_version(user_id):
+    _bump_version(USER_PETS_VERSION_KEY.format(user_id=user_id))
+
+
+def _etag(*parts):
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+# ETag callbacks for django.views.decorators.http.condition. They only read the
+# version counters, so a 304 costs no catalog query. No Last-Modified: HTTP dates
+# are whole seconds, two writes in the same second would answer a wrong 304.
+
+def catalog_etag(request, *args, **kwargs):
+    return _etag('catalog', get_catalog_version(), request.get_host(), request.get_full_path())
+
+
+def user_pets_etag(request, *args, **kwargs):
+    user_id = request.user.pk
+    return _etag(
+        'user-pets', get_catalog_version(), user_id, get_user_pets_version(user_id),
+        request.get_host(), request.get_full_path()
+    )
@@ -0,0 +1,265 @@
+"""
+Bulk import of the Plant and Pet catalogs from CSV or JSON Lines files.
+
+The file is streamed through a pipeline of generators (rows -> chunks ->
+validated model instances -> upserted batches), so memory stays bounded by
+the chunk size whatever the size of the file.
+
+Rows are matched to existing catalog entries by a natural key
+(CATALOG_MODELS), resolved with one query per chunk. New entries are
+inserted and existing ones updated in the same
+bulk_create(update_conflicts=True) statement, on the primary key. Only the
+columns present in the file are updated: a file may hold just the key and
+the columns to change. New entries need every required column.
+
+Images named in an `image` column are read from a local directory, stored
+(content-addressed) and given their derivatives by a pool of worker threads.
+"""
+import copy
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import reset_queries, transaction
+from django.db.models import Q
+from .catalog import bump_catalog_version
+from .images import generate_derivatives
+from .storage import release
+
+
+# Importable catalogs: model and the columns identifying an entry
+CATALOG_MODELS = {
+    'plant': ('API.Plant', ('scientific_name',)),
+    'pet': ('API_pets.Pet', ('species_name', 'breed_name')),
+}
+
+
+class CatalogImportError(Exception):
+    """The file can't be imported at all (unknown format, missing or unknown columns...)."""
+
+
+class ImportStats:
+    """Counters of an import, and the first `max_errors` errors as (line number, message)."""
+
+    def __init__(self, max_errors=20):
+        self.read = 0
+        self.created = 0
+        self.updated = 0
+        self.invalid = 0
+        self.images = 0
+        self.image_errors = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def error(self, line, message, counter='invalid'):
+        setattr(self, counter, getattr(self, counter) + 1)
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, message))
+
+
+def read_rows(stream, file_format):
+    """Yield (line number, row dict) from a CSV (with a header) or JSON Lines stream."""
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == 'jsonl':
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                row = e
+            yield line_number, row
+    else:
+        raise CatalogImportError(f"Unknown format '{file_format}' (csv or jsonl).")
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class CatalogImporter:
+    """
+    Import one catalog file into `catalog` ('plant' or 'pet').
+
+        importer = CatalogImporter('plant', image_dir='photos/')
+        with open('plants.csv', newline='') as f:
+            for stats in importer.run(f, 'csv'):
+                print(stats.read)   # After every chunk
+
+    With `dry_run`, rows are only validated.
+    """
+
+    def __init__(self, catalog, image_dir=None, chunk_size=1000, workers=4, dry_run=False, max_errors=20):
+        if catalog not in CATALOG_MODELS:
+            raise CatalogImportError(f"Unknown catalog '{catalog}' ({', '.join(CATALOG_MODELS)}).")
+        model_label, self.key_fields = CATALOG_MODELS[catalog]
+        self.model = apps.get_model(model_label)
+        self.image_dir = os.path.realpath(image_dir) if image_dir else None
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.dry_run = dry_run
+        self.stats = ImportStats(max_errors=max_errors)
+
+        self.fields = {
+            f.name: f for f in self.model._meta.concrete_fields
+            if not f.primary_key and not f.is_relation
+        }
+        self.image_field = self.fields.get('image')
+
+    def check_columns(self, columns):
+        """Fields set from the file (image excluded, it is handled separately)."""
+        unknown = set(columns) - set(self.fields)
+        if unknown:
+            raise CatalogImportError(f"Unknown column(s) for {self.model.__name__}: {', '.join(sorted(unknown))}.")
+        missing = set(self.key_fields) - set(columns)
+        if missing:
+            raise CatalogImportError(f"Missing key column(s): {', '.join(sorted(missing))}.")
+        return [name for name in self.fields if name in columns and name != 'image']
+
+    def run(self, stream, file_format):
+        """Import the rows of `stream`, yielding the running stats after every chunk."""
+        self.columns = None
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='catalog-images') as executor:
+            self.executor = executor
+            for chunk in chunked(read_rows(stream, file_format), self.chunk_size):
+                instances = self.validate_chunk(chunk)
+                if instances and not self.dry_run:
+                    self.save_chunk(instances)
+                # With DEBUG on, Django keeps the SQL of every query (big bulk inserts here)
+                reset_queries()
+                yield self.stats
+
+        if self.stats.created or self.stats.updated:
+            # bulk_create sends no post_save: refresh the catalog ETags by hand
+            bump_catalog_version()
+
+    def validate_chunk(self, chunk):
+        """
+        Turn a chunk of (line, row) into unsaved model instances, keyed (deduplicated) by natural key.
+        Rows matching an entry are applied onto it and only their columns are validated.
+        """
+        rows = []
+        for line, row in chunk:
+            self.stats.read += 1
+            if not isinstance(row, dict):
+                self.stats.error(line, f"Not a JSON object: {row}")
+                continue
+            if self.columns is None:
+                self.columns = self.check_columns(row)
+                self.update_fields = list(self.columns)
+                self.with_images = bool(self.image_dir and self.image_field and 'image' in row)
+                if self.with_images:
+                    self.update_fields.append('image')
+                self.absent_fields = [name for name in self.fields if name not in self.columns]
+
+            values = {}
+            for name in self.columns:
+                value = row.get(name)
+                if isinstance(value, str):
+                    value = value.strip()
+                if value in ('', None) and self.fields[name].null:
+                    value = None
+                values[name] = '' if value is None and not self.fields[name].null else value
+            rows.append((line, row, values))
+
+        existing = self.existing([tuple(values[name] for name in self.key_fields) for _, _, values in rows])
+        instances = {}
+        for line, row, values in rows:
+            match = existing.get(tuple(values[name] for name in self.key_fields))
+            if match:
+                instance = copy.copy(match)
+                for name, value in values.items():
+                    setattr(instance, name, value)
+                exclude = self.absent_fields
+            else:
+                instance = self.model(**values)
+                exclude = ['image']
+            try:
+                instance.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+            except ValidationError as e:
+                self.stats.error(line, '; '.join(f"{name}: {' '.join(messages)}" for name, messages in e.message_dict.items()))
+                continue
+
+            instance._import_line = line
+            instance._import_image = row.get('image') if self.with_images else None
+            instance._import_existing = match is not None
+            instance._import_previous_image = match.image.name if match and match.image else None
+            # The last row wins when a key appears twice in the chunk
+            instances[self.key(instance)] = instance
+        return list(instances.values())
+
+    def existing(self, keys):
+        """{natural key: instance} of the catalog entries with these keys, in one query."""
+        if not keys:
+            return {}
+        # One IN list per key column rather than one OR'd condition per key, which
+        # SQLite can't parse past ~1000 terms. The candidates (a superset of the
+        # keys for multi-column keys) are matched in Python.
+        wanted = set(keys)
+        condition = Q(**{
+            f'{name}__in': list({key[position] for key in wanted})
+            for position, name in enumerate(self.key_fields)
+        })
+        existing = {}
+        for instance in self.model._default_manager.filter(condition).order_by('-pk'):
+            key = self.key(instance)
+            if key in wanted:
+                # Existing duplicates: the oldest entry is the one kept up to date
+                existing[key] = instance
+        return existing
+
+    def store_image(self, filename):
+        """Copy an image of the image directory into the storage. Runs in a worker thread."""
+        path = os.path.realpath(os.path.join(self.image_dir, filename))
+        if not path.startswith(self.image_dir + os.sep):
+            raise ValueError(f"{filename} is outside the image directory")
+        storage = self.image_field.storage
+        with open(path, 'rb') as f:
+            name = storage.save(self.image_field.generate_filename(None, os.path.basename(path)), File(f))
+        generate_derivatives(name, storage)
+        return name
+
+    def attach_images(self, instances):
+        filenames = {instance._import_image for instance in instances if instance._import_image}
+        futures = {filename: self.executor.submit(self.store_image, filename) for filename in filenames}
+        for instance in instances:
+            # Rows without a (valid) image keep the one they have (copied from the entry)
+            if not instance._import_image:
+                continue
+            try:
+                instance.image = futures[instance._import_image].result()
+                self.stats.images += 1
+            except (OSError, ValueError) as e:
+                self.stats.error(instance._import_line, f"image: {e}", counter='image_errors')
+
+    def key(self, instance):
+        return tuple(getattr(instance, name) for name in self.key_fields)
+
+    def save_chunk(self, instances):
+        if self.with_images:
+            self.attach_images(instances)
+        for instance in instances:
+            if instance._import_existing:
+                self.stats.updated += 1
+            else:
+                self.stats.created += 1
+
+        with transaction.atomic():
+            self.model._default_manager.bulk_create(
+                instances, update_conflicts=True, unique_fields=['pk'], update_fields=self.update_fields,
+            )
+
+        # bulk_create sends no post_save: release the images replaced by hand
+        for instance in instances:
+            previous = instance._import_previous_image
+            if previous and previous != (instance.image.name if instance.image else None):
+                release(previous)
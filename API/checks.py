@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+# Per-process backends: each worker would keep its own version counters and calendars
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    from .calendar_cache import CALENDAR_CACHE_ALIAS
+    from .catalog import CATALOG_CACHE_ALIAS
+
+    # One warning per cache, however many settings point at it
+    settings_by_alias = {}
+    for setting, alias in (('CATALOG_CACHE_ALIAS', CATALOG_CACHE_ALIAS), ('CALENDAR_CACHE_ALIAS', CALENDAR_CACHE_ALIAS)):
+        settings_by_alias.setdefault(alias, []).append(setting)
+
+    warnings = []
+    for alias, names in settings_by_alias.items():
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend in PROCESS_LOCAL_CACHES:
+            warnings.append(Warning(
+                f"The {alias!r} cache ({', '.join(names)}) uses {backend.rsplit('.', 1)[-1]}, which isn't shared "
+                "between worker processes: catalog ETags, bundle exports and homepage calendars go stale across workers.",
+                hint="Point it at a shared backend (Redis or Memcached).",
+                id='API.W001',
+            ))
+    return warnings
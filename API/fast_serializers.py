@@ -0,0 +1,236 @@
+"""
+Read-only serializers for the hot list endpoints.
+
+A DRF ModelSerializer builds and walks a tree of field objects for every
+row, and every image URL goes through request.build_absolute_uri(). The
+FastSerializer classes here produce the same output from `.values()` rows
+instead: the field plan (output keys, columns, converters) is compiled once
+from the DRF serializer they mirror, and the absolute media URL prefix is
+worked out once per request. Which image derivatives exist is read from
+their record (images.generated_derivatives) once per batch of rows.
+
+    serializer = PlantFastSerializer(request)
+    data = serializer.data(serializer.values(Plant.objects.all()))
+
+They only read. Writes, and anything not listed here, keep using the DRF
+serializers, which stay the reference for the output.
+"""
+import functools
+import itertools
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils.encoding import filepath_to_uri
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+from .images import IMAGE_DERIVATIVES, derivative_name, derivative_storage, generated_derivatives
+from .models import Plant
+from .serializers import PlantSerializer, SiteSerializer, UserPlantSerializer
+
+
+# DRF fields whose to_representation() returns database values unchanged
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.ChoiceField, serializers.IntegerField, serializers.BooleanField)
+
+
+class MediaURLs:
+    """
+    URLs of the files of one storage, as storage.url() followed by
+    request.build_absolute_uri() returns them (or storage.url() alone
+    without a request), with the absolute prefix computed once.
+    """
+
+    def __init__(self, storage, request=None):
+        self.storage = storage
+        self.request = request
+        base_url = getattr(storage, 'base_url', None)
+        self.prefix = None
+        if base_url:
+            self.prefix = request.build_absolute_uri(base_url) if request else base_url
+
+    def url(self, name):
+        if not name:
+            return None
+        path = filepath_to_uri(name).lstrip('/')
+        # Paths with dot segments (which urljoin() would resolve) take the slow path
+        if self.prefix is None or '/.' in '/' + path:
+            url = self.storage.url(name)
+            return self.request.build_absolute_uri(url) if self.request else url
+        return self.prefix + path
+
+
+class FastSerializer:
+    """
+    Serialize `.values()` rows the way `serializer_class` serializes model instances.
+
+    Model fields are read from their column and converted like DRF does.
+    Other fields (SerializerMethodField, properties) need a `get_<name>(row)`
+    method, reading the columns listed in `method_columns`. Nested
+    serializers map to the FastSerializer in `nested`, which reads the
+    related columns (`<field>__<column>`) of the same row. Columns holding
+    images whose derivatives are listed go in `derivative_columns`.
+    """
+    serializer_class = None
+    nested = {}
+    method_columns = ()
+    derivative_columns = ()
+    # Rows whose image derivatives are looked up at once
+    batch_size = 500
+
+    def __init__(self, request=None, prefix='', media=None, derivatives=None):
+        self.request = request
+        self.prefix = prefix
+        # MediaURLs by (storage, absolute), shared with the nested serializers
+        self.media = {} if media is None else media
+        # Derivatives generated by image name, for the current batch of rows (also shared)
+        self.derivatives = {} if derivatives is None else derivatives
+        self.pk_column = prefix + self.model()._meta.pk.attname
+
+        # (output key, column or None, converter or method)
+        self.plan = []
+        self.nested_serializers = []
+        for name, kind, source, extra in self.field_plan():
+            if kind == 'method':
+                self.plan.append((name, None, getattr(self, f'get_{name}')))
+            elif kind == 'nested':
+                nested = self.nested[name](request, f'{prefix}{name}__', self.media, self.derivatives)
+                self.nested_serializers.append(nested)
+                self.plan.append((name, None, nested.to_representation))
+            elif kind == 'file':
+                self.plan.append((name, prefix + source, self.media_urls(extra).url))
+            else:
+                self.plan.append((name, prefix + source, extra))
+
+    @classmethod
+    def model(cls):
+        return cls.serializer_class.Meta.model
+
+    @classmethod
+    @functools.cache
+    def field_plan(cls):
+        """
+        Compile the readable fields of serializer_class into (name, kind, column, extra)
+        entries, `extra` being the converter of a value or the storage of a file.
+        """
+        model = cls.model()
+        plan = []
+        for name, field in cls.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if hasattr(cls, f'get_{name}'):
+                plan.append((name, 'method', None, None))
+                continue
+            if isinstance(field, serializers.BaseSerializer):
+                if name not in cls.nested:
+                    raise ImproperlyConfigured(f"{cls.__name__}.nested has no serializer for '{name}'.")
+                plan.append((name, 'nested', None, None))
+                continue
+
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} needs a get_{name}() method: '{field.source}' is not a column of {model.__name__}."
+                )
+            column = model_field.attname
+            if isinstance(field, serializers.FileField):
+                if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+                    raise ImproperlyConfigured(f"{cls.__name__} only supports file fields serialized as URLs ('{name}').")
+                plan.append((name, 'file', column, model_field.storage))
+            elif isinstance(field, (PASSTHROUGH_FIELDS, serializers.PrimaryKeyRelatedField)):
+                plan.append((name, 'value', column, None))
+            else:
+                # Dates, decimals...: DRF's own conversion, without the per-row field machinery
+                plan.append((name, 'value', column, field.to_representation))
+        return plan
+
+    def media_urls(self, storage, absolute=True):
+        key = (storage, absolute)
+        if key not in self.media:
+            self.media[key] = MediaURLs(storage, self.request if absolute else None)
+        return self.media[key]
+
+    def column(self, name):
+        return self.prefix + name
+
+    def columns(self):
+        """The `.values()` columns the serializer (and its nested serializers) read."""
+        columns = [self.pk_column]
+        columns += [column for _, column, _ in self.plan if column is not None]
+        columns += [self.prefix + column for column in self.method_columns]
+        for nested in self.nested_serializers:
+            columns += nested.columns()
+        return list(dict.fromkeys(columns))
+
+    def values(self, queryset):
+        return queryset.values(*self.columns())
+
+    def to_representation(self, row):
+        # Nested serializer of a null foreign key
+        if self.prefix and row[self.pk_column] is None:
+            return None
+        data = {}
+        for name, column, convert in self.plan:
+            if column is None:
+                data[name] = convert(row)
+            else:
+                value = row[column]
+                data[name] = value if convert is None or value is None else convert(value)
+        return data
+
+    def image_columns(self):
+        """The columns of derivative_columns, with those of the nested serializers."""
+        columns = [self.prefix + column for column in self.derivative_columns]
+        for nested in self.nested_serializers:
+            columns += nested.image_columns()
+        return columns
+
+    def data(self, rows):
+        image_columns = self.image_columns()
+        if not image_columns:
+            return [self.to_representation(row) for row in rows]
+
+        data = []
+        rows = iter(rows)
+        while batch := list(itertools.islice(rows, self.batch_size)):
+            self.derivatives.clear()
+            self.derivatives.update(generated_derivatives({row[column] for row in batch for column in image_columns}))
+            data.extend(self.to_representation(row) for row in batch)
+        return data
+
+    def image_derivatives(self, name):
+        """Same as images.derivative_urls() for the image stored under `name`."""
+        if not name:
+            return None
+        if name not in self.derivatives:
+            # Row serialized on its own, outside data()
+            self.derivatives.update(generated_derivatives([name]))
+        generated = self.derivatives[name]
+        urls = self.media_urls(derivative_storage)
+        return {
+            derivative: urls.url(derivative_name(name, derivative)) if derivative in generated else None
+            for derivative in IMAGE_DERIVATIVES
+        }
+
+
+class PlantFastSerializer(FastSerializer):
+    serializer_class = PlantSerializer
+    method_columns = ('image',)
+    derivative_columns = ('image',)
+
+    def get_image(self, row):
+        return self.media_urls(Plant._meta.get_field('image').storage).url(row[self.column('image')])
+
+    def get_image_derivatives(self, row):
+        return self.image_derivatives(row[self.column('image')])
+
+
+class SiteFastSerializer(FastSerializer):
+    serializer_class = SiteSerializer
+
+
+class UserPlantFastSerializer(FastSerializer):
+    serializer_class = UserPlantSerializer
+    nested = {'plant': PlantFastSerializer, 'site': SiteFastSerializer}
+    method_columns = ('image',)
+    derivative_columns = ('image',)
+
+    def get_image_derivatives(self, row):
+        return self.image_derivatives(row[self.column('image')])
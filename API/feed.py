@@ -0,0 +1,164 @@
+from django.utils.timezone import now, localtime, timedelta
+from .models import UserPlant, TaskToCheck
+from .images import agenerated_derivatives, derivative_url, generated_derivatives
+
+
+# Number of days ahead of today shown on the homepage calendar
+FEED_WINDOW_DAYS = 30
+
+# Columns fetched for every task row (one joined query, no model instances)
+FEED_FIELDS = (
+    'id',
+    'due_date',
+    'is_completed',
+    'user_plant_task__name',
+    'user_plant_task__description',
+    'user_plant_task__interval',
+    'user_plant_task__unit',
+    'user_plant_task__user_plant__nickname',
+    'user_plant_task__user_plant__image',
+    'user_plant_task__user_plant__site_id',
+    'user_plant_task__user_plant__site__name',
+)
+
+
+def feed_window(today=None):
+    """Return the (start, end) datetimes of the homepage calendar window."""
+    if today is None:
+        today = localtime(now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today, today + timedelta(days=FEED_WINDOW_DAYS)
+
+
+def feed_rows(user, end_date):
+    """Fetch every task of the user due up to end_date as flat dicts in a single query."""
+    return TaskToCheck.objects.filter(
+        owner=user,
+        user_plant_task__isnull=False,  # Checks whose task was deleted keep their owner
+        due_date__lte=end_date
+    ).order_by('due_date').values(*FEED_FIELDS)
+
+
+def serialize_feed_row(row, image_storage=None, derivatives=None):
+    """
+    Turn a row from feed_rows into the task payload used by the homepage.
+    `derivatives` maps the plant images to their generated derivatives (looked up when missing).
+    """
+    if image_storage is None:
+        image_storage = UserPlant._meta.get_field('image').storage
+    image = row['user_plant_task__user_plant__image']
+    return {
+        "id": row['id'],
+        "task_name": row['user_plant_task__name'],
+        "plant_nickname": row['user_plant_task__user_plant__nickname'],
+        "site_name": row['user_plant_task__user_plant__site__name'] if row['user_plant_task__user_plant__site_id'] else 'No location',
+        "plant_image": image_storage.url(image) if image else None,
+        "plant_thumbnail": derivative_url(image, 'thumbnail', generated=(derivatives or {}).get(image)) if image else None,
+        "description": row['user_plant_task__description'],
+        "due_date": row['due_date'],
+        "interval": row['user_plant_task__interval'],
+        "unit": row['user_plant_task__unit'],
+        "is_completed": row['is_completed'],
+        "overdue_since": None,  # Default value for non-overdue tasks
+    }
+
+
+def feed_tasks(user, end_date):
+    """Return the serialized tasks of the user due up to end_date, ordered by due date."""
+    image_storage = UserPlant._meta.get_field('image').storage
+    rows = list(feed_rows(user, end_date))
+    derivatives = generated_derivatives({row['user_plant_task__user_plant__image'] for row in rows})
+    return [serialize_feed_row(row, image_storage, derivatives) for row in rows]
+
+
+async def afeed_tasks(user, end_date):
+    """Async version of feed_tasks, using the async ORM."""
+    image_storage = UserPlant._meta.get_field('image').storage
+    rows = [row async for row in feed_rows(user, end_date)]
+    derivatives = await agenerated_derivatives({row['user_plant_task__user_plant__image'] for row in rows})
+    return [serialize_feed_row(row, image_storage, derivatives) for row in rows]
+
+
+def bucket_feed(tasks, today, end_date):
+    """
+    Organize serialized tasks into the per-date calendar in a single pass.
+
+    Overdue tasks are the incomplete ones dated before today; they are
+    repeated under today's date. Tasks after end_date are ignored, which
+    lets a cached task list that reaches further ahead be reused.
+    """
+    today_date = today.date()
+    tasks_by_date = {}
+    overdue_task_data = []
+
+    for task in tasks:
+        if task['due_date'] > end_date:
+            break
+
+        due_date = task['due_date'].date()
+        task_date = due_date.isoformat()
+        task_data = dict(task, overdue_since=None)
+
+        bucket = tasks_by_date.get(task_date)
+        if bucket is None:
+            bucket = tasks_by_date[task_date] = {"due_tasks": [], "overdue": False}
+
+        # Mark as overdue if the task's date is before today
+        if due_date < today_date:
+            bucket["overdue"] = True
+            task_data["overdue_since"] = task_date
+
+        bucket["due_tasks"].append(task_data)
+
+        # Incomplete overdue tasks are repeated under today's date
+        if not task['is_completed'] and task['due_date'] < today:
+            overdue_task_data.append(dict(task_data, overdue_since=task_date))
+
+    today_str = today_date.isoformat()
+    if today_str not in tasks_by_date:
+        tasks_by_date[today_str] = {"due_tasks": [], "overdue": False}
+    tasks_by_date[today_str]["due_tasks"].extend(overdue_task_data)
+
+    # Add empty entries for dates with no tasks
+    current_date = today
+    while current_date <= end_date:
+        date_str = current_date.date().isoformat()
+        if date_str not in tasks_by_date:
+            tasks_by_date[date_str] = {"due_tasks": [], "overdue": False}
+        current_date += timedelta(days=1)
+
+    return {
+        "tasks_by_date": tasks_by_date,
+        "start_date": today_str,
+        "end_date": end_date.date().isoformat()
+    }
+
+
+def plant_task_checks(user_plant):
+    """Incomplete checks of a plant with their parent task, in one query, ordered by due date."""
+    return TaskToCheck.objects.filter(
+        user_plant_task__user_plant=user_plant, is_completed=False
+    ).select_related('user_plant_task').order_by('due_date', 'pk')
+
+
+def partition_task_checks(checks, current_time=None):
+    """Split the checks of plant_task_checks into overdue / due today / upcoming in one pass."""
+    current_time = localtime(current_time or now())
+    today_start = current_time.replace(hour=0, minute=0, second=0, microsecond=0)
+    today_end = current_time.replace(hour=23, minute=59, second=59, microsecond=999999)
+
+    task_checks = {'overdue_tasks': [], 'tasks_due_today': [], 'upcoming_tasks': []}
+    for check in checks:
+        if check.due_date < today_start:
+            bucket = 'overdue_tasks'
+        elif check.due_date <= today_end:
+            bucket = 'tasks_due_today'
+        else:
+            bucket = 'upcoming_tasks'
+        task = check.user_plant_task
+        task_checks[bucket].append({
+            'task_name': task.name,
+            'due_date': check.due_date,
+            'interval': task.interval,
+            'unit': task.unit
+        })
+    return task_checks
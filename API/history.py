@@ -0,0 +1,171 @@
+import heapq
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db.models import Count, F, Value
+from django.db.models.functions import Coalesce, NullIf, TruncDate
+from django.utils.dateparse import parse_date
+from django.utils.timezone import make_aware
+from .models import TaskToCheck, TaskHistory
+
+
+# Completed tasks live in two tables: recent ones are still TaskToCheck rows,
+# older ones were moved to TaskHistory by the archive_tasks command. Every
+# read below goes through both.
+
+# Longest range (in days) the history endpoint answers in one request
+HISTORY_MAX_DAYS = getattr(settings, 'HISTORY_MAX_DAYS', 366)
+
+# Default and maximum number of detail rows per page
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+
+# Columns of a completed task in the row details
+HISTORY_DETAIL_FIELDS = ('id', 'task_name', 'plant_name', 'completed_at')
+
+TASK_TYPE_NAMES = dict(TaskHistory.TASK_TYPES)
+
+
+def parse_history_range(start_str, end_str):
+    """
+    Parse the ?start= / ?end= dates (YYYY-MM-DD, both included) of a history
+    request. Raises ValueError with a message for the client when invalid.
+    """
+    try:
+        start = parse_date(start_str or '')
+        end = parse_date(end_str or '')
+    except ValueError:
+        start = end = None
+    if not start or not end:
+        raise ValueError("start and end are required. Use YYYY-MM-DD.")
+    if end < start:
+        raise ValueError("end must not be before start.")
+    if (end - start).days + 1 > HISTORY_MAX_DAYS:
+        raise ValueError(f"The range can't be longer than {HISTORY_MAX_DAYS} days.")
+    return start, end
+
+
+def _completed_between(start, end):
+    start_at = make_aware(datetime.combine(start, datetime.min.time()))
+    end_at = make_aware(datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    return {'completed_at__gte': start_at, 'completed_at__lt': end_at}
+
+
+def completed_tasks(user, start, end):
+    """Live completed tasks of the user between two dates (both included), through the (owner, completed_at) index."""
+    return TaskToCheck.objects.filter(
+        owner=user,
+        user_plant_task__isnull=False,
+        is_completed=True,
+        **_completed_between(start, end)
+    )
+
+
+def archived_tasks(user, start, end):
+    """Archived completed tasks of the user between two dates (both included)."""
+    return TaskHistory.objects.filter(owner=user, **_completed_between(start, end))
+
+
+def daily_counts(user, start, end):
+    """
+    Count the completed tasks per day and per task type. Each table is
+    grouped by the database (one query each) and the two results are merged.
+    Only days with completions are returned.
+    """
+    live_rows = (
+        completed_tasks(user, start, end)
+        .annotate(day=TruncDate('completed_at'), task_name=F('user_plant_task__name'))
+        .values('day', 'task_name')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    archived_rows = (
+        archived_tasks(user, start, end)
+        .annotate(day=TruncDate('completed_at'))
+        .values('day', 'task_type')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+
+    counts = {}
+    for row in live_rows:
+        key = (row['day'], row['task_name'])
+        counts[key] = counts.get(key, 0) + row['count']
+    for row in archived_rows:
+        key = (row['day'], TASK_TYPE_NAMES[row['task_type']])
+        counts[key] = counts.get(key, 0) + row['count']
+
+    days = []
+    by_task = {}
+    total = 0
+    for (day_date, task_name), count in sorted(counts.items()):
+        if not days or days[-1]['date'] != day_date:
+            days.append({'date': day_date, 'total': 0, 'by_task': {}})
+        day = days[-1]
+        day['by_task'][task_name] = count
+        day['total'] += count
+        by_task[task_name] = by_task.get(task_name, 0) + count
+        total += count
+
+    return {
+        'start': start,
+        'end': end,
+        'total': total,
+        'by_task': by_task,
+        'days': days,
+    }
+
+
+def _plant_name():
+    # Nickname, or the species when the plant has none
+    return Coalesce(
+        NullIf(F('user_plant_task__user_plant__nickname'), Value('')),
+        F('user_plant_task__user_plant__plant__species_name'),
+    )
+
+
+def _detail_querysets(user, start, end, after, limit):
+    live = completed_tasks(user, start, end).annotate(
+        task_name=F('user_plant_task__name'), plant_name=_plant_name()
+    )
+    archived = archived_tasks(user, start, end).annotate(plant_name=_plant_name())
+    if after is not None:
+        live = live.filter(pk__gt=after)
+        archived = archived.filter(pk__gt=after)
+    live = live.order_by('pk').values(*HISTORY_DETAIL_FIELDS)
+    archived = archived.order_by('pk').values('id', 'task_type', 'plant_name', 'completed_at')
+    if limit is not None:
+        live = live[:limit]
+        archived = archived[:limit]
+    return live, archived
+
+
+def _merge_details(live_rows, archived_rows, limit):
+    archived_rows = (
+        {
+            'id': row['id'],
+            'task_name': TASK_TYPE_NAMES[row['task_type']],
+            'plant_name': row['plant_name'],
+            'completed_at': row['completed_at'],
+        }
+        for row in archived_rows
+    )
+    rows = heapq.merge(archived_rows, live_rows, key=lambda row: row['id'])
+    return list(rows)[:limit] if limit is not None else list(rows)
+
+
+def completed_task_details(user, start, end, after=None, limit=None):
+    """
+    Row details of the completed tasks from both tables, as flat dicts
+    ordered by task id. `after` / `limit` read one page (keyset on the id,
+    which is unique across both tables).
+    """
+    live, archived = _detail_querysets(user, start, end, after, limit)
+    return _merge_details(live, archived, limit)
+
+
+async def acompleted_task_details(user, start, end, after=None, limit=None):
+    """Async version of completed_task_details, for the ASGI views."""
+    live, archived = _detail_querysets(user, start, end, after, limit)
+    live_rows = [row async for row in live]
+    archived_rows = [row async for row in archived]
+    return _merge_details(live_rows, archived_rows, limit)
@@ -0,0 +1,185 @@
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+from .catalog import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+
+# Resized copies generated for every uploaded image, stored next to each
+# other under media/derivatives/ with the same relative path as the original
+IMAGE_DERIVATIVES = {
+    'thumbnail': {'size': (256, 256), 'format': 'JPEG', 'suffix': '.thumbnail.jpg', 'quality': 80},
+    'webp': {'size': (1080, 1080), 'format': 'WEBP', 'suffix': '.webp', 'quality': 80},
+}
+DERIVATIVES_DIR = 'derivatives'
+
+# Derivatives keep predictable names derived from the original, so they are
+# written with a plain file system storage rather than the default one
+derivative_storage = FileSystemStorage()
+
+# Folders (upload_to of the models, and content-addressed storage) holding images that get derivatives
+IMAGE_UPLOAD_DIRS = ['plants', 'pets', 'user_plants', 'user_pets', 'content']
+
+# Which derivatives exist, per original image name, kept in the catalog cache
+# (shared by the workers) by the generators, so serializing a row doesn't cost
+# a storage.exists() per derivative
+GENERATED_DERIVATIVES_KEY = 'image-derivatives:{digest}'
+
+# Background workers resizing images so uploads don't wait for Pillow
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'IMAGE_DERIVATIVE_WORKERS', 2),
+    thread_name_prefix='image-derivatives',
+)
+
+
+def derivative_name(name, derivative):
+    """Storage name of a derivative, e.g. plants/rose.jpg -> derivatives/plants/rose.thumbnail.jpg"""
+    base, _ = os.path.splitext(name)
+    return f"{DERIVATIVES_DIR}/{base}{IMAGE_DERIVATIVES[derivative]['suffix']}"
+
+
+def render_derivative(image, spec):
+    """Resize an opened Pillow image to fit the spec and return the encoded bytes."""
+    image = ImageOps.exif_transpose(image)
+    if spec['format'] == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+
+    image.thumbnail(spec['size'], Image.LANCZOS)
+    output = BytesIO()
+    image.save(output, spec['format'], quality=spec['quality'], optimize=True)
+    return output.getvalue()
+
+
+def _generated_key(name):
+    # Hashed: file names can hold characters (or lengths) some cache backends refuse
+    return GENERATED_DERIVATIVES_KEY.format(digest=hashlib.md5(name.encode()).hexdigest())
+
+
+def record_derivatives(name, derivatives):
+    """Remember which derivatives of an image exist (read by generated_derivatives)."""
+    catalog_cache().set(_generated_key(name), tuple(derivatives), None)
+
+
+def _stat_derivatives(name):
+    return tuple(
+        derivative for derivative in IMAGE_DERIVATIVES
+        if derivative_storage.exists(derivative_name(name, derivative))
+    )
+
+
+def generated_derivatives(names):
+    """
+    {name: derivatives generated} for image names, in one cache read. Names
+    missing from the record (evicted, or stored before it was kept) are
+    checked on the storage once and added to it.
+    """
+    keys = {_generated_key(name): name for name in names if name}
+    generated = {keys[key]: derivatives for key, derivatives in catalog_cache().get_many(list(keys)).items()}
+    for key, name in keys.items():
+        if name not in generated:
+            generated[name] = _stat_derivatives(name)
+            # add(): a record written by a generator meanwhile wins
+            catalog_cache().add(key, generated[name], None)
+    return generated
+
+
+async def agenerated_derivatives(names):
+    """Async version of generated_derivatives."""
+    keys = {_generated_key(name): name for name in names if name}
+    found = await catalog_cache().aget_many(list(keys))
+    generated = {keys[key]: derivatives for key, derivatives in found.items()}
+    for key, name in keys.items():
+        if name not in generated:
+            generated[name] = await sync_to_async(_stat_derivatives)(name)
+            await catalog_cache().aadd(key, generated[name], None)
+    return generated
+
+
+def generate_derivatives(name, storage=None, overwrite=False):
+    """Create the missing derivatives of an image. Returns the names written."""
+    storage = storage or default_storage
+    targets = {
+        derivative: derivative_name(name, derivative)
+        for derivative in IMAGE_DERIVATIVES
+    }
+    if not overwrite:
+        targets = {derivative: target for derivative, target in targets.items() if not derivative_storage.exists(target)}
+    if not targets:
+        record_derivatives(name, IMAGE_DERIVATIVES)
+        return []
+
+    written = []
+    with storage.open(name, 'rb') as original:
+        with Image.open(original) as image:
+            image.load()
+            for derivative, target in targets.items():
+                content = render_derivative(image, IMAGE_DERIVATIVES[derivative])
+                if derivative_storage.exists(target):
+                    derivative_storage.delete(target)
+                written.append(derivative_storage.save(target, ContentFile(content)))
+    record_derivatives(name, IMAGE_DERIVATIVES)
+    return written
+
+
+def delete_derivatives(name):
+    for derivative in IMAGE_DERIVATIVES:
+        derivative_storage.delete(derivative_name(name, derivative))
+    record_derivatives(name, ())
+
+
+def _generate_in_background(name, storage, on_generated=None):
+    try:
+        written = generate_derivatives(name, storage)
+    except Exception:
+        logger.exception("Could not generate derivatives for %s", name)
+        return
+    if written and on_generated:
+        on_generated()
+
+
+def schedule_derivatives(field_file, on_generated=None):
+    """
+    Queue derivative generation for an image once the current transaction
+    commits. on_generated() is called (from the worker) after new
+    derivatives were written, to refresh the versions of the responses
+    listing their URLs.
+    """
+    if not field_file or not field_file.name:
+        return
+    name, storage = field_file.name, field_file.storage
+    transaction.on_commit(lambda: _executor.submit(_generate_in_background, name, storage, on_generated))
+
+
+def derivative_url(name, derivative, request=None, generated=None):
+    """
+    URL of one derivative of an image, or None when it hasn't been generated yet.
+    `generated` is the derivatives of the image when already looked up (see generated_derivatives).
+    """
+    if generated is None:
+        generated = generated_derivatives([name])[name]
+    if derivative not in generated:
+        return None
+    url = derivative_storage.url(derivative_name(name, derivative))
+    return request.build_absolute_uri(url) if request else url
+
+
+def derivative_urls(field_file, request=None):
+    """URLs of all the derivatives of an image field, keyed by derivative name."""
+    if not field_file:
+        return None
+    generated = generated_derivatives([field_file.name])[field_file.name]
+    return {
+        derivative: derivative_url(field_file.name, derivative, request, generated)
+        for derivative in IMAGE_DERIVATIVES
+    }
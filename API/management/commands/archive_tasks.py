@@ -0,0 +1,26 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import now
+from API.models import TaskHistory
+
+
+class Command(BaseCommand):
+    help = (
+        "Move task checks completed more than --days ago from the live TaskToCheck table "
+        "into the append-only TaskHistory table. Meant to run daily (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'TASK_ARCHIVE_AFTER_DAYS', 90),
+                            help="Archive checks completed more than this many days ago.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError("--days must be at least 1.")
+
+        completed_before = now() - timedelta(days=options['days'])
+        archived = TaskHistory.archive(completed_before, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {archived} completed check(s) archived."))
@@ -0,0 +1,71 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from API.calendar_cache import invalidate_calendar
+from API.catalog import bump_catalog_version
+from API.images import delete_derivatives, generate_derivatives
+from API.models import UserPlant
+from API.storage import file_fields, is_hashed_name, refcount
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the files referenced by image fields into content-addressed storage, "
+        "point every row at the shared copy and delete the duplicates left behind."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would change.")
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        renamed = {}  # legacy name -> content-addressed name
+
+        for model, field_name in file_fields():
+            legacy_names = (
+                model._default_manager.exclude(**{field_name: ''})
+                .exclude(**{f"{field_name}__isnull": True})
+                .values_list(field_name, flat=True).distinct()
+            )
+            for name in legacy_names:
+                if is_hashed_name(name) or name in renamed:
+                    continue
+                if not default_storage.exists(name):
+                    self.stderr.write(f"{model.__name__}.{field_name}: missing file {name}")
+                    continue
+                if dry_run:
+                    renamed[name] = None
+                    continue
+                with default_storage.open(name, 'rb') as legacy_file:
+                    renamed[name] = default_storage.save(name, legacy_file)
+
+        if dry_run:
+            self.stdout.write(f"{len(renamed)} file(s) would be moved to content-addressed storage.")
+            return
+
+        with transaction.atomic():
+            # Remember the owners whose cached calendars show these images
+            owners = set(UserPlant.objects.filter(image__in=list(renamed)).values_list('user_id', flat=True))
+            for model, field_name in file_fields():
+                for old, new in renamed.items():
+                    model._default_manager.filter(**{field_name: old}).update(**{field_name: new})
+
+        for new in set(renamed.values()):
+            generate_derivatives(new)
+
+        # Bulk updates skip the model signals (and the derivative URLs changed too)
+        bump_catalog_version()
+        for user_id in owners:
+            invalidate_calendar(user_id)
+
+        deleted = 0
+        for old, new in renamed.items():
+            if not refcount(old):
+                delete_derivatives(old)
+                default_storage.delete(old)
+                deleted += 1
+
+        unique = len(set(renamed.values()))
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {len(renamed)} file(s) moved into {unique} unique content file(s), {deleted} legacy file(s) deleted."
+        ))
@@ -0,0 +1,53 @@
+import signal
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware
+from API.reminders import ReminderDispatcher, get_sink
+
+
+class Command(BaseCommand):
+    help = "Long-running worker emitting a reminder whenever an incomplete task becomes due."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=getattr(settings, 'REMINDER_OUTPUT', 'reminders.jsonl'),
+                            help="File the JSON Lines sink appends reminders to (ignored by sinks without a path).")
+        parser.add_argument('--state-file', default=getattr(settings, 'REMINDER_STATE_FILE', 'reminders-state.json'),
+                            help="Where the last dispatched due date is kept between restarts.")
+        parser.add_argument('--lookahead', type=int, default=3600, help="Seconds of upcoming tasks kept in memory.")
+        parser.add_argument('--refresh', type=int, default=60, help="Seconds between reloads of the window (new tasks).")
+        parser.add_argument('--since', help="ISO datetime to start from when there is no saved state (default: now).")
+        parser.add_argument('--once', action='store_true', help="Dispatch what is due now and exit.")
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError("--since must be an ISO datetime.")
+            if is_naive(since):
+                since = make_aware(since)
+
+        dispatcher = ReminderDispatcher(
+            sink=get_sink(path=options['output']),
+            lookahead=timedelta(seconds=options['lookahead']),
+            refresh_interval=timedelta(seconds=options['refresh']),
+            state_path=options['state_file'],
+            since=since,
+        )
+
+        if options['once']:
+            dispatcher.load_window()
+            sent = dispatcher.dispatch_due()
+            self.stdout.write(self.style.SUCCESS(f"{sent} reminder(s) sent."))
+            return
+
+        stop_event = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop_event.set())
+
+        self.stdout.write(f"Dispatching reminders from {dispatcher.watermark.isoformat()} (Ctrl+C to stop)...")
+        dispatcher.run(stop_event)
+        self.stdout.write("Stopped.")
@@ -0,0 +1,29 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from API.bundles import bundle_dir, bundle_name, read_manifest, refresh_bundle, CATALOG_BUNDLE_KEEP
+
+
+class Command(BaseCommand):
+    help = (
+        "Write a new offline bundle of the Plant and Pet catalogs (and the deltas from the versions kept) "
+        "if the catalog changed since the last one. Catalog writes also queue it in the background; "
+        "run it after bulk changes made outside Django, or to write the first bundle at deploy time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep', type=int, default=CATALOG_BUNDLE_KEEP,
+                            help="Number of versions kept (clients on older ones get the full bundle).")
+
+    def handle(self, *args, **options):
+        if options['keep'] < 1:
+            raise CommandError("--keep must be at least 1.")
+
+        # Waits for an export running in the background
+        version, created = refresh_bundle(keep=options['keep'])
+        entry = read_manifest()['versions'][-1]
+        size = os.path.getsize(os.path.join(bundle_dir(), bundle_name(version)))
+        state = "written" if created else "unchanged"
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: catalog bundle version {version} {state} ({entry['plants']} plants, {entry['pets']} pets, "
+            f"{size / 1024:.1f} KiB compressed)."
+        ))
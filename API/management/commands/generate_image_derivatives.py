@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from API.catalog import bump_catalog_version
+from API.images import IMAGE_UPLOAD_DIRS, generate_derivatives
+
+
+class Command(BaseCommand):
+    help = "Generate the thumbnail / WebP derivatives of the images already stored under media/."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Number of images resized in parallel.")
+        parser.add_argument('--overwrite', action='store_true', help="Regenerate derivatives that already exist.")
+
+    def _image_names(self, folders=IMAGE_UPLOAD_DIRS):
+        for folder in folders:
+            if not default_storage.exists(folder):
+                continue
+            subfolders, files = default_storage.listdir(folder)
+            for filename in files:
+                yield f"{folder}/{filename}"
+            yield from self._image_names([f"{folder}/{subfolder}" for subfolder in subfolders])
+
+    def handle(self, *args, **options):
+        created = skipped = failed = 0
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {
+                executor.submit(generate_derivatives, name, default_storage, options['overwrite']): name
+                for name in self._image_names()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    written = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{name}: {e}")
+                    continue
+                if written:
+                    created += len(written)
+                    self.stdout.write(f"{name}: {len(written)} derivative(s)")
+                else:
+                    skipped += 1
+
+        if created:
+            # Catalog (and pet list) responses show the derivative URLs
+            bump_catalog_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {created} derivative(s) created, {skipped} image(s) already up to date, {failed} failed."
+        ))
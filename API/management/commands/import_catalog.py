@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+from django.core.management.base import BaseCommand, CommandError
+from API.catalog_import import CATALOG_MODELS, CatalogImporter, CatalogImportError
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update Plant / Pet catalog entries from a CSV or JSON Lines file (or - for stdin), "
+        "matched on their natural key. Columns are model field names; an `image` column names files "
+        "of --images."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('catalog', choices=sorted(CATALOG_MODELS))
+        parser.add_argument('path', help="CSV (.csv) or JSON Lines (.jsonl) file, - for stdin.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Default: from the file extension.")
+        parser.add_argument('--images', help="Directory holding the files named in the image column.")
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Rows validated and upserted together.")
+        parser.add_argument('--workers', type=int, default=4, help="Images stored and resized in parallel.")
+        parser.add_argument('--dry-run', action='store_true', help="Only validate the rows.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in ('csv', 'jsonl'):
+            raise CommandError("Can't tell the format from the file name, use --format.")
+        if options['images'] and not os.path.isdir(options['images']):
+            raise CommandError(f"{options['images']} is not a directory.")
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        importer = CatalogImporter(
+            options['catalog'], image_dir=options['images'], chunk_size=options['chunk_size'],
+            workers=options['workers'], dry_run=options['dry_run'],
+        )
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        start = time.perf_counter()
+        try:
+            for stats in importer.run(stream, file_format):
+                elapsed = time.perf_counter() - start
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"{stats.read} rows, {stats.read / elapsed:.0f} rows/s")
+        except CatalogImportError as e:
+            raise CommandError(e)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        stats = importer.stats
+        elapsed = time.perf_counter() - start
+        for line, message in stats.errors:
+            self.stderr.write(f"line {line}: {message}")
+        hidden = stats.invalid + stats.image_errors - len(stats.errors)
+        if hidden > 0:
+            self.stderr.write(f"... and {hidden} more error(s)")
+
+        action = "validated" if options['dry_run'] else f"{stats.created} created, {stats.updated} updated"
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {stats.read} row(s) read, {action}, {stats.invalid} invalid, "
+            f"{stats.images} image(s) stored ({stats.image_errors} failed) "
+            f"in {elapsed:.1f}s ({stats.read / max(elapsed, 1e-9):.0f} rows/s)."
+        ))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from API.calendar_cache import invalidate_calendar
+from API.models import UserPlantTask, TaskToCheck
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the pending task checks still due on the old 4-weeks-per-month date of their task "
+        "to the calendar month. Checks created before a frequency change keep their date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--unit', choices=['day', 'week', 'month'], help="Only reschedule tasks with this unit.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        tasks = UserPlantTask.objects.filter(last_completed_at__isnull=False).select_related('user_plant').order_by('pk')
+        if options['unit']:
+            tasks = tasks.filter(unit=options['unit'])
+
+        batch_size = options['batch_size']
+        changed = 0
+        owners = set()
+        batch = []
+
+        def flush():
+            nonlocal changed
+            with transaction.atomic():
+                changed += TaskToCheck.reschedule(batch)
+            owners.update(task.user_plant.user_id for task in batch)
+            batch.clear()
+
+        for task in tasks.iterator(chunk_size=batch_size):
+            batch.append(task)
+            if len(batch) == batch_size:
+                flush()
+        if batch:
+            flush()
+
+        # Bulk updates skip the model signals
+        for user_id in owners:
+            invalidate_calendar(user_id)
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {changed} pending check(s) rescheduled."))
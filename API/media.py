@@ -0,0 +1,165 @@
+import mimetypes
+import os
+import re
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from .storage import is_hashed_name, is_transient_name
+
+
+# Browser/CDN caching of media files. Content-addressed names never change
+# content, so they are cached for a year; legacy names revalidate hourly.
+MEDIA_IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+MEDIA_CACHE_CONTROL = getattr(settings, 'MEDIA_CACHE_CONTROL', 'public, max-age=3600')
+
+# Let the front web server send the file: 'X-Accel-Redirect' (nginx) or
+# 'X-Sendfile' (Apache/lighttpd). None streams the file from Django, which
+# still goes through wsgi.file_wrapper (sendfile) for full responses.
+MEDIA_SENDFILE_HEADER = getattr(settings, 'MEDIA_SENDFILE_HEADER', None)
+# nginx internal location mapped to MEDIA_ROOT, used with X-Accel-Redirect
+MEDIA_SENDFILE_PREFIX = getattr(settings, 'MEDIA_SENDFILE_PREFIX', '/protected-media/')
+
+RANGE_CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range "Range: bytes=..." header into (start, end) inclusive.
+
+    Returns None to serve the whole file (no header, unsupported or multiple
+    ranges) and raises ValueError for a range that can't be satisfied.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if size == 0:
+        # No byte of an empty file can be selected
+        raise ValueError("Range not satisfiable")
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _etag(name, stat):
+    if is_hashed_name(name):
+        # The name already is the content hash
+        return '"%s"' % os.path.splitext(os.path.basename(name))[0]
+    return '"%x-%x"' % (stat.st_mtime_ns, stat.st_size)
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        return if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE'))
+    return if_modified_since is not None and int(mtime) <= if_modified_since
+
+
+def serve_media(request, path):
+    """
+    Serve a file from MEDIA_ROOT with caching headers and byte-range support.
+
+    Sends ETag / Last-Modified and answers conditional requests with 304,
+    marks content-addressed files immutable, honours single "Range" requests
+    (206 / 416) and can hand the transfer off to the web server. Files the
+    storage is writing or deleting are not found.
+    """
+    if is_transient_name(path):
+        raise Http404("File not found")
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Invalid path")
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404("File not found")
+    if not os.path.isfile(full_path):
+        raise Http404("File not found")
+
+    size = stat.st_size
+    etag = _etag(path, stat)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': MEDIA_IMMUTABLE_CACHE_CONTROL if is_hashed_name(path) else MEDIA_CACHE_CONTROL,
+        'Accept-Ranges': 'bytes',
+    }
+
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponse(status=304)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    if MEDIA_SENDFILE_HEADER:
+        # The web server reads the file (and handles Range) itself
+        response = HttpResponse(content_type=content_type)
+        if MEDIA_SENDFILE_HEADER == 'X-Accel-Redirect':
+            response[MEDIA_SENDFILE_HEADER] = MEDIA_SENDFILE_PREFIX + path
+        else:
+            response[MEDIA_SENDFILE_HEADER] = full_path
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    # If-Range: only honour the range while the file is unchanged
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range.strip() != etag:
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(full_path, start, end), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+
+    if encoding:
+        response['Content-Encoding'] = encoding
+    for header, value in headers.items():
+        response[header] = value
+    return response
@@ -0,0 +1,67 @@
+from django.db import migrations
+
+
+# Full-text index over the plant catalog (SQLite FTS5). The index reads its
+# content from API_plant and triggers keep it in sync on every insert, update
+# and delete, including bulk ones. Other databases fall back to LIKE search.
+
+CREATE_INDEX = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS API_plant_fts USING fts5(
+        species_name,
+        scientific_name,
+        content='API_plant',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS API_plant_fts_ai AFTER INSERT ON API_plant BEGIN
+        INSERT INTO API_plant_fts(rowid, species_name, scientific_name)
+        VALUES (new.id, new.species_name, new.scientific_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS API_plant_fts_ad AFTER DELETE ON API_plant BEGIN
+        INSERT INTO API_plant_fts(API_plant_fts, rowid, species_name, scientific_name)
+        VALUES ('delete', old.id, old.species_name, old.scientific_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS API_plant_fts_au AFTER UPDATE OF species_name, scientific_name ON API_plant BEGIN
+        INSERT INTO API_plant_fts(API_plant_fts, rowid, species_name, scientific_name)
+        VALUES ('delete', old.id, old.species_name, old.scientific_name);
+        INSERT INTO API_plant_fts(rowid, species_name, scientific_name)
+        VALUES (new.id, new.species_name, new.scientific_name);
+    END
+    """,
+    # Index the rows that already exist
+    "INSERT INTO API_plant_fts(API_plant_fts) VALUES ('rebuild')",
+]
+
+DROP_INDEX = [
+    "DROP TRIGGER IF EXISTS API_plant_fts_au",
+    "DROP TRIGGER IF EXISTS API_plant_fts_ad",
+    "DROP TRIGGER IF EXISTS API_plant_fts_ai",
+    "DROP TABLE IF EXISTS API_plant_fts",
+]
+
+
+def _run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('API', '0004_tasktocheck_api_tasktoc_complet_e976d9_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run_on_sqlite(CREATE_INDEX), _run_on_sqlite(DROP_INDEX)),
+    ]
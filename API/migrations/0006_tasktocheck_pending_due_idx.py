@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('API', '0005_plant_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tasktocheck',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['due_date'], name='tasktocheck_pending_due_idx'),
+        ),
+    ]
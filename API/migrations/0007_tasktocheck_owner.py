@@ -0,0 +1,57 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models, transaction
+
+
+# Tasks are backfilled in primary key ranges, one transaction per batch, so a
+# large table isn't locked for the whole migration
+BACKFILL_BATCH_SIZE = 5000
+
+
+def backfill_owner(apps, schema_editor):
+    TaskToCheck = apps.get_model('API', 'TaskToCheck')
+    UserPlantTask = apps.get_model('API', 'UserPlantTask')
+    db_alias = schema_editor.connection.alias
+
+    owner_of_task = UserPlantTask.objects.using(db_alias).filter(
+        pk=models.OuterRef('user_plant_task_id')
+    ).values('user_plant__user_id')[:1]
+
+    tasks = TaskToCheck.objects.using(db_alias)
+    last_id = tasks.aggregate(last_id=models.Max('pk'))['last_id'] or 0
+    for start in range(0, last_id + 1, BACKFILL_BATCH_SIZE):
+        with transaction.atomic(using=db_alias):
+            tasks.filter(
+                pk__gte=start,
+                pk__lt=start + BACKFILL_BATCH_SIZE,
+                owner__isnull=True,
+                user_plant_task__isnull=False,
+            ).update(owner=models.Subquery(owner_of_task))
+
+
+class Migration(migrations.Migration):
+    # Each backfill batch commits on its own
+    atomic = False
+
+    dependencies = [
+        ('API', '0006_tasktocheck_pending_due_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasktocheck',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tasks_to_check', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_owner, migrations.RunPython.noop),
+        # Indexes are built after the backfill, in one pass over the table
+        migrations.AddIndex(
+            model_name='tasktocheck',
+            index=models.Index(fields=['owner', 'is_completed', 'due_date'], name='API_tasktoc_owner_i_1a7ab5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktocheck',
+            index=models.Index(fields=['owner', 'completed_at'], name='API_tasktoc_owner_i_f81cb9_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('API', '0007_tasktocheck_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskHistory',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('task_type', models.PositiveSmallIntegerField(choices=[(0, 'other'), (1, 'misting'), (2, 'watering'), (3, 'pruning'), (4, 'fertilizing')])),
+                ('completed_at', models.DateTimeField()),
+                ('owner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_history', to=settings.AUTH_USER_MODEL)),
+                ('user_plant_task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history', to='API.userplanttask')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'completed_at'], name='API_taskhis_owner_i_608a20_idx')],
+            },
+        ),
+    ]
@@ -1,8 +1,8 @@
-from django.db import models
+from django.db import connection, models, transaction
 from users.models import User
-from datetime import timedelta
-from datetime import datetime
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from .scheduling import legacy_due_date, next_due_date, next_due_dates
 
 
 # The plant species stored in the database
@@ -17,6 +17,12 @@ class Plant(models.Model):
     description = models.TextField(blank=True, null=True)
     image = models.ImageField(upload_to='plants/', null=True, blank=True)  
 
+    class Meta:
+        indexes = [
+            # Natural key of catalog imports (API.catalog_import)
+            models.Index(fields=['scientific_name'], name='plant_scientific_name_idx'),
+        ]
+
     def __str__(self):
         return self.species_name
 
@@ -97,18 +103,12 @@ class UserPlantTask(models.Model):
             raise ValidationError("Interval must be greater than zero.")
 
     def calculate_next_due_date(self):
-        """Calculate the next due date based on the last completed date."""
-        if not self.last_completed_at:
-            # If no last completed date, use the current time
-            return datetime.now()
+        """Calculate the next due date based on the last completed date (now if never completed)."""
+        return next_due_date(self.last_completed_at, self.interval, self.unit)
+
 
-        if self.unit == 'day':
-            return self.last_completed_at + timedelta(days=self.interval)
-        elif self.unit == 'week':
-            return self.last_completed_at + timedelta(weeks=self.interval)
-        elif self.unit == 'month':
-            return self.last_completed_at + timedelta(weeks=4 * self.interval)  # Approx. 4 weeks for a month
-        return self.last_completed_at
+class TasksAlreadyCompleted(Exception):
+    """Some of the tasks passed to TaskToCheck.complete_many were completed in the meantime."""
 
 
 # The task instance the user checks related to a UserPlantTask
@@ -116,17 +116,33 @@ class TaskToCheck(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=['completed_at']),  # Add index for better query performance
+            # Per-user task lists (calendar, overdue) and completion history
+            models.Index(fields=['owner', 'is_completed', 'due_date']),
+            models.Index(fields=['owner', 'completed_at']),
+            # Range scans of upcoming tasks (reminders), only over incomplete rows
+            models.Index(fields=['due_date'], condition=models.Q(is_completed=False), name='tasktocheck_pending_due_idx'),
         ]
 
+    # Deleting a task unlinks its pending checks; its completed ones (its history) are deleted with
+    # it, like the archived ones (see delete_task_history in signals.py)
     user_plant_task = models.ForeignKey(UserPlantTask, on_delete=models.SET_NULL, null=True, blank=True)
+    # Copy of user_plant_task.user_plant.user, so per-user task queries don't join three tables.
+    # No index of its own: the composite indexes in Meta start with it.
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, db_index=False, related_name='tasks_to_check')
     due_date = models.DateTimeField()
     is_completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    def save(self, *args, **kwargs):
+        # Fill in the owner when the caller didn't (bulk_create callers must set it themselves)
+        if self.owner_id is None and self.user_plant_task_id is not None:
+            self.owner_id = UserPlantTask.objects.filter(pk=self.user_plant_task_id).values_list('user_plant__user_id', flat=True).first()
+        super().save(*args, **kwargs)
+
     def mark_as_completed(self):
         """Mark the task as completed, update the parent task's last_completed_at, and create the next task."""
         self.is_completed = True
-        self.completed_at = datetime.now()  # Set the completion date
+        self.completed_at = timezone.now()  # Set the completion date
         self.save()
 
         # Update the parent task's last_completed_at to the completed_at of this task
@@ -140,16 +156,118 @@ class TaskToCheck(models.Model):
         # Create a new task for the next cycle
         new_task = TaskToCheck.objects.create(
             user_plant_task=self.user_plant_task,
+            owner_id=self.owner_id,
             due_date=next_due_date,
             is_completed=False  # New task is not completed
         )
 
         return new_task
 
+    @classmethod
+    def complete_many(cls, tasks):
+        """
+        Mark several tasks as completed at once and create their next cycle.
+
+        Same effect as calling mark_as_completed on each task, but with one
+        bulk update per table and a single bulk insert, inside one transaction.
+        The tasks must have their user_plant_task loaded. Returns the new tasks
+        in the same order. Raises TasksAlreadyCompleted, without writing
+        anything, if some of them are completed in the database already.
+        """
+        completed_at = timezone.now()
+        with transaction.atomic():
+            # Only the rows still incomplete: when an overlapping request (a double tap)
+            # completed some of them since they were loaded, the count falls short
+            # and nothing is written, instead of a second next cycle.
+            updated = cls.objects.filter(pk__in=[task.pk for task in tasks], is_completed=False).update(
+                is_completed=True, completed_at=completed_at
+            )
+            if updated != len(tasks):
+                raise TasksAlreadyCompleted()
+
+            parents = {}
+            for task in tasks:
+                task.is_completed = True
+                task.completed_at = completed_at
+                parent = task.user_plant_task
+                parent.last_completed_at = completed_at
+                parents[parent.pk] = parent
+
+            UserPlantTask.objects.bulk_update(parents.values(), ['last_completed_at'])
+            due_dates = next_due_dates(
+                [task.user_plant_task.last_completed_at for task in tasks],
+                [task.user_plant_task.interval for task in tasks],
+                [task.user_plant_task.unit for task in tasks],
+            )
+            new_tasks = cls.objects.bulk_create([
+                cls(
+                    user_plant_task=task.user_plant_task,
+                    owner_id=task.owner_id,
+                    due_date=due_date,
+                    is_completed=False
+                )
+                for task, due_date in zip(tasks, due_dates)
+            ])
+
+        return new_tasks
+
+    @classmethod
+    def reschedule(cls, user_plant_tasks):
+        """
+        Move the pending (incomplete) checks of the given UserPlantTasks still
+        due on their old 4-weeks-per-month date to the calendar-correct one,
+        with one query and one bulk update. Checks on any other date (created
+        before a frequency change, which doesn't affect the current check, or
+        moved by hand) are left alone, and so are tasks never completed (their
+        first check is due when the task was added). Returns the number of
+        checks moved.
+        """
+        parents = {task.pk: task for task in user_plant_tasks if task.last_completed_at is not None}
+        pending = list(cls.objects.filter(user_plant_task__in=list(parents), is_completed=False))
+        if not pending:
+            return 0
+
+        due_dates = next_due_dates(
+            [parents[check.user_plant_task_id].last_completed_at for check in pending],
+            [parents[check.user_plant_task_id].interval for check in pending],
+            [parents[check.user_plant_task_id].unit for check in pending],
+        )
+        changed = []
+        for check, due_date in zip(pending, due_dates):
+            parent = parents[check.user_plant_task_id]
+            if check.due_date == due_date:
+                continue
+            if check.due_date != legacy_due_date(parent.last_completed_at, parent.interval, parent.unit):
+                continue
+            check.due_date = due_date
+            changed.append(check)
+
+        cls.objects.bulk_update(changed, ['due_date'])
+        return len(changed)
+
+    @classmethod
+    def delete_completed(cls, where, params):
+        """
+        Delete the completed checks matching the SQL condition `where` in one
+        statement, without a post_delete signal (and a calendar cache delete)
+        per row: callers drop the calendars themselves. Returns the row count.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {connection.ops.quote_name(cls._meta.db_table)} "
+                f"WHERE is_completed = %s AND ({where})",
+                [True, *params]
+            )
+            return cursor.rowcount
+
     @classmethod
     def get_overdue_tasks(cls, user):
         """Retrieve all overdue tasks."""
-        return cls.objects.filter(user_plant_task__user_plant__user=user, is_completed=False, due_date__lt=datetime.now())
+        # "is_completed IN (0)" rather than "NOT is_completed", which SQLite can't seek on in the
+        # (owner, is_completed, due_date) index
+        return cls.objects.filter(
+            owner=user, user_plant_task__isnull=False, is_completed__in=[False], due_date__lt=timezone.now()
+        )
 
     def __str__(self):
         if self.user_plant_task:
@@ -157,3 +275,71 @@ class TaskToCheck(models.Model):
             return f"Task: {self.user_plant_task.name} for {plant_name}"
         return "Unlinked Task"
 
+
+
+# Completed TaskToCheck rows moved out of the live table (see TaskHistory.archive).
+# Append-only: rows are only ever inserted by the archive job.
+class TaskHistory(models.Model):
+    # Task types stored as small ints, numbered after UserPlantTask.TASK_CHOICES (0 for anything else)
+    TASK_TYPES = [(0, 'other')] + [(code, name) for code, (name, label) in enumerate(UserPlantTask.TASK_CHOICES, 1)]
+    TASK_TYPE_CODES = {name: code for code, name in TASK_TYPES}
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'completed_at']),
+        ]
+
+    # Same id as the archived TaskToCheck, so task ids stay unique across both tables
+    id = models.BigIntegerField(primary_key=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False, related_name='task_history')
+    # The history of a task is deleted with it, here and in TaskToCheck
+    user_plant_task = models.ForeignKey(UserPlantTask, on_delete=models.CASCADE, related_name='history')
+    task_type = models.PositiveSmallIntegerField(choices=TASK_TYPES)
+    completed_at = models.DateTimeField()
+
+    @classmethod
+    def archive(cls, completed_before, batch_size=5000):
+        """
+        Move the checks completed before `completed_before` from TaskToCheck
+        into the history table, one transaction per batch. Completed checks
+        whose task was deleted are not shown anywhere, so they are dropped.
+        Returns the number of checks archived.
+        """
+        from .calendar_cache import invalidate_calendar
+
+        archived = 0
+        while True:
+            with transaction.atomic():
+                # Locked until the batch is moved, so a check can't be un-completed in between
+                rows = list(
+                    TaskToCheck.objects.select_for_update(of=('self',))
+                    .filter(is_completed=True, completed_at__lt=completed_before)
+                    .order_by('pk')
+                    .values('id', 'owner_id', 'user_plant_task_id', 'user_plant_task__name', 'completed_at')[:batch_size]
+                )
+                if not rows:
+                    return archived
+
+                history = [
+                    cls(
+                        id=row['id'],
+                        owner_id=row['owner_id'],
+                        user_plant_task_id=row['user_plant_task_id'],
+                        task_type=cls.TASK_TYPE_CODES.get(row['user_plant_task__name'], 0),
+                        completed_at=row['completed_at'],
+                    )
+                    for row in rows
+                    if row['user_plant_task_id'] is not None and row['owner_id'] is not None
+                ]
+                cls.objects.bulk_create(history, ignore_conflicts=True)
+                # The calendars are dropped once per owner below
+                TaskToCheck.delete_completed(
+                    f"id IN ({', '.join(['%s'] * len(rows))}) AND completed_at < %s",
+                    [*(row['id'] for row in rows), connection.ops.adapt_datetimefield_value(completed_before)]
+                )
+            for owner_id in {row['owner_id'] for row in rows}:
+                invalidate_calendar(owner_id)
+            archived += len(history)
+
+    def __str__(self):
+        return f"{self.get_task_type_display()} completed at {self.completed_at}"
@@ -0,0 +1,26 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination ordered by primary key, with an opaque `cursor` parameter.
+
+    Each page is fetched with `WHERE id > <last id> LIMIT page_size`, so the
+    cost of a page does not depend on how deep into the table it is.
+    """
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def is_requested(self, request):
+        """Only paginate clients that ask for it, older clients keep getting the full list."""
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
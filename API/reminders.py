@@ -0,0 +1,246 @@
+import heapq
+import inspect
+import json
+import os
+import threading
+from datetime import timedelta
+from queue import Queue
+from django.conf import settings
+from django.db.models import Max, Q
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+from django.utils.timezone import is_naive, make_aware, now
+from .models import TaskToCheck
+
+
+# Columns of a reminder event, fetched with the pending tasks
+REMINDER_FIELDS = (
+    'id',
+    'due_date',
+    'user_plant_task__name',
+    'user_plant_task__user_plant_id',
+    'user_plant_task__user_plant__nickname',
+    'user_plant_task__user_plant__user_id',
+)
+
+
+# Sinks receive one dict per reminder. Any class with an emit(event) method
+# can be plugged in through settings.REMINDER_SINK. get_sink() passes it the
+# options its constructor declares and drops the others.
+
+class JsonlFileSink:
+    """Append reminders to a JSON Lines file (stand-in for a push/queue service)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def emit(self, event):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, cls=DjangoJSONEncoder) + '\n')
+
+
+class QueueSink:
+    """Put reminders on a queue.Queue (a new one by default), for an in-process consumer."""
+
+    def __init__(self, queue=None):
+        self.queue = queue if queue is not None else Queue()
+
+    def emit(self, event):
+        self.queue.put(event)
+
+
+def get_sink(**options):
+    sink_class = import_string(getattr(settings, 'REMINDER_SINK', 'API.reminders.JsonlFileSink'))
+    parameters = inspect.signature(sink_class).parameters
+    if not any(parameter.kind == parameter.VAR_KEYWORD for parameter in parameters.values()):
+        options = {name: value for name, value in options.items() if name in parameters}
+    return sink_class(**options)
+
+
+def aware(value):
+    """value, in the current time zone if it is naive (due dates are aware: the two are compared)."""
+    return make_aware(value) if is_naive(value) else value
+
+
+def reminder_event(row):
+    return {
+        'type': 'task_due',
+        'task_id': row['id'],
+        'user_id': row['user_plant_task__user_plant__user_id'],
+        'user_plant_id': row['user_plant_task__user_plant_id'],
+        'task_name': row['user_plant_task__name'],
+        'plant_nickname': row['user_plant_task__user_plant__nickname'],
+        'due_date': row['due_date'],
+    }
+
+
+class ReminderDispatcher:
+    """
+    Emit a reminder when each incomplete TaskToCheck becomes due.
+
+    Upcoming tasks are kept in a min-heap ordered by (due date, id). Only the
+    tasks after the watermark (the last (due date, id) already dispatched)
+    and up to now + lookahead are loaded, through a range scan on the partial
+    due_date index of incomplete tasks, so memory is bounded by the
+    look-ahead window (and max_batch). Keying on the id too means rows tied
+    on the due date at a batch cut are neither skipped nor sent twice.
+
+    Tasks created already due, below a watermark that has moved on, are
+    never in a window: every load also sweeps the rows created since the
+    previous load (an id range on the primary key) that are below the
+    watermark, and queues them.
+
+    The watermark and the last swept id are saved to state_path after every
+    load and dispatch, so a restart resumes from there instead of rescanning
+    the table. The window is reloaded every refresh_interval to pick up new
+    tasks, and tasks completed in the meantime are skipped.
+    """
+
+    def __init__(self, sink, lookahead=timedelta(hours=1), refresh_interval=timedelta(minutes=1),
+                 state_path=None, max_batch=10000, since=None, clock=now):
+        self.sink = sink
+        self.lookahead = lookahead
+        self.refresh_interval = refresh_interval
+        self.state_path = state_path
+        self.max_batch = max_batch
+        self.clock = clock
+
+        self.heap = []
+        self.queued = set()
+        self.loaded_until = None
+        # Ids loaded by a window though created after its sweep bound: not swept again
+        self.loaded_ahead = set()
+
+        state = self.load_state()
+        self.resumed = state is not None
+        if state:
+            self.watermark = aware(parse_datetime(state['watermark']))
+            self.watermark_id = state['watermark_id']
+            self.swept_id = state['swept_id']
+        else:
+            self.watermark = aware(since) if since else self.clock()
+            self.watermark_id = 0
+            # Set by the first load: rows older than the dispatcher are not swept
+            self.swept_id = None
+
+    def load_state(self):
+        """The state saved by a previous run, or None."""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return None
+        with open(self.state_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'watermark': self.watermark.isoformat(),
+                'watermark_id': self.watermark_id,
+                'swept_id': self.swept_id,
+            }, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _queue(self, rows):
+        for row in rows:
+            if row['id'] not in self.queued:
+                self.queued.add(row['id'])
+                heapq.heappush(self.heap, (row['due_date'], row['id'], row))
+
+    def _pending(self):
+        return TaskToCheck.objects.filter(is_completed=False, user_plant_task__isnull=False)
+
+    def sweep(self, until_id):
+        """Queue the pending tasks with an id up to until_id created since the last sweep, at or below the watermark."""
+        rows = list(
+            self._pending().filter(
+                id__gt=self.swept_id,
+                id__lte=until_id,
+                due_date__lte=self.watermark,
+            ).exclude(
+                Q(due_date=self.watermark, id__gt=self.watermark_id) | Q(id__in=self.loaded_ahead)
+            ).order_by('id').values(*REMINDER_FIELDS)[:self.max_batch]
+        )
+        self._queue(rows)
+        self.swept_id = rows[-1]['id'] if len(rows) == self.max_batch else until_id
+        self.loaded_ahead = {task_id for task_id in self.loaded_ahead if task_id > self.swept_id}
+        return len(rows)
+
+    def load_window(self):
+        """Queue the missed tasks (see sweep) and the pending tasks due after the watermark, up to now + lookahead."""
+        # Taken before the window is read: rows created in between are left to the next sweep
+        until_id = TaskToCheck.objects.aggregate(last=Max('id'))['last'] or 0
+        if self.swept_id is None:
+            self.swept_id = until_id
+        swept = self.sweep(until_id)
+
+        horizon = self.clock() + self.lookahead
+        rows = list(
+            self._pending().filter(
+                due_date__gte=self.watermark,
+                due_date__lte=horizon,
+            ).exclude(
+                due_date=self.watermark, id__lte=self.watermark_id,
+            ).order_by('due_date', 'id').values(*REMINDER_FIELDS)[:self.max_batch]
+        )
+        self._queue(rows)
+        self.loaded_ahead.update(row['id'] for row in rows if row['id'] > self.swept_id)
+
+        # A full batch means the window wasn't read to the end yet
+        self.loaded_until = rows[-1]['due_date'] if len(rows) == self.max_batch else horizon
+        self._save_state()
+        return swept + len(rows)
+
+    def dispatch_due(self):
+        """Emit the reminders of the queued tasks that are due now. Returns how many were sent."""
+        current_time = self.clock()
+        due = []
+        while self.heap and self.heap[0][0] <= current_time:
+            due.append(heapq.heappop(self.heap)[2])
+        if not due:
+            return 0
+
+        # Skip the tasks completed (or deleted) since they were queued
+        still_pending = set(
+            TaskToCheck.objects.filter(pk__in=[row['id'] for row in due], is_completed=False)
+            .values_list('pk', flat=True)
+        )
+        sent = 0
+        for row in due:
+            self.queued.discard(row['id'])
+            if row['id'] in still_pending:
+                self.sink.emit(reminder_event(row))
+                sent += 1
+
+        # Swept rows are below the watermark: it only moves forward
+        self.watermark, self.watermark_id = max(
+            (self.watermark, self.watermark_id), (due[-1]['due_date'], due[-1]['id'])
+        )
+        self._save_state()
+        return sent
+
+    def next_wakeup(self):
+        """Seconds to sleep until the next task is due or the window needs reloading."""
+        current_time = self.clock()
+        wake_at = current_time + self.refresh_interval
+        if self.loaded_until is not None:
+            wake_at = min(wake_at, self.loaded_until)
+        if self.heap:
+            wake_at = min(wake_at, self.heap[0][0])
+        return max(0.0, (wake_at - current_time).total_seconds())
+
+    def run(self, stop_event=None):
+        """Dispatch reminders until stop_event is set."""
+        stop_event = stop_event or threading.Event()
+        last_load = None
+        while not stop_event.is_set():
+            current_time = self.clock()
+            if last_load is None or current_time >= last_load + self.refresh_interval or (
+                self.loaded_until is not None and current_time >= self.loaded_until
+            ):
+                self.load_window()
+                last_load = current_time
+            self.dispatch_due()
+            stop_event.wait(self.next_wakeup())
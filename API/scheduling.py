@@ -0,0 +1,69 @@
+import calendar
+from datetime import timedelta
+from functools import lru_cache
+from django.utils import timezone
+
+
+# Fixed-length units; months are handled with calendar arithmetic
+UNIT_DELTAS = {
+    'day': lambda interval: timedelta(days=interval),
+    'week': lambda interval: timedelta(weeks=interval),
+}
+
+
+@lru_cache(maxsize=None)
+def _days_in_month(year, month):
+    return calendar.monthrange(year, month)[1]
+
+
+def add_months(value, months):
+    """
+    Add calendar months to a date/datetime, clamping the day to the end of
+    shorter months (Jan 31 + 1 month = Feb 28/29).
+    """
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    return value.replace(year=year, month=month, day=min(value.day, _days_in_month(year, month)))
+
+
+def next_due_dates(last_completed_ats, intervals, units, now=None):
+    """
+    Compute the next due date of many tasks in one call.
+
+    Takes three parallel sequences (last completion, interval, unit) and
+    returns the due dates in the same order. Tasks never completed are due
+    `now` (defaults to the current time, like calculate_next_due_date).
+    Day/week offsets are computed once per distinct (unit, interval) and
+    months use calendar arithmetic, so monthly tasks don't drift.
+    """
+    if now is None:
+        now = timezone.now()
+
+    deltas = {}
+    results = []
+    append = results.append
+    for last_completed_at, interval, unit in zip(last_completed_ats, intervals, units):
+        if last_completed_at is None:
+            append(now)
+        elif unit == 'month':
+            append(add_months(last_completed_at, interval))
+        else:
+            delta = deltas.get((unit, interval))
+            if delta is None:
+                make_delta = UNIT_DELTAS.get(unit)
+                delta = deltas[(unit, interval)] = make_delta(interval) if make_delta else timedelta(0)
+            append(last_completed_at + delta)
+    return results
+
+
+def next_due_date(last_completed_at, interval, unit, now=None):
+    """Next due date of a single task (see next_due_dates)."""
+    return next_due_dates([last_completed_at], [interval], [unit], now)[0]
+
+
+def legacy_due_date(last_completed_at, interval, unit):
+    """Due date as computed before calendar months (a month was 4 weeks), to recognise the checks scheduled that way."""
+    if unit == 'month':
+        return last_completed_at + timedelta(weeks=4 * interval)
+    return next_due_date(last_completed_at, interval, unit)
@@ -0,0 +1,77 @@
+import re
+from django.conf import settings
+from django.db import connection, models, transaction, DatabaseError
+from .models import Plant
+
+
+# Default and maximum number of plants returned by a catalog search
+PLANT_SEARCH_LIMIT = getattr(settings, 'PLANT_SEARCH_LIMIT', 50)
+PLANT_SEARCH_MAX_LIMIT = getattr(settings, 'PLANT_SEARCH_MAX_LIMIT', 200)
+
+# FTS5 index created by migration 0005 (SQLite only)
+PLANT_FTS_TABLE = 'API_plant_fts'
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(search):
+    """
+    Turn free text typed in the search box into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term ("mon"*), so partial words match
+    while typing and FTS5 operators in the input are treated as plain text.
+    Returns None when the input has no searchable word.
+    """
+    words = _WORD_RE.findall(search)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _fts_plant_ids(match, limit):
+    # Best matches first (bm25, species name weighted over scientific name)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {PLANT_FTS_TABLE} WHERE {PLANT_FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({PLANT_FTS_TABLE}, 2.0, 1.0) LIMIT %s",
+            [match, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _like_search(search, limit):
+    return list(
+        Plant.objects.filter(
+            models.Q(species_name__icontains=search) |
+            models.Q(scientific_name__icontains=search)
+        )[:limit]
+    )
+
+
+def search_plants(search, limit=None):
+    """
+    Search the plant catalog by species or scientific name.
+
+    Uses the FTS5 index on SQLite (ranked, prefix matching) and falls back to
+    a LIKE scan on other databases or when the index is missing. Returns at
+    most `limit` plants, best match first.
+    """
+    if limit is None:
+        limit = PLANT_SEARCH_LIMIT
+    limit = max(1, min(limit, PLANT_SEARCH_MAX_LIMIT))
+
+    if connection.vendor != 'sqlite':
+        return _like_search(search, limit)
+
+    match = build_match_query(search)
+    if match is None:
+        return []
+
+    try:
+        with transaction.atomic():
+            plant_ids = _fts_plant_ids(match, limit)
+    except DatabaseError:
+        return _like_search(search, limit)
+
+    plants = Plant.objects.in_bulk(plant_ids)
+    return [plants[plant_id] for plant_id in plant_ids if plant_id in plants]
@@ -1,15 +1,21 @@
+import logging
 from rest_framework import serializers
 from plantApp import settings
 from .models import UserPlant, Plant, Site, UserPlantTask, TaskToCheck
+from .images import derivative_urls
+
+
+logger = logging.getLogger(__name__)
 
 
 class PlantSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_derivatives = serializers.SerializerMethodField()
 
     class Meta:
         model = Plant
         fields = [
-            'id', 'image', 'species_name', 'scientific_name', 'description',
+            'id', 'image', 'image_derivatives', 'species_name', 'scientific_name', 'description',
             'preferred_light', 'ideal_temp', 'bloom_time', 'toxicity'
         ]
 
@@ -19,6 +25,9 @@ class PlantSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url) if request else obj.image.url
         return None
 
+    def get_image_derivatives(self, obj):
+        return derivative_urls(obj.image, self.context.get('request'))
+
 
 class SiteSerializer(serializers.ModelSerializer):
     class Meta:
@@ -29,6 +38,7 @@ class SiteSerializer(serializers.ModelSerializer):
 class UserPlantSerializer(serializers.ModelSerializer):
     site = SiteSerializer(read_only=True)  # Use SiteSerializer for nested read-only
     plant = PlantSerializer(read_only=True)  # Use PlantSerializer for nested read-only
+    image_derivatives = serializers.SerializerMethodField()  # Thumbnail / WebP URLs of the image
     
     site_id = serializers.PrimaryKeyRelatedField(
         queryset=Site.objects.all(),
@@ -46,12 +56,16 @@ class UserPlantSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = UserPlant
-        fields = ['id', 'plant', 'nickname', 'site', 'site_id', 'added_at', 'image', 'plant_id']
+        fields = ['id', 'plant', 'nickname', 'site', 'site_id', 'added_at', 'image', 'image_derivatives', 'plant_id']
 
     def create(self, validated_data):
-        print("Validated Data:", validated_data)
         user = self.context['request'].user  # Get the user from the request context
-        return UserPlant.objects.create(user=user, **validated_data)
+        user_plant = UserPlant.objects.create(user=user, **validated_data)
+        logger.debug("User plant created", extra={
+            'event': 'user_plant.create', 'user_id': user.pk, 'user_plant_id': user_plant.pk,
+            'plant_id': user_plant.plant_id, 'site_id': user_plant.site_id,
+        })
+        return user_plant
 
     def update(self, instance, validated_data):
         # Handle `site` updates via `site_id`
@@ -63,11 +77,12 @@ class UserPlantSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
-        print("Validated data:", validated_data)
-        print("Instance site before save:", instance.site)
-
         # Save the instance
         instance.save()
+        logger.debug("User plant updated", extra={
+            'event': 'user_plant.update', 'user_plant_id': instance.pk,
+            'fields': sorted(validated_data), 'site_id': instance.site_id,
+        })
         return instance
     
     def get_image(self, obj):
@@ -75,6 +90,9 @@ class UserPlantSerializer(serializers.ModelSerializer):
         if obj.image:
             return request.build_absolute_uri(obj.image.url) if request else obj.image.url
         return None
+
+    def get_image_derivatives(self, obj):
+        return derivative_urls(obj.image, self.context.get('request'))
     
     
 class UserPlantTaskSerializer(serializers.ModelSerializer):
@@ -0,0 +1,102 @@
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete
+from django.db import transaction
+from django.dispatch import receiver
+from .models import Plant, UserPlant, Site, UserPlantTask, TaskToCheck
+from .calendar_cache import invalidate_calendar
+from .bundles import schedule_export
+from .catalog import bump_catalog_version, catalog_changed
+from .images import schedule_derivatives
+from .storage import release, release_replaced_file, remember_file_name
+
+
+def _owner_of_user_plant(user_plant_id):
+    return UserPlant.objects.filter(pk=user_plant_id).values_list('user_id', flat=True).first()
+
+
+def _owner_of_user_plant_task(user_plant_task_id):
+    return UserPlantTask.objects.filter(pk=user_plant_task_id).values_list('user_plant__user_id', flat=True).first()
+
+
+# Keep the cached homepage calendars in sync with every write that can change them
+
+@receiver([post_save, post_delete], sender=UserPlant)
+@receiver([post_save, post_delete], sender=Site)
+def invalidate_owner_calendar(sender, instance, **kwargs):
+    invalidate_calendar(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=UserPlantTask)
+def invalidate_task_calendar(sender, instance, **kwargs):
+    # Avoid a query when the plant was already loaded by the caller
+    if UserPlantTask.user_plant.is_cached(instance):
+        invalidate_calendar(instance.user_plant.user_id)
+    else:
+        invalidate_calendar(_owner_of_user_plant(instance.user_plant_id))
+
+
+@receiver([post_save, post_delete], sender=TaskToCheck)
+def invalidate_check_calendar(sender, instance, **kwargs):
+    if instance.owner_id is not None:
+        invalidate_calendar(instance.owner_id)
+    elif instance.user_plant_task_id is not None:
+        invalidate_calendar(_owner_of_user_plant_task(instance.user_plant_task_id))
+
+
+# A task's completion history goes with it in both tables: the archived rows
+# cascade, the live completed checks are deleted here (before SET_NULL would
+# unlink them). Its calendar is dropped by invalidate_task_calendar.
+
+@receiver(pre_delete, sender=UserPlantTask)
+def delete_task_history(sender, instance, **kwargs):
+    TaskToCheck.delete_completed('user_plant_task_id = %s', [instance.pk])
+
+
+# New catalog version (and ETags) whenever a plant species changes
+
+@receiver([post_save, post_delete], sender=Plant)
+def bump_plant_catalog_version(sender, **kwargs):
+    bump_catalog_version()
+
+
+# Re-export the offline bundle in the background (requests never wait for it)
+
+@receiver(catalog_changed)
+def export_catalog_bundle(sender, **kwargs):
+    schedule_export()
+
+
+# Generate thumbnails / WebP copies of uploaded images in the background.
+# Catalog responses list their URLs: new version once they are written.
+
+@receiver(post_save, sender=Plant)
+def generate_plant_image_derivatives(sender, instance, **kwargs):
+    schedule_derivatives(instance.image, on_generated=bump_catalog_version)
+
+
+@receiver(post_save, sender=UserPlant)
+def generate_image_derivatives(sender, instance, **kwargs):
+    # The homepage calendar shows the thumbnail
+    user_id = instance.user_id
+    schedule_derivatives(instance.image, on_generated=lambda: invalidate_calendar(user_id))
+
+
+# Shared content-addressed files are deleted with the last row using them,
+# when it is deleted or given another image (API, admin)
+
+@receiver(post_delete, sender=Plant)
+@receiver(post_delete, sender=UserPlant)
+def release_image(sender, instance, **kwargs):
+    if instance.image:
+        transaction.on_commit(lambda: release(instance.image.name))
+
+
+@receiver(post_init, sender=Plant)
+@receiver(post_init, sender=UserPlant)
+def remember_image(sender, instance, **kwargs):
+    remember_file_name(instance, 'image')
+
+
+@receiver(post_save, sender=Plant)
+@receiver(post_save, sender=UserPlant)
+def release_replaced_image(sender, instance, created, update_fields=None, **kwargs):
+    release_replaced_file(instance, 'image', created=created, update_fields=update_fields)
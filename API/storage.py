@@ -0,0 +1,134 @@
+import hashlib
+import os
+import re
+import uuid
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import models, transaction
+
+
+# Uploaded files are stored once per content under content/<2 hex>/<sha256><ext>
+CONTENT_DIR = 'content'
+HASHED_NAME_RE = re.compile(rf'^{CONTENT_DIR}/[0-9a-f]{{2}}/[0-9a-f]{{64}}(\.[\w]+)?$')
+
+# Suffixes of the files being written (ContentAddressedStorage.save) or deleted (release)
+TEMPORARY_SUFFIX = '.tmp'
+RELEASED_SUFFIX = '.released'
+
+
+def content_hash(content):
+    """SHA-256 of a django File, read in chunks."""
+    sha = hashlib.sha256()
+    for chunk in content.chunks():
+        sha.update(chunk)
+    content.seek(0)
+    return sha.hexdigest()
+
+
+def hashed_name(digest, original_name):
+    _, extension = os.path.splitext(original_name)
+    return f"{CONTENT_DIR}/{digest[:2]}/{digest}{extension.lower()}"
+
+
+def is_transient_name(name):
+    """True for the files save() and release() move in and out of place, which are never served."""
+    return bool(name) and name.endswith((TEMPORARY_SUFFIX, RELEASED_SUFFIX))
+
+
+def is_hashed_name(name):
+    """True for content-addressed names, whose content never changes (safe to cache forever)."""
+    return bool(name and HASHED_NAME_RE.match(name))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names every file after the SHA-256 of its content.
+
+    Uploading the same image twice (or for different models) stores it once
+    and returns the same name, so its URL is immutable. Files are shared
+    between rows, which is why they are only deleted through release() once
+    no model references them anymore. Names saved before this storage was
+    introduced keep working unchanged.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        name = hashed_name(content_hash(content), name)
+        if self.exists(name):
+            return name
+        # Written aside, then moved into place: a concurrent upload of the same
+        # content swaps in identical bytes (instead of falling back to a
+        # random, non-hashed name) and readers never see a half-written file
+        temporary = self._save(f"{name}.{uuid.uuid4().hex}{TEMPORARY_SUFFIX}", content)
+        os.replace(self.path(temporary), self.path(name))
+        return name
+
+
+def file_fields():
+    """(model, field name) of every FileField stored in the default storage."""
+    return [
+        (model, field.name)
+        for model in apps.get_models()
+        for field in model._meta.get_fields()
+        if isinstance(field, models.FileField) and field.storage is default_storage
+    ]
+
+
+def refcount(name):
+    """Number of rows, across all models, whose file fields point at `name`."""
+    return sum(
+        model._default_manager.filter(**{field_name: name}).count()
+        for model, field_name in file_fields()
+    )
+
+
+def release(name):
+    """
+    Delete a content-addressed file once nothing references it anymore.
+
+    Call after the referencing row was deleted or pointed elsewhere. Files
+    saved under their original names are left alone.
+
+    An upload of the same content gets the existing name back, so the file
+    is first moved aside and the references counted again: it is put back
+    if a row (committed in between) points at it. A row saved in a
+    transaction that isn't committed by then can still lose its file.
+    """
+    if not is_hashed_name(name) or refcount(name):
+        return False
+
+    released = f"{name}.{uuid.uuid4().hex}{RELEASED_SUFFIX}"
+    try:
+        os.replace(default_storage.path(name), default_storage.path(released))
+    except FileNotFoundError:
+        return False
+    if refcount(name):
+        os.replace(default_storage.path(released), default_storage.path(name))
+        return False
+
+    from .images import delete_derivatives
+    delete_derivatives(name)
+    default_storage.delete(released)
+    return True
+
+
+def remember_file_name(instance, field_name='image'):
+    """Record the name a file field has in the database (post_init, post_save), to notice when it is replaced."""
+    value = instance.__dict__.get(field_name)
+    setattr(instance, f'_stored_{field_name}', getattr(value, 'name', value) or None)
+
+
+def release_replaced_file(instance, field_name='image', created=False, update_fields=None):
+    """post_save: release the file a saved row stopped pointing at, once the transaction commits."""
+    if update_fields is not None and field_name not in update_fields:
+        return
+    previous = getattr(instance, f'_stored_{field_name}', None)
+    remember_file_name(instance, field_name)
+    current = getattr(instance, f'_stored_{field_name}')
+    if not created and previous and previous != current:
+        transaction.on_commit(lambda: release(previous))
@@ -1,3 +1,1693 @@
-from django.test import TestCase
+import gzip
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+import warnings
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from importlib import import_module
+from io import BytesIO, StringIO
+from unittest import mock
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import caches
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models.signals import post_delete
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import is_aware, localtime, now
+from django.utils.translation import gettext_lazy
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+from API_pets.models import Pet
+from plantApp import renderers
+from plantApp.log import BackgroundHandler, JsonFormatter, SamplingFilter, parse_log_levels
+from plantApp.middleware import QueryBudgetExceeded, QueryBudgetMiddleware
+from users.models import User
+from .bundles import (
+    BUNDLE_EXPORT_LOCK_KEY, BUNDLE_RETRY_AFTER, bundle_dir, bundle_name, current_bundle_version, delta_name,
+    export_bundle, read_manifest, refresh_bundle,
+)
+from .calendar_cache import (
+    CALENDAR_CACHE_ALIAS, CALENDAR_CACHE_SLACK_DAYS, calendar_cache_key, get_homepage_feed, invalidate_calendar,
+)
+from .checks import check_shared_caches
+from .catalog import catalog_cache, get_catalog_version
+from .fast_serializers import PlantFastSerializer, UserPlantFastSerializer
+from .images import delete_derivatives, derivative_name, derivative_storage, generate_derivatives, generated_derivatives
+from .history import acompleted_task_details, completed_task_details, daily_counts, parse_history_range
+from .media import parse_range
+from .models import Plant, Site, UserPlant, UserPlantTask, TaskToCheck, TaskHistory, TasksAlreadyCompleted
+from .pagination import IdCursorPagination
+from .reminders import JsonlFileSink, QueueSink, ReminderDispatcher, get_sink
+from .search import build_match_query, search_plants
+from .scheduling import add_months, next_due_date, next_due_dates
+from .serializers import PlantSerializer, UserPlantSerializer
+from .storage import hashed_name, is_hashed_name, release
 
-# Create your tests here.
+
+def make_plant(species_name, **overrides):
+    fields = dict(
+        scientific_name=species_name, preferred_light='Bright', ideal_temp='20C',
+        toxicity='Toxic', ideal_water='Weekly',
+    )
+    fields.update(overrides)
+    return Plant.objects.create(species_name=species_name, **fields)
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='budget@example.com', username='budget', password='pw')
+        cls.plant = make_plant('Monstera', scientific_name='Monstera deliciosa')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @override_settings(QUERY_BUDGETS={'plant-list': 0})
+    def test_over_budget_fails_in_tests(self):
+        # QUERY_BUDGET_RAISE is turned on by the test runner
+        with self.assertRaises(QueryBudgetExceeded), self.assertLogs('django.request', level='ERROR'):
+            self.client.get('/api/plants/')
+
+    @override_settings(QUERY_BUDGETS={'plant-list': 0}, QUERY_BUDGET_RAISE=False)
+    def test_over_budget_only_warns_in_production(self):
+        with self.assertLogs('plantApp.middleware', level='WARNING') as logs:
+            response = self.client.get('/api/plants/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('plant-list', logs.output[0])
+
+    @override_settings(QUERY_BUDGETS={'plant-list': 1}, QUERY_BUDGET_RAISE=True, DEBUG=True)
+    def test_query_count_header_in_debug(self):
+        response = self.client.get('/api/plants/')
+        self.assertEqual(response['X-Query-Count'], '1')
+        self.assertIn('db;desc="1 queries"', response['Server-Timing'])
+
+    def test_no_header_without_debug(self):
+        response = self.client.get('/api/plants/')
+        self.assertNotIn('X-Query-Count', response)
+
+    def test_slow_query_logged_with_call_site(self):
+        with mock.patch('plantApp.middleware.SLOW_QUERY_MS', 0), \
+                self.assertLogs('plantApp.middleware', level='WARNING') as logs:
+            self.client.get(f'/api/plants/{self.plant.pk}/')
+        self.assertIn('API/views.py:', logs.output[0])
+
+    def test_async_capable(self):
+        async def get_response(request):
+            pass
+
+        self.assertTrue(iscoroutinefunction(QueryBudgetMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(QueryBudgetMiddleware(lambda request: None)))
+
+    @override_settings(DEBUG=True)
+    async def test_async_view_queries_counted(self):
+        token = await Token.objects.acreate(user=self.user)
+        response = await self.async_client.get(
+            '/api/async/tasks/homepage-tasks/', headers={'authorization': f'Token {token.key}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response['X-Query-Count']), 0)
+
+
+class CalendarCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='calendar@example.com', username='calendar', password='pw')
+        plant = make_plant('Monstera', scientific_name='Monstera deliciosa')
+        cls.site = Site.objects.create(user=cls.user, name='Kitchen', light='low', location='indoor')
+        cls.user_plant = UserPlant.objects.create(user=cls.user, plant=plant, site=cls.site, nickname='Monty')
+        cls.task = UserPlantTask.objects.create(user_plant=cls.user_plant, name='watering')
+        cls.today = datetime(2026, 3, 10, tzinfo=dt_timezone.utc)
+        cls.check = TaskToCheck.objects.create(user_plant_task=cls.task, due_date=cls.today + timedelta(hours=9))
+
+    def setUp(self):
+        caches[CALENDAR_CACHE_ALIAS].clear()
+
+    def feed(self, today=None):
+        return get_homepage_feed(self.user, today or self.today)
+
+    def cached(self):
+        return caches[CALENDAR_CACHE_ALIAS].get(calendar_cache_key(self.user.pk)) is not None
+
+    def test_served_from_cache(self):
+        with self.assertNumQueries(1):
+            first = self.feed()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.feed(), first)
+
+    def test_invalidated_by_writes(self):
+        writes = {
+            'user plant': lambda: UserPlant.objects.get(pk=self.user_plant.pk).save(),
+            'site': lambda: Site.objects.get(pk=self.site.pk).save(),
+            'task': lambda: UserPlantTask.objects.get(pk=self.task.pk).save(),
+            'check': lambda: TaskToCheck.objects.get(pk=self.check.pk).save(),
+            'new check': lambda: TaskToCheck.objects.create(user_plant_task=self.task, due_date=self.today),
+            'deleted check': lambda: TaskToCheck.objects.filter(due_date=self.today).delete(),
+        }
+        for name, write in writes.items():
+            with self.subTest(name):
+                self.feed()
+                self.assertTrue(self.cached())
+                write()
+                self.assertFalse(self.cached())
+
+    def test_other_users_calendar_kept(self):
+        other = User.objects.create_user(email='calendar2@example.com', username='calendar2', password='pw')
+        self.feed()
+        Site.objects.create(user=other, name='Office', light='low', location='indoor')
+        self.assertTrue(self.cached())
+
+    def test_midnight_rolls_over_without_query(self):
+        self.feed()
+        tomorrow = self.today + timedelta(days=1)
+        with self.assertNumQueries(0):
+            feed = self.feed(tomorrow)
+        self.assertEqual(feed['start_date'], '2026-03-11')
+        # Not completed yesterday: overdue, repeated under today
+        overdue = feed['tasks_by_date']['2026-03-11']['due_tasks']
+        self.assertEqual([(task['id'], task['overdue_since']) for task in overdue], [(self.check.pk, '2026-03-10')])
+        self.assertTrue(feed['tasks_by_date']['2026-03-10']['overdue'])
+
+    def test_rebuilt_past_horizon(self):
+        self.feed()
+        with self.assertNumQueries(0):
+            self.feed(self.today + timedelta(days=CALENDAR_CACHE_SLACK_DAYS))
+        with self.assertNumQueries(1):
+            self.feed(self.today + timedelta(days=CALENDAR_CACHE_SLACK_DAYS + 1))
+
+
+class PlantSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.monstera = make_plant('Monstera', scientific_name='Monstera deliciosa')
+        cls.swiss_cheese = make_plant('Swiss cheese plant', scientific_name='Monstera adansonii')
+        cls.fern = make_plant('Boston fern', scientific_name='Nephrolepis exaltata')
+
+    def test_match_query(self):
+        self.assertEqual(build_match_query('mon del'), '"mon"* "del"*')
+        # FTS5 syntax in the input is plain text
+        self.assertEqual(build_match_query('fern" OR NEAR(x*'), '"fern"* "OR"* "NEAR"* "x"*')
+        self.assertEqual(build_match_query('Éphé'), '"Éphé"*')
+        self.assertIsNone(build_match_query(' "*- '))
+
+    def test_prefix_search_ranks_species_name_first(self):
+        self.assertEqual(search_plants('monst'), [self.monstera, self.swiss_cheese])
+        self.assertEqual(search_plants('neph exal'), [self.fern])
+        self.assertEqual(search_plants('"*'), [])
+        self.assertEqual(search_plants('monst', limit=1), [self.monstera])
+
+    def test_index_follows_writes(self):
+        self.fern.species_name = 'Sword fern'
+        self.fern.save()
+        self.assertEqual(search_plants('sword'), [self.fern])
+        self.fern.delete()
+        self.assertEqual(search_plants('sword'), [])
+
+    def test_like_fallback_without_index(self):
+        with mock.patch('API.search._fts_plant_ids', side_effect=DatabaseError("no such table")):
+            self.assertEqual(search_plants('adanson'), [self.swiss_cheese])
+
+    def test_plant_list_search(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email='search@example.com', username='search', password='pw'))
+        response = client.get('/api/plants/', {'search': 'boston'})
+        self.assertEqual([plant['id'] for plant in json.loads(response.content)], [self.fern.pk])
+
+
+class CatalogConditionalGetTests(TestCase):
+    """The catalog endpoints answer 304 Not Modified from the version counter alone."""
+
+    def setUp(self):
+        catalog_cache().clear()
+        self.plant = make_plant('Rose', scientific_name='Rosa', toxicity='Non-toxic')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email='etag@example.com', username='etag', password='pw'))
+        self.urls = ['/api/plants/', f'/api/plants/{self.plant.pk}/']
+
+    def test_not_modified_without_queries(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_on_catalog_writes(self):
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        self.plant.ideal_temp = '22C'
+        self.plant.save()
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, headers={'If-None-Match': etags[url]})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etags[url])
+
+        etag = self.client.get('/api/plants/')['ETag']
+        Pet.objects.create(
+            species_name='Dog', scientific_name='Canis', breed_name='Labrador',
+            lifespan='12 years', daily_sleep='12h', gestation='63 days',
+        ).delete()
+        response = self.client.get('/api/plants/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        self.plant.delete()
+        response = self.client.get('/api/plants/', headers={'If-None-Match': etag})
+        self.assertEqual((response.status_code, response.content), (200, b'[]'))
+
+    def test_no_last_modified(self):
+        # Whole-second dates can't tell two writes in the same second apart: ETag only
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertNotIn('Last-Modified', self.client.get(url))
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='pages@example.com', username='pages', password='pw')
+        other = User.objects.create_user(email='pages2@example.com', username='pages2', password='pw')
+        cls.plants = [
+            make_plant(f'Plant {i}', scientific_name=f'Planta {i}', toxicity='Non-toxic')
+            for i in range(5)
+        ]
+        cls.user_plants = [UserPlant.objects.create(user=cls.user, plant=plant) for plant in cls.plants]
+        UserPlant.objects.create(user=other, plant=cls.plants[0])
+
+    def setUp(self):
+        catalog_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url):
+        response = self.client.get(url)
+        return response, json.loads(response.content)
+
+    def test_next_cursors_cover_every_row_once(self):
+        for url, expected in (('/api/plants/', self.plants), ('/api/user-plants/', self.user_plants)):
+            with self.subTest(url=url):
+                ids = []
+                next_url = f'{url}?page_size=2'
+                while next_url:
+                    response, data = self.get(next_url)
+                    self.assertLessEqual(len(data['results']), 2)
+                    ids += [row['id'] for row in data['results']]
+                    next_url = data['next']
+                self.assertEqual(ids, [row.pk for row in expected])
+
+    def test_unpaged_without_parameters(self):
+        for url, expected in (('/api/plants/', self.plants), ('/api/user-plants/', self.user_plants)):
+            with self.subTest(url=url):
+                _, data = self.get(url)
+                self.assertIsInstance(data, list)
+                self.assertEqual([row['id'] for row in data], [row.pk for row in expected])
+
+    def test_page_size_capped(self):
+        with mock.patch.object(IdCursorPagination, 'max_page_size', 3):
+            _, data = self.get('/api/user-plants/?page_size=100')
+        self.assertEqual(len(data['results']), 3)
+        self.assertIsNotNone(data['next'])
+
+    def test_invalid_cursor(self):
+        for url in ('/api/plants/', '/api/user-plants/'):
+            with self.subTest(url=url), self.assertLogs('django.request', level='WARNING'):
+                self.assertEqual(self.client.get(f'{url}?cursor=garbage').status_code, 404)
+
+
+class MediaServingTests(SimpleTestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = self.settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.media_root = media_root
+        self.content = bytes(range(256)) * 4
+        self.hashed = hashed_name('ab' * 32, 'leaf.bin')
+        for name in ('plants/leaf.bin', self.hashed):
+            os.makedirs(os.path.join(media_root, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(media_root, name), 'wb') as f:
+                f.write(self.content)
+
+    def get(self, name='plants/leaf.bin', **headers):
+        return self.client.get(f'/media/{name}', headers=headers)
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_parse_range(self):
+        self.assertIsNone(parse_range(None, 100))
+        self.assertEqual(parse_range('bytes=0-9', 100), (0, 9))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=50-500', 100), (50, 99))
+        self.assertEqual(parse_range('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-500', 100), (0, 99))
+        # Multiple or unknown ranges: the whole file
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 100))
+        self.assertIsNone(parse_range('items=0-1', 100))
+        self.assertIsNone(parse_range('bytes=-', 100))
+        for header in ('bytes=100-', 'bytes=5-2', 'bytes=-0'):
+            with self.subTest(header), self.assertRaises(ValueError):
+                parse_range(header, 100)
+        for header in ('bytes=-10', 'bytes=0-'):
+            with self.subTest(header, size=0), self.assertRaises(ValueError):
+                parse_range(header, 0)
+
+    def test_range_of_empty_file(self):
+        open(os.path.join(self.media_root, 'plants/empty.bin'), 'wb').close()
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.get('plants/empty.bin', Range='bytes=-10')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */0')
+
+    def test_full_response(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+
+        hashed = self.get(self.hashed)
+        self.assertEqual(hashed['ETag'], '"%s"' % ('ab' * 32))
+        self.assertEqual(hashed['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_range(self):
+        response = self.get(Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(self.body(response), self.content[10:20])
+
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.get(Range=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_if_range(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(Range='bytes=0-9', If_Range=etag).status_code, 206)
+        # Changed since: the whole (new) file
+        response = self.get(Range='bytes=0-9', If_Range='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+
+    def test_not_modified(self):
+        first = self.get()
+        response = self.get(If_None_Match=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], first['ETag'])
+        self.assertEqual(self.get(If_None_Match='"other"').status_code, 200)
+        self.assertEqual(self.get(If_Modified_Since=first['Last-Modified']).status_code, 304)
+
+    def test_missing_or_outside_media_root(self):
+        with self.assertLogs('django.request', level='WARNING'):
+            self.assertEqual(self.get('plants/none.bin').status_code, 404)
+        with self.assertLogs('django.request', level='WARNING'):
+            self.assertEqual(self.get('../settings.py').status_code, 404)
+
+    def test_temporary_and_released_files_not_served(self):
+        for suffix in ('.0123abcd.tmp', '.0123abcd.released'):
+            name = self.hashed + suffix
+            with open(os.path.join(self.media_root, name), 'wb') as f:
+                f.write(self.content)
+            with self.subTest(name=name), self.assertLogs('django.request', level='WARNING'):
+                self.assertEqual(self.get(name).status_code, 404)
+            with self.subTest(name=name), mock.patch('API.media.MEDIA_SENDFILE_HEADER', 'X-Accel-Redirect'):
+                with self.assertLogs('django.request', level='WARNING'):
+                    self.assertEqual(self.get(name).status_code, 404)
+
+    def test_sendfile_handoff(self):
+        with mock.patch('API.media.MEDIA_SENDFILE_HEADER', 'X-Accel-Redirect'):
+            response = self.get()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/plants/leaf.bin')
+        self.assertEqual(response.content, b'')
+
+
+class UserPlantDetailViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='detail@example.com', username='detail', password='pw')
+        plant = make_plant('Monstera', scientific_name='Monstera deliciosa')
+        site = Site.objects.create(user=cls.user, name='Kitchen', light='low', location='indoor')
+        cls.user_plant = UserPlant.objects.create(user=cls.user, plant=plant, site=site, nickname='Monty')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_tasks(self, count):
+        """Add `count` tasks, each with an overdue, a due-today, an upcoming and a completed check."""
+        today = now().replace(hour=12, minute=0, second=0, microsecond=0)
+        for i in range(count):
+            task = UserPlantTask.objects.create(user_plant=self.user_plant, name='watering', interval=i + 1, unit='day')
+            TaskToCheck.objects.create(user_plant_task=task, due_date=today - timedelta(days=2))
+            TaskToCheck.objects.create(user_plant_task=task, due_date=today)
+            TaskToCheck.objects.create(user_plant_task=task, due_date=today + timedelta(days=3))
+            TaskToCheck.objects.create(user_plant_task=task, due_date=today - timedelta(days=9), is_completed=True, completed_at=today)
+
+    def get_detail(self):
+        return self.client.get(f'/api/userPlant-details/{self.user_plant.pk}/')
+
+    def test_checks_partitioned_by_due_date(self):
+        self.add_tasks(2)
+        response = self.get_detail()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['tasks']), 2)
+        task_checks = response.data['task_checks']
+        self.assertEqual(len(task_checks['overdue_tasks']), 2)
+        self.assertEqual(len(task_checks['tasks_due_today']), 2)
+        self.assertEqual(len(task_checks['upcoming_tasks']), 2)
+        self.assertEqual(
+            task_checks['upcoming_tasks'][0].keys(), {'task_name', 'due_date', 'interval', 'unit'}
+        )
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        # The plant (with species and site), its tasks, its incomplete checks with their task
+        self.add_tasks(1)
+        with self.assertNumQueries(3):
+            self.get_detail()
+
+        self.add_tasks(10)
+        with self.assertNumQueries(3):
+            response = self.get_detail()
+        self.assertEqual(len(response.data['task_checks']['overdue_tasks']), 11)
+
+    def test_other_users_plant_not_found(self):
+        other = User.objects.create_user(email='other@example.com', username='other', password='pw')
+        self.client.force_authenticate(other)
+        with self.assertLogs('django.request', level='WARNING'):
+            self.assertEqual(self.get_detail().status_code, 404)
+
+
+class AsyncViewParityTests(TestCase):
+    """The /api/async/ views must answer exactly what their sync versions answer."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = self.settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        catalog_cache().clear()
+
+        self.user = User.objects.create_user(email='parity@example.com', username='parity', password='pw')
+        self.headers = {'authorization': f'Token {Token.objects.create(user=self.user).key}'}
+        site = Site.objects.create(user=self.user, name='Kitchen', light='low', location='indoor')
+        plant = make_plant('Monstera', scientific_name='Monstera deliciosa', image=self.image('green'))
+        # Derivatives generated for the first plant only
+        self.user_plant = UserPlant.objects.create(user=self.user, plant=plant, site=site, nickname='Monty',
+                                                   image=self.image('red'))
+        generate_derivatives(self.user_plant.image.name)
+        generate_derivatives(plant.image.name)
+        other = UserPlant.objects.create(user=self.user, plant=plant, image=self.image('blue'))
+
+        today = now().replace(hour=12, minute=0, second=0, microsecond=0)
+        for user_plant in (self.user_plant, other):
+            task = UserPlantTask.objects.create(user_plant=user_plant, name='watering', interval=2, unit='day')
+            TaskToCheck.objects.create(user_plant_task=task, due_date=today - timedelta(days=3))
+            TaskToCheck.objects.create(user_plant_task=task, due_date=today - timedelta(days=5), is_completed=True,
+                                       completed_at=today - timedelta(days=5))
+            TaskToCheck.objects.create(user_plant_task=task, due_date=today)
+            TaskToCheck.objects.create(user_plant_task=task, due_date=today + timedelta(days=4))
+
+    def image(self, colour):
+        content = BytesIO()
+        Image.new('RGB', (8, 8), colour).save(content, 'JPEG')
+        return SimpleUploadedFile(f'{colour}.jpg', content.getvalue(), content_type='image/jpeg')
+
+    def assertSameResponse(self, sync_url, async_url):
+        sync_response = self.client.get(sync_url, headers=self.headers)
+        # Not answered from the calendar cached by the sync view
+        invalidate_calendar(self.user.pk)
+        async_response = async_to_sync(self.async_client.get)(async_url, headers=self.headers)
+        self.assertEqual(sync_response.status_code, 200)
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(json.loads(async_response.content), json.loads(sync_response.content))
+        return json.loads(sync_response.content)
+
+    def test_homepage(self):
+        data = self.assertSameResponse('/api/tasks/homepage-tasks/', '/api/async/tasks/homepage-tasks/')
+        today = data['tasks_by_date'][data['start_date']]['due_tasks']
+        self.assertEqual([task['overdue_since'] is not None for task in today], [False, False, True, True])
+        thumbnails = [task['plant_thumbnail'] for task in today]
+        self.assertIsNotNone(thumbnails[0])
+        self.assertIsNone(thumbnails[1])
+
+    def test_plant_detail(self):
+        data = self.assertSameResponse(
+            f'/api/userPlant-details/{self.user_plant.pk}/', f'/api/async/userPlant-details/{self.user_plant.pk}/'
+        )
+        self.assertEqual([len(checks) for checks in data['task_checks'].values()], [1, 1, 1])
+        self.assertIsNotNone(data['user_plant']['image_derivatives']['thumbnail'])
+        self.assertIsNotNone(data['user_plant']['plant']['image_derivatives']['webp'])
+
+
+class ImageSignalTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = self.settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Run the background generation inline
+        executor = mock.patch('API.images._executor', submit=lambda fn, *args: fn(*args))
+        executor.start()
+        self.addCleanup(executor.stop)
+        catalog_cache().clear()
+
+    def image(self, colour='green'):
+        content = BytesIO()
+        Image.new('RGB', (8, 8), colour).save(content, 'JPEG')
+        return SimpleUploadedFile('rose.jpg', content.getvalue(), content_type='image/jpeg')
+
+    def test_catalog_version_bumped_once_derivatives_written(self):
+        plant = make_plant('Rose', scientific_name='Rosa', toxicity='Non-toxic')
+        with self.captureOnCommitCallbacks() as callbacks:
+            plant.image = self.image()
+            plant.save()
+        version = get_catalog_version()
+        for callback in callbacks:
+            callback()
+        # Bumped again by the derivative worker, after the save
+        self.assertNotEqual(get_catalog_version(), version)
+        # Recorded by the generator: the storage isn't checked again
+        with mock.patch.object(derivative_storage, 'exists') as exists:
+            self.assertIsNotNone(PlantSerializer(plant).data['image_derivatives']['thumbnail'])
+        exists.assert_not_called()
+
+        delete_derivatives(plant.image.name)
+        self.assertEqual(generated_derivatives([plant.image.name]), {plant.image.name: ()})
+
+    def test_calendar_invalidated_once_user_plant_derivatives_written(self):
+        user = User.objects.create_user(email='thumb@example.com', username='thumb', password='pw')
+        plant = make_plant('Rose', scientific_name='Rosa', toxicity='Non-toxic')
+        with self.captureOnCommitCallbacks() as callbacks:
+            user_plant = UserPlant.objects.create(user=user, plant=plant, image=self.image())
+        task = UserPlantTask.objects.create(user_plant=user_plant, name='watering')
+        TaskToCheck.objects.create(user_plant_task=task, due_date=now())
+        client = APIClient()
+        client.force_authenticate(user)
+
+        def thumbnails():
+            feed = client.get('/api/tasks/homepage-tasks/').data['tasks_by_date']
+            return [task['plant_thumbnail'] for day in feed.values() for task in day['due_tasks']]
+
+        self.assertEqual(thumbnails(), [None])
+        for callback in callbacks:
+            callback()
+        self.assertIsNotNone(thumbnails()[0])
+
+    def test_concurrent_uploads_of_same_content_share_the_hashed_name(self):
+        # Both uploads checked before either file was written
+        with mock.patch.object(default_storage, 'exists', return_value=False):
+            names = [default_storage.save('plants/rose.jpg', self.image()) for _ in range(2)]
+        self.assertEqual(names[0], names[1])
+        self.assertTrue(is_hashed_name(names[0]))
+        directory = os.path.dirname(default_storage.path(names[0]))
+        self.assertEqual(os.listdir(directory), [os.path.basename(names[0])])
+
+    def test_release_keeps_file_referenced_meanwhile(self):
+        name = default_storage.save('plants/rose.jpg', self.image())
+        # Unreferenced when counted, then saved by a row before the delete
+        with mock.patch('API.storage.refcount', side_effect=[0, 1]):
+            self.assertFalse(release(name))
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(os.listdir(os.path.dirname(default_storage.path(name))), [os.path.basename(name)])
+
+        self.assertTrue(release(name))
+        self.assertEqual(os.listdir(os.path.dirname(default_storage.path(name))), [])
+
+    def test_replaced_image_released_with_last_reference(self):
+        site = Site.objects.create(user=User.objects.create_user(email='img@example.com', username='img', password='pw'),
+                                   name='Kitchen', light='low', location='indoor')
+        with self.captureOnCommitCallbacks(execute=True):
+            plant = make_plant('Rose', scientific_name='Rosa', toxicity='Non-toxic', image=self.image())
+            # Shares the plant's file
+            user_plant = UserPlant.objects.create(user=site.user, plant=plant, site=site)
+        old_name = plant.image.name
+        old_path = plant.image.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            plant = Plant.objects.get(pk=plant.pk)
+            plant.image = self.image('blue')
+            plant.save()
+        self.assertTrue(os.path.exists(old_path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user_plant = UserPlant.objects.get(pk=user_plant.pk)
+            user_plant.nickname = 'Rosie'
+            user_plant.save(update_fields=['nickname'])
+        self.assertTrue(os.path.exists(old_path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user_plant.image = self.image('red')
+            user_plant.save()
+        self.assertNotEqual(user_plant.image.name, old_name)
+        self.assertFalse(os.path.exists(old_path))
+
+
+class SchedulingTests(SimpleTestCase):
+    def test_add_months_clamps_to_month_end(self):
+        self.assertEqual(add_months(date(2024, 1, 31), 1), date(2024, 2, 29))
+        self.assertEqual(add_months(date(2023, 1, 31), 1), date(2023, 2, 28))
+        self.assertEqual(add_months(date(2023, 3, 31), 1), date(2023, 4, 30))
+        self.assertEqual(add_months(date(2023, 11, 30), 3), date(2024, 2, 29))
+        self.assertEqual(add_months(date(2023, 5, 15), 12), date(2024, 5, 15))
+        completed = datetime(2024, 1, 31, 9, 30, tzinfo=dt_timezone.utc)
+        self.assertEqual(add_months(completed, 1), datetime(2024, 2, 29, 9, 30, tzinfo=dt_timezone.utc))
+
+    def test_next_due_dates_by_unit(self):
+        completed = datetime(2024, 1, 31, 9, 30, tzinfo=dt_timezone.utc)
+        fixed_now = datetime(2024, 3, 1, tzinfo=dt_timezone.utc)
+        self.assertEqual(
+            next_due_dates(
+                [completed, completed, completed, completed, None],
+                [3, 2, 1, 2, 1],
+                ['day', 'week', 'month', 'day', 'week'],
+                now=fixed_now,
+            ),
+            [completed + timedelta(days=3), completed + timedelta(weeks=2),
+             datetime(2024, 2, 29, 9, 30, tzinfo=dt_timezone.utc), completed + timedelta(days=2), fixed_now],
+        )
+
+    def test_never_completed_due_now(self):
+        before = now()
+        due = next_due_date(None, 1, 'day')
+        self.assertTrue(is_aware(due))
+        self.assertTrue(before <= due <= now())
+
+
+class RescheduleTasksTests(TestCase):
+    def test_only_checks_on_old_month_date_move(self):
+        user = User.objects.create_user(email='resched@example.com', username='resched', password='pw')
+        plant = make_plant('Monstera', scientific_name='Monstera deliciosa')
+        user_plant = UserPlant.objects.create(user=user, plant=plant)
+        completed = datetime(2024, 1, 31, 9, 30, tzinfo=dt_timezone.utc)
+
+        def task_with_check(interval, unit, due_date):
+            task = UserPlantTask.objects.create(
+                user_plant=user_plant, name='watering', interval=interval, unit=unit, last_completed_at=completed
+            )
+            return TaskToCheck.objects.create(user_plant_task=task, due_date=due_date)
+
+        # Scheduled with 4 weeks per month
+        legacy = task_with_check(1, 'month', completed + timedelta(weeks=4))
+        # Frequency changed to 2 months after the check was created for 1 month
+        frequency_changed = task_with_check(2, 'month', completed + timedelta(weeks=4))
+        weekly = task_with_check(1, 'week', completed + timedelta(weeks=1, days=1))
+
+        out = StringIO()
+        call_command('reschedule_tasks', stdout=out)
+        self.assertIn("1 pending check(s) rescheduled", out.getvalue())
+        legacy.refresh_from_db()
+        frequency_changed.refresh_from_db()
+        weekly.refresh_from_db()
+        self.assertEqual(legacy.due_date, datetime(2024, 2, 29, 9, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(frequency_changed.due_date, completed + timedelta(weeks=4))
+        self.assertEqual(weekly.due_date, completed + timedelta(weeks=1, days=1))
+
+    def test_never_completed_tasks_left_alone(self):
+        user = User.objects.create_user(email='resched2@example.com', username='resched2', password='pw')
+        plant = make_plant('Monstera', scientific_name='Monstera deliciosa')
+        task = UserPlantTask.objects.create(
+            user_plant=UserPlant.objects.create(user=user, plant=plant), name='fertilizing', interval=1, unit='month'
+        )
+        due = datetime(2024, 1, 31, 9, 30, tzinfo=dt_timezone.utc)
+        check = TaskToCheck.objects.create(user_plant_task=task, due_date=due)
+
+        self.assertEqual(TaskToCheck.reschedule([task]), 0)
+        check.refresh_from_db()
+        self.assertEqual(check.due_date, due)
+
+
+class TaskOwnerTests(TestCase):
+    def test_owner_filled_on_save(self):
+        user = User.objects.create_user(email='owner@example.com', username='owner', password='pw')
+        plant = make_plant('Monstera', scientific_name='Monstera deliciosa')
+        task = UserPlantTask.objects.create(user_plant=UserPlant.objects.create(user=user, plant=plant), name='watering')
+        check = TaskToCheck.objects.create(user_plant_task=task, due_date=now())
+        self.assertEqual(check.owner_id, user.pk)
+
+        client = APIClient()
+        client.force_authenticate(user)
+        feed = client.get('/api/tasks/homepage-tasks/').data['tasks_by_date']
+        self.assertEqual([task['id'] for day in feed.values() for task in day['due_tasks']], [check.pk])
+
+
+class OwnerBackfillMigrationTests(TransactionTestCase):
+    migrate_from = [('API', '0006_tasktocheck_pending_due_idx')]
+    migrate_to = [('API', '0007_tasktocheck_owner')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_owner_backfilled_in_batches(self):
+        apps = self.migrate(self.migrate_from)
+        user = apps.get_model('users', 'User').objects.create(email='backfill@example.com', username='backfill')
+        plant = apps.get_model('API', 'Plant').objects.create(
+            species_name='Monstera', scientific_name='Monstera deliciosa', preferred_light='Bright',
+            ideal_temp='20C', toxicity='Toxic', ideal_water='Weekly',
+        )
+        user_plant = apps.get_model('API', 'UserPlant').objects.create(user=user, plant=plant)
+        task = apps.get_model('API', 'UserPlantTask').objects.create(user_plant=user_plant, name='watering')
+        OldTaskToCheck = apps.get_model('API', 'TaskToCheck')
+        ids = [OldTaskToCheck.objects.create(user_plant_task=task, due_date=now()).pk for _ in range(5)]
+        orphan = OldTaskToCheck.objects.create(user_plant_task=None, due_date=now()).pk
+
+        with mock.patch.object(import_module('API.migrations.0007_tasktocheck_owner'), 'BACKFILL_BATCH_SIZE', 2):
+            apps = self.migrate(self.migrate_to)
+        owners = dict(apps.get_model('API', 'TaskToCheck').objects.values_list('pk', 'owner_id'))
+        self.assertEqual([owners[pk] for pk in ids], [user.pk] * 5)
+        self.assertIsNone(owners[orphan])
+
+
+class CompletedTaskHistoryTests(TestCase):
+    """Completed tasks are read from the live table and the archive, merged."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='history@example.com', username='history', password='pw')
+        plant = make_plant('Monstera', scientific_name='Monstera deliciosa')
+        cls.monty = UserPlant.objects.create(user=cls.user, plant=plant, nickname='Monty')
+        unnamed = UserPlant.objects.create(user=cls.user, plant=plant, nickname='')
+        cls.watering = UserPlantTask.objects.create(user_plant=cls.monty, name='watering')
+        cls.pruning = UserPlantTask.objects.create(user_plant=unnamed, name='pruning')
+
+        def at(day, hour=10):
+            return datetime(2026, 3, day, hour, tzinfo=dt_timezone.utc)
+
+        def live(task, day, **kwargs):
+            return TaskToCheck.objects.create(
+                user_plant_task=task, due_date=at(day), is_completed=True, completed_at=at(day), **kwargs
+            ).pk
+
+        def archived(task, day):
+            # Archived rows keep the id of their check
+            task_id = TaskToCheck.objects.create(user_plant_task=task, due_date=at(day)).pk
+            TaskToCheck.objects.filter(pk=task_id).delete()
+            TaskHistory.objects.create(
+                id=task_id, owner=cls.user, user_plant_task=task,
+                task_type=TaskHistory.TASK_TYPE_CODES[task.name], completed_at=at(day),
+            )
+            return task_id
+
+        # Interleaved ids across both tables, two on March 2
+        cls.ids = [
+            archived(cls.watering, 2),
+            live(cls.watering, 2),
+            archived(cls.pruning, 3),
+            live(cls.pruning, 4),
+        ]
+        # Outside the range, incomplete, or another user's: never counted
+        live(cls.watering, 9)
+        TaskToCheck.objects.create(user_plant_task=cls.watering, due_date=at(3))
+        other = User.objects.create_user(email='history2@example.com', username='history2', password='pw')
+        other_task = UserPlantTask.objects.create(user_plant=UserPlant.objects.create(user=other, plant=plant), name='watering')
+        live(other_task, 3)
+
+    def test_daily_counts(self):
+        counts = daily_counts(self.user, date(2026, 3, 1), date(2026, 3, 5))
+        self.assertEqual(counts['total'], 4)
+        self.assertEqual(counts['by_task'], {'watering': 2, 'pruning': 2})
+        self.assertEqual(counts['days'], [
+            {'date': date(2026, 3, 2), 'total': 2, 'by_task': {'watering': 2}},
+            {'date': date(2026, 3, 3), 'total': 1, 'by_task': {'pruning': 1}},
+            {'date': date(2026, 3, 4), 'total': 1, 'by_task': {'pruning': 1}},
+        ])
+
+    def test_details_merged_by_id(self):
+        rows = completed_task_details(self.user, date(2026, 3, 1), date(2026, 3, 5))
+        self.assertEqual([row['id'] for row in rows], sorted(self.ids))
+        by_id = {row['id']: row for row in rows}
+        self.assertEqual(by_id[self.ids[0]]['task_name'], 'watering')
+        self.assertEqual(by_id[self.ids[0]]['plant_name'], 'Monty')
+        # No nickname: the species
+        self.assertEqual(by_id[self.ids[2]]['plant_name'], 'Monstera')
+
+        page = completed_task_details(self.user, date(2026, 3, 1), date(2026, 3, 5), after=self.ids[1], limit=1)
+        self.assertEqual([row['id'] for row in page], [self.ids[2]])
+
+    async def test_async_details(self):
+        rows = await acompleted_task_details(self.user, date(2026, 3, 1), date(2026, 3, 5))
+        self.assertEqual([row['id'] for row in rows], sorted(self.ids))
+        page = await acompleted_task_details(self.user, date(2026, 3, 1), date(2026, 3, 5), after=self.ids[1], limit=1)
+        self.assertEqual([row['id'] for row in page], [self.ids[2]])
+
+    async def test_async_endpoint(self):
+        token = await Token.objects.acreate(user=self.user)
+        response = await self.async_client.get(
+            '/api/async/tasks/completed/2026-03-02/', headers={'authorization': f'Token {token.key}'}
+        )
+        self.assertEqual([row['id'] for row in json.loads(response.content)], sorted(self.ids[:2]))
+
+        with self.assertLogs('django.request', level='WARNING'):
+            response = await self.async_client.get('/api/async/tasks/completed/2026-03-02/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+
+    def test_parse_range(self):
+        self.assertEqual(parse_history_range('2026-03-01', '2026-03-05'), (date(2026, 3, 1), date(2026, 3, 5)))
+        for start, end in ((None, '2026-03-05'), ('2026-03-05', '2026-03-01'), ('2026-02-30', '2026-03-01'),
+                           ('2024-01-01', '2026-01-01')):
+            with self.subTest(start=start, end=end), self.assertRaises(ValueError):
+                parse_history_range(start, end)
+
+    def test_endpoint_pages(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = '/api/tasks/history/?start=2026-03-01&end=2026-03-05&details=1&page_size=3'
+        response = client.get(url)
+        self.assertEqual(response.data['total'], 4)
+        details = response.data['details']
+        self.assertEqual([row['id'] for row in details['results']], sorted(self.ids)[:3])
+        response = client.get(details['next'])
+        self.assertEqual([row['id'] for row in response.data['details']['results']], sorted(self.ids)[3:])
+        self.assertIsNone(response.data['details']['next'])
+
+
+class ArchiveTasksTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='archive@example.com', username='archive', password='pw')
+        plant = make_plant('Monstera', scientific_name='Monstera deliciosa')
+        user_plant = UserPlant.objects.create(user=cls.user, plant=plant)
+        cls.task = UserPlantTask.objects.create(user_plant=user_plant, name='pruning')
+        cls.old = now() - timedelta(days=200)
+
+    def completed(self, completed_at, count=1):
+        return [
+            TaskToCheck.objects.create(
+                user_plant_task=self.task, due_date=completed_at, is_completed=True, completed_at=completed_at
+            ).pk
+            for _ in range(count)
+        ]
+
+    def test_archives_in_batches(self):
+        old_ids = self.completed(self.old, count=5)
+        recent_ids = self.completed(now() - timedelta(days=1))
+        pending = TaskToCheck.objects.create(user_plant_task=self.task, due_date=self.old).pk
+        orphan = self.completed(self.old)[0]
+        TaskToCheck.objects.filter(pk=orphan).update(user_plant_task=None)
+
+        with CaptureQueriesContext(connection) as queries:
+            archived = TaskHistory.archive(now() - timedelta(days=90), batch_size=2)
+        self.assertEqual(archived, 5)
+        # 6 rows (the orphan is dropped) in batches of 2, one insert each
+        self.assertEqual(sum(query['sql'].startswith('INSERT') for query in queries.captured_queries), 3)
+        self.assertEqual(sorted(TaskHistory.objects.values_list('pk', flat=True)), old_ids)
+        self.assertEqual(TaskHistory.objects.get(pk=old_ids[0]).task_type, TaskHistory.TASK_TYPE_CODES['pruning'])
+        self.assertEqual(sorted(TaskToCheck.objects.values_list('pk', flat=True)), sorted(recent_ids + [pending]))
+
+    def test_idempotent(self):
+        old_ids = self.completed(self.old, count=3)
+        # A run interrupted after the insert of its batch
+        TaskHistory.objects.create(
+            id=old_ids[0], owner=self.user, user_plant_task=self.task, task_type=1, completed_at=self.old,
+        )
+        out = StringIO()
+        call_command('archive_tasks', '--days', '90', stdout=out)
+        self.assertIn("3 completed check(s) archived", out.getvalue())
+        self.assertEqual(TaskHistory.archive(now() - timedelta(days=90)), 0)
+        self.assertEqual(TaskHistory.objects.count(), 3)
+        self.assertFalse(TaskToCheck.objects.exists())
+
+    def test_calendars_dropped_once_per_owner(self):
+        self.completed(self.old, count=3)
+        deleted = []
+        post_delete.connect(lambda instance, **kwargs: deleted.append(instance.pk), sender=TaskToCheck, weak=False,
+                            dispatch_uid='archive-test')
+        self.addCleanup(post_delete.disconnect, sender=TaskToCheck, dispatch_uid='archive-test')
+        with mock.patch('API.calendar_cache.invalidate_calendar') as invalidate:
+            self.assertEqual(TaskHistory.archive(now() - timedelta(days=90)), 3)
+        invalidate.assert_called_once_with(self.user.pk)
+        self.assertEqual(deleted, [])
+
+    def test_uncompleted_check_not_deleted(self):
+        kept, moved = self.completed(self.old, count=2)
+        bulk_create = TaskHistory.objects.bulk_create
+
+        # A check un-completed between the read of the batch and its delete
+        def uncomplete_first(objs, **kwargs):
+            TaskToCheck.objects.filter(pk=kept).update(is_completed=False, completed_at=None)
+            return bulk_create([obj for obj in objs if obj.pk != kept], **kwargs)
+
+        with mock.patch.object(TaskHistory.objects, 'bulk_create', side_effect=uncomplete_first):
+            TaskHistory.archive(now() - timedelta(days=90))
+        self.assertTrue(TaskToCheck.objects.filter(pk=kept, is_completed=False).exists())
+        self.assertFalse(TaskToCheck.objects.filter(pk=moved).exists())
+
+    def test_deleted_task_history_gone_from_both_tables(self):
+        self.completed(self.old, count=2)
+        TaskHistory.archive(now() - timedelta(days=90))
+        recent = self.completed(now() - timedelta(days=1))[0]
+        pending = TaskToCheck.objects.create(user_plant_task=self.task, due_date=now())
+        self.assertEqual(len(completed_task_details(self.user, self.old.date(), now().date())), 3)
+
+        self.task.delete()
+        self.assertFalse(TaskHistory.objects.exists())
+        self.assertFalse(TaskToCheck.objects.filter(pk=recent).exists())
+        # Pending checks are only unlinked
+        pending.refresh_from_db()
+        self.assertIsNone(pending.user_plant_task_id)
+        self.assertEqual(completed_task_details(self.user, self.old.date(), now().date()), [])
+
+
+class MarkTasksAsCompletedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='bulk@example.com', username='bulk', password='pw')
+        plant = make_plant('Monstera', scientific_name='Monstera deliciosa')
+        user_plant = UserPlant.objects.create(user=cls.user, plant=plant, nickname='Monty')
+        overdue = now() - timedelta(days=1)
+        cls.watering = UserPlantTask.objects.create(user_plant=user_plant, name='watering', interval=2, unit='day')
+        cls.pruning = UserPlantTask.objects.create(user_plant=user_plant, name='pruning', interval=1, unit='week')
+        cls.checks = [
+            TaskToCheck.objects.create(user_plant_task=task, due_date=overdue)
+            for task in (cls.watering, cls.pruning)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def complete(self, task_ids):
+        return self.client.post('/api/tasks/complete/', {'task_ids': task_ids}, format='json')
+
+    def assertRejected(self, task_ids, status_code):
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.complete(task_ids)
+        self.assertEqual(response.status_code, status_code)
+        self.assertFalse(TaskToCheck.objects.filter(is_completed=True).exists())
+        return response
+
+    def test_completes_and_schedules_next_cycle(self):
+        ids = [check.pk for check in self.checks]
+        response = self.complete(ids + ids[:1])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task['task_id'] for task in response.data['tasks']], ids)
+        for check, task, days in zip(self.checks, (self.watering, self.pruning), (2, 7)):
+            check.refresh_from_db()
+            task.refresh_from_db()
+            self.assertTrue(check.is_completed)
+            self.assertEqual(task.last_completed_at, check.completed_at)
+            new_check = TaskToCheck.objects.get(user_plant_task=task, is_completed=False)
+            self.assertEqual(new_check.owner_id, self.user.pk)
+            self.assertEqual(new_check.due_date, check.completed_at + timedelta(days=days))
+
+    def test_homepage_calendar_invalidated(self):
+        self.client.get('/api/tasks/homepage-tasks/')
+        response = self.complete([self.checks[0].pk])
+        new_id = response.data['tasks'][0]['new_task_id']
+
+        feed = self.client.get('/api/tasks/homepage-tasks/').data['tasks_by_date']
+        tasks = {task['id']: task for day in feed.values() for task in day['due_tasks']}
+        self.assertTrue(tasks[self.checks[0].pk]['is_completed'])
+        self.assertIn(new_id, tasks)
+
+    def test_only_integer_ids(self):
+        for task_ids in ([], 'nope', [True], [1.7], [str(self.checks[0].pk)], [None]):
+            with self.subTest(task_ids=task_ids):
+                self.assertRejected(task_ids, 400)
+
+    def test_too_many_ids(self):
+        response = self.assertRejected(list(range(1, 202)), 400)
+        self.assertIn('200', response.data['error'])
+
+    def test_single_completion_stamps_aware_time(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            response = self.client.post(f'/api/tasks/{self.checks[0].pk}/complete/')
+        self.assertEqual(response.status_code, 200)
+        self.checks[0].refresh_from_db()
+        self.assertTrue(is_aware(self.checks[0].completed_at))
+        self.assertLess(now() - self.checks[0].completed_at, timedelta(minutes=1))
+
+    def test_missing_or_other_users_tasks(self):
+        other = User.objects.create_user(email='bulk2@example.com', username='bulk2', password='pw')
+        other_plant = UserPlant.objects.create(user=other, plant=self.watering.user_plant.plant)
+        other_task = UserPlantTask.objects.create(user_plant=other_plant, name='watering')
+        other_check = TaskToCheck.objects.create(user_plant_task=other_task, due_date=now())
+
+        response = self.assertRejected([self.checks[0].pk, other_check.pk, 999999], 404)
+        self.assertEqual(response.data['task_ids'], [other_check.pk, 999999])
+
+    def test_already_completed(self):
+        TaskToCheck.objects.filter(pk=self.checks[1].pk).update(is_completed=True)
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.complete([check.pk for check in self.checks])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['task_ids'], [self.checks[1].pk])
+        self.assertFalse(TaskToCheck.objects.get(pk=self.checks[0].pk).is_completed)
+
+    def test_complete_many_twice_with_stale_tasks(self):
+        first = list(TaskToCheck.objects.filter(pk__in=[check.pk for check in self.checks]).select_related('user_plant_task'))
+        second = list(TaskToCheck.objects.filter(pk__in=[check.pk for check in self.checks]).select_related('user_plant_task'))
+        TaskToCheck.complete_many(first)
+        with self.assertRaises(TasksAlreadyCompleted):
+            TaskToCheck.complete_many(second)
+        self.assertFalse(second[0].is_completed)
+        for task in (self.watering, self.pruning):
+            self.assertEqual(TaskToCheck.objects.filter(user_plant_task=task, is_completed=False).count(), 1)
+
+    def test_completed_concurrently(self):
+        ids = [check.pk for check in self.checks]
+        original = TaskToCheck.complete_many.__func__
+
+        def overlapping(cls, tasks):
+            # The other request completes the second task between the load and the update
+            TaskToCheck.objects.filter(pk=ids[1]).update(is_completed=True)
+            return original(cls, tasks)
+
+        with mock.patch.object(TaskToCheck, 'complete_many', classmethod(overlapping)):
+            with self.assertLogs('django.request', level='WARNING'):
+                response = self.complete(ids)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['task_ids'], [ids[1]])
+        self.assertFalse(TaskToCheck.objects.get(pk=ids[0]).is_completed)
+        self.assertEqual(TaskToCheck.objects.count(), 2)
+
+
+@override_settings(ALLOWED_HOSTS=['plants.example.com', 'testserver'])
+class FastSerializerTests(TestCase):
+    """The compiled serializers must return exactly what the DRF serializers return."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='fast@example.com', username='fast', password='pw')
+        site = Site.objects.create(user=cls.user, name='Kitchen', light='low', location='indoor')
+        with_image = make_plant(
+            'Monstera', scientific_name='Monstera deliciosa', description='Big leaves',
+            image='plants/monstéra leaf #1.jpg',
+        )
+        without_image = make_plant(
+            'Fern', scientific_name='Nephrolepis', preferred_light='Low', ideal_temp='18C', toxicity='Non-toxic',
+            bloom_time=None,
+        )
+        UserPlant.objects.create(user=cls.user, plant=with_image, site=site, nickname='Monty')
+        UserPlant.objects.create(user=cls.user, plant=without_image, site=None, image='user_plants/fern.png')
+
+    def setUp(self):
+        self.request = APIRequestFactory().get('/api/user-plants/', HTTP_HOST='plants.example.com:8000')
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        # One generated derivative, the others are missing (None)
+        thumbnail = os.path.join(self.media_root, derivative_name('plants/monstéra leaf #1.jpg', 'thumbnail'))
+        os.makedirs(os.path.dirname(thumbnail))
+        open(thumbnail, 'wb').close()
+        # Nothing recorded yet: the derivatives are looked up on the storage
+        catalog_cache().clear()
+
+    def assertSameOutput(self, fast, drf):
+        self.assertEqual(json.dumps(fast), json.dumps(drf))
+
+    def test_plants(self):
+        with self.settings(MEDIA_ROOT=self.media_root):
+            for request in (self.request, None):
+                serializer = PlantFastSerializer(request)
+                fast = serializer.data(serializer.values(Plant.objects.order_by('pk')))
+                drf = PlantSerializer(Plant.objects.order_by('pk'), many=True, context={'request': request}).data
+                self.assertSameOutput(fast, drf)
+        self.assertEqual(fast[0]['image_derivatives']['thumbnail'], fast[0]['image'].replace(
+            'plants/', 'derivatives/plants/').replace('.jpg', '.thumbnail.jpg'))
+
+    def test_user_plants_with_nested_plant_and_site(self):
+        queryset = UserPlant.objects.filter(user=self.user).order_by('pk')
+        with self.settings(MEDIA_ROOT=self.media_root):
+            serializer = UserPlantFastSerializer(self.request)
+            fast = serializer.data(serializer.values(queryset))
+            drf = UserPlantSerializer(queryset, many=True, context={'request': self.request}).data
+        self.assertSameOutput(fast, drf)
+        self.assertIsNone(fast[1]['site'])
+        self.assertTrue(fast[0]['plant']['image'].startswith('http://plants.example.com:8000/media/plants/monst%C3%A9ra'))
+
+    def test_derivatives_read_from_record(self):
+        queryset = UserPlant.objects.filter(user=self.user).order_by('pk')
+        with self.settings(MEDIA_ROOT=self.media_root):
+            # Looked up on the storage once per image (2 images, 2 derivatives), then recorded
+            with mock.patch.object(derivative_storage, 'exists', wraps=derivative_storage.exists) as exists:
+                serializer = UserPlantFastSerializer(self.request)
+                first = serializer.data(serializer.values(queryset))
+                self.assertEqual(exists.call_count, 4)
+                exists.reset_mock()
+                serializer = UserPlantFastSerializer(self.request)
+                self.assertEqual(serializer.data(serializer.values(queryset)), first)
+                exists.assert_not_called()
+        self.assertIsNotNone(first[0]['plant']['image_derivatives']['thumbnail'])
+        self.assertIsNone(first[0]['plant']['image_derivatives']['webp'])
+
+    def test_user_plants_view_uses_one_query(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.assertNumQueries(1):
+            response = client.get('/api/user-plants/')
+        self.assertEqual(len(response.json()), 2)
+
+
+class RendererTests(TestCase):
+    payload = {
+        'due_date': datetime(2026, 3, 1, 8, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        'completed_at': datetime(2026, 3, 1, 8, 30, tzinfo=dt_timezone.utc),
+        'day': date(2026, 3, 1),
+        'price': Decimal('1.10'),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'label': gettext_lazy('Monstéra'),
+        'tags': ('a', 'b'),
+        'empty': None,
+    }
+    expected = (
+        '{"due_date":"2026-03-01T08:30:15.123456Z","completed_at":"2026-03-01T08:30:00Z","day":"2026-03-01",'
+        '"price":"1.10","id":"12345678-1234-5678-1234-567812345678","label":"Monstéra","tags":["a","b"],"empty":null}'
+    ).encode()
+
+    def test_encoding(self):
+        self.assertEqual(renderers.dumps(self.payload), self.expected)
+
+    def test_stdlib_fallback_gives_same_bytes(self):
+        encoder = renderers.StdlibEncoder(ensure_ascii=False, separators=(',', ':'))
+        self.assertEqual(encoder.encode(self.payload).encode(), self.expected)
+
+    def test_json_response(self):
+        response = renderers.JsonResponse(self.payload)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.content, self.expected)
+        with self.assertRaises(TypeError):
+            renderers.JsonResponse([1, 2])
+
+    def test_drf_responses_use_renderer(self):
+        user = User.objects.create_user(email='render@example.com', username='render', password='pw')
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/user')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, renderers.dumps(response.data))
+
+
+class LoggingTests(SimpleTestCase):
+    def record(self, level=logging.INFO, msg="Logged in %s", args=('alice',), **extra):
+        record = logging.makeLogRecord({'name': 'users.views', 'levelno': level, 'levelname': logging.getLevelName(level),
+                                        'msg': msg, 'args': args})
+        record.__dict__.update(extra)
+        return record
+
+    def test_json_formatter(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = self.record(logging.ERROR, event='login.success', user_id=7, exc_info=sys.exc_info())
+        data = json.loads(JsonFormatter().format(record))
+        self.assertEqual(
+            {key: data[key] for key in ('level', 'logger', 'message', 'event', 'user_id')},
+            {'level': 'ERROR', 'logger': 'users.views', 'message': 'Logged in alice', 'event': 'login.success', 'user_id': 7},
+        )
+        self.assertIn('ValueError: boom', data['exception'])
+        self.assertNotIn('args', data)
+
+    def test_prepare_keeps_extra_fields(self):
+        handler = BackgroundHandler(stream=StringIO())
+        self.addCleanup(handler.close)
+        record = handler.prepare(self.record(event='login.success', user_id=7))
+        self.assertEqual((record.msg, record.args), ('Logged in alice', None))
+        self.assertEqual((record.event, record.user_id), ('login.success', 7))
+
+    def test_full_queue_drops_and_counts(self):
+        handler = BackgroundHandler(stream=StringIO(), maxsize=1)
+        self.addCleanup(handler.close)
+        # No writer thread: the queue stays full after the first record
+        handler.listener.stop()
+        for _ in range(3):
+            handler.emit(self.record())
+        self.assertEqual((handler.queue.qsize(), handler.dropped), (1, 2))
+
+    def test_drops_reported_once_queue_has_room(self):
+        handler = BackgroundHandler(stream=StringIO(), maxsize=2, report_interval=0)
+        self.addCleanup(handler.close)
+        handler.listener.stop()
+        for _ in range(4):
+            handler.emit(self.record())
+        handler.queue.get_nowait()
+        handler.queue.get_nowait()
+
+        handler.emit(self.record())
+        report = handler.queue.queue[-1]
+        self.assertEqual((report.levelno, report.event, report.dropped, report.dropped_total), (logging.WARNING, 'log.dropped', 2, 2))
+        # Not again until more are dropped
+        handler.queue.get_nowait()
+        handler.emit(self.record())
+        self.assertEqual(handler.queue.qsize(), 2)
+
+    def test_drops_reported_on_close(self):
+        stream = StringIO()
+        handler = BackgroundHandler(stream=stream, maxsize=1)
+        handler.listener.stop()
+        for _ in range(3):
+            handler.emit(self.record())
+        handler.close()
+        data = json.loads(stream.getvalue().splitlines()[-1])
+        self.assertEqual((data['event'], data['dropped'], data['level']), ('log.dropped', 2, 'WARNING'))
+
+    @override_settings(LOG_SAMPLE_RATES={'login.success': 0.25})
+    def test_sampling(self):
+        sampling = SamplingFilter()
+        with mock.patch('plantApp.log.random.random', return_value=0.5):
+            record = self.record(event='login.success')
+            self.assertFalse(sampling.filter(record))
+            self.assertEqual(record.sample_rate, 0.25)
+            # Warnings are always kept, other events aren't sampled
+            self.assertTrue(sampling.filter(self.record(logging.WARNING, event='login.success')))
+            self.assertTrue(sampling.filter(self.record(event='logout')))
+        with mock.patch('plantApp.log.random.random', return_value=0.1):
+            self.assertTrue(sampling.filter(self.record(event='login.success')))
+
+    def test_parse_log_levels(self):
+        self.assertEqual(parse_log_levels(''), {})
+        self.assertEqual(
+            parse_log_levels('users.views=DEBUG, API=WARNING,junk'),
+            {'users.views': 'DEBUG', 'API': 'WARNING'},
+        )
+
+
+class ImportCatalogCommandTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def call(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_catalog', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_upsert_with_images(self):
+        existing = make_plant(
+            'Fern', scientific_name='Nephrolepis exaltata', preferred_light='Low', ideal_temp='18C',
+            toxicity='Non-toxic',
+        )
+        images = os.path.join(self.directory, 'images')
+        os.makedirs(images)
+        Image.new('RGB', (8, 8), 'green').save(os.path.join(images, 'rose.jpg'))
+        path = self.write('plants.csv', (
+            "species_name,scientific_name,preferred_light,ideal_temp,toxicity,ideal_water,bloom_time,image\n"
+            "Rose,Rosa rubiginosa,Bright,20C,Non-toxic,Weekly,June,rose.jpg\n"
+            "Boston fern,Nephrolepis exaltata,Medium,18C,Non-toxic,Weekly,,\n"
+            "No name,,Bright,20C,Non-toxic,Weekly,,\n"
+            "Tulip,Tulipa,Bright,15C,Toxic,Weekly,,../outside.jpg\n"
+        ))
+        version = get_catalog_version()
+
+        with self.settings(MEDIA_ROOT=os.path.join(self.directory, 'media')):
+            out, err = self.call('plant', path, '--images', images, '--chunk-size', '2')
+
+        self.assertIn("4 row(s) read, 2 created, 1 updated, 1 invalid, 1 image(s) stored (1 failed)", out)
+        self.assertIn("line 4: scientific_name", err)
+        self.assertIn("line 5: image: ../outside.jpg is outside the image directory", err)
+        existing.refresh_from_db()
+        self.assertEqual((existing.species_name, existing.preferred_light, existing.bloom_time), ('Boston fern', 'Medium', None))
+        rose = Plant.objects.get(scientific_name='Rosa rubiginosa')
+        self.assertTrue(is_hashed_name(rose.image.name))
+        self.assertEqual(Plant.objects.get(scientific_name='Tulipa').image.name, '')
+        self.assertNotEqual(get_catalog_version(), version)
+
+    def test_jsonl_last_row_wins_and_only_given_columns_update(self):
+        Pet.objects.create(
+            species_name='Dog', breed_name='Labrador', scientific_name='Canis familiaris', lifespan='12 years',
+            daily_sleep='12h', gestation='63 days', diet='Kibble',
+        )
+        path = self.write('pets.jsonl', (
+            '{"species_name": "Dog", "breed_name": "Labrador", "scientific_name": "Canis lupus", "lifespan": 10,'
+            ' "daily_sleep": "12h", "gestation": "63 days"}\n'
+            'not json\n'
+            '\n'
+            '{"species_name": "Dog", "breed_name": "Labrador", "scientific_name": "Canis familiaris", "lifespan": 11,'
+            ' "daily_sleep": "12h", "gestation": "63 days"}\n'
+        ))
+        out, err = self.call('pet', path)
+
+        self.assertIn("3 row(s) read, 0 created, 1 updated, 1 invalid", out)
+        self.assertIn("line 2: Not a JSON object", err)
+        pet = Pet.objects.get()
+        self.assertEqual((pet.lifespan, pet.diet), ('11', 'Kibble'))
+
+    def test_two_column_key_over_one_default_chunk(self):
+        Pet.objects.create(
+            species_name='Dog', breed_name='Breed 5', scientific_name='Canis familiaris', lifespan='12 years',
+            daily_sleep='12h', gestation='63 days',
+        )
+        # Same species and breed names as a row, but not the same pair
+        Pet.objects.create(
+            species_name='Dog', breed_name='Breed 6', scientific_name='Felis catus', lifespan='15 years',
+            daily_sleep='15h', gestation='65 days',
+        )
+        lines = ["species_name,breed_name,scientific_name,lifespan,daily_sleep,gestation"]
+        lines += [f"{'Dog' if i % 2 else 'Cat'},Breed {i},Canis,10 years,12h,60 days" for i in range(1, 1201)]
+        path = self.write('pets.csv', '\n'.join(lines) + '\n')
+
+        out, err = self.call('pet', path)
+
+        self.assertIn("1200 row(s) read, 1199 created, 1 updated, 0 invalid", out)
+        self.assertEqual(Pet.objects.get(species_name='Dog', breed_name='Breed 5').lifespan, '10 years')
+        self.assertEqual(Pet.objects.get(species_name='Dog', breed_name='Breed 6').lifespan, '15 years')
+
+    def test_partial_columns_update_existing_entries(self):
+        fern = make_plant(
+            'Fern', scientific_name='Nephrolepis exaltata', preferred_light='Low', ideal_temp='18C',
+            toxicity='Non-toxic', description='Feathery',
+        )
+        path = self.write('plants.csv', (
+            "scientific_name,preferred_light\n"
+            "Nephrolepis exaltata,Medium\n"
+            "Rosa rubiginosa,Bright\n"
+        ))
+        out, err = self.call('plant', path)
+
+        # Updates only need the key and the columns to change, new entries every required column
+        self.assertIn("2 row(s) read, 0 created, 1 updated, 1 invalid", out)
+        self.assertIn("line 3: species_name", err)
+        fern.refresh_from_db()
+        self.assertEqual((fern.species_name, fern.preferred_light, fern.description), ('Fern', 'Medium', 'Feathery'))
+
+    def test_replaced_image_released(self):
+        images = os.path.join(self.directory, 'images')
+        os.makedirs(images)
+        Image.new('RGB', (8, 8), 'green').save(os.path.join(images, 'old.jpg'))
+        Image.new('RGB', (8, 8), 'red').save(os.path.join(images, 'new.jpg'))
+        path = self.write('plants.csv', "scientific_name,image\nNephrolepis exaltata,new.jpg\n")
+
+        with self.settings(MEDIA_ROOT=os.path.join(self.directory, 'media')):
+            with open(os.path.join(images, 'old.jpg'), 'rb') as f, self.captureOnCommitCallbacks(execute=True):
+                fern = make_plant(
+                    'Fern', scientific_name='Nephrolepis exaltata', preferred_light='Low', ideal_temp='18C',
+                    toxicity='Non-toxic', image=File(f, 'old.jpg'),
+                )
+            old_path = fern.image.path
+            self.call('plant', path, '--images', images)
+            fern.refresh_from_db()
+            self.assertTrue(os.path.exists(fern.image.path))
+        self.assertFalse(os.path.exists(old_path))
+
+    def test_unknown_column(self):
+        path = self.write('plants.csv', "species_name,scientific_name,colour\nRose,Rosa,red\n")
+        with self.assertRaisesMessage(CommandError, "Unknown column(s) for Plant: colour."):
+            self.call('plant', path)
+
+
+class CatalogBundleTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings_override = self.settings(CATALOG_BUNDLE_DIR=directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        catalog_cache().clear()
+
+        self.rose = make_plant('Rose', scientific_name='Rosa', toxicity='Non-toxic')
+        self.fern = make_plant(
+            'Fern', scientific_name='Nephrolepis', preferred_light='Low', ideal_temp='18C', toxicity='Non-toxic',
+        )
+        self.user = User.objects.create_user(email='bundle@example.com', username='bundle', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, query='', **headers):
+        response = self.client.get(f'/api/catalog/bundle/{query}', headers=headers)
+        return response, json.loads(response.content) if response.status_code == 200 else None
+
+    def test_new_version_only_when_catalog_changes(self):
+        self.assertEqual(export_bundle(), (1, True))
+        self.assertEqual(export_bundle(), (1, False))
+
+        self.rose.ideal_temp = '22C'
+        self.rose.save()
+        fern_id = self.fern.pk
+        self.fern.delete()
+        self.assertEqual(export_bundle(), (2, True))
+
+        with gzip.open(os.path.join(bundle_dir(), delta_name(1, 2))) as f:
+            delta = json.load(f)
+        self.assertEqual([row['ideal_temp'] for row in delta['plants']['upsert']], ['22C'])
+        self.assertEqual(delta['plants']['delete'], [fern_id])
+        self.assertEqual(delta['pets'], {'upsert': [], 'delete': []})
+
+    def test_full_delta_and_up_to_date(self):
+        refresh_bundle()
+        response, bundle = self.get()
+        self.assertEqual((response['X-Catalog-Version'], response['X-Catalog-Bundle']), ('1', 'full'))
+        self.assertEqual([plant['species_name'] for plant in bundle['plants']], ['Rose', 'Fern'])
+        self.assertEqual(bundle['plants'][0], PlantSerializer(self.rose).data)
+
+        # Catalog writes queue an export: version 1 is served until it is written
+        make_plant('Tulip', scientific_name='Tulipa', ideal_temp='15C')
+        self.assertEqual(self.get('?since=1')[0].status_code, 204)
+        refresh_bundle()
+        response, delta = self.get('?since=1')
+        self.assertEqual((response['X-Catalog-Version'], response['X-Catalog-Bundle']), ('2', 'delta'))
+        self.assertEqual([plant['species_name'] for plant in delta['plants']['upsert']], ['Tulip'])
+
+        response, _ = self.get('?since=2')
+        self.assertEqual(response.status_code, 204)
+
+        # Unknown (or pruned) versions get the full bundle
+        response, bundle = self.get('?since=99')
+        self.assertEqual((response['X-Catalog-Bundle'], len(bundle['plants'])), ('full', 3))
+
+        with self.assertLogs('django.request', level='WARNING'):
+            self.assertEqual(self.get('?since=latest')[0].status_code, 400)
+
+    def test_gzip_sent_as_stored(self):
+        refresh_bundle()
+        response = self.client.get('/api/catalog/bundle/', headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        bundle = json.loads(gzip.decompress(b''.join(response.streaming_content)))
+        self.assertEqual(bundle['version'], 1)
+
+        for accept_encoding in ('gzip;q=0, identity', 'br', '*;q=0', 'gzip; q=0.0, *'):
+            with self.subTest(accept_encoding=accept_encoding):
+                response, bundle = self.get(**{'Accept-Encoding': accept_encoding})
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(bundle['version'], 1)
+        for accept_encoding in ('br;q=1, gzip;q=0.5', '*', 'x-gzip'):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.client.get('/api/catalog/bundle/', headers={'Accept-Encoding': accept_encoding})
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_bundle_pruned_while_served(self):
+        refresh_bundle()
+        stale = (os.path.join(bundle_dir(), bundle_name(1)), 1, False)
+        make_plant('Tulip', scientific_name='Tulipa', ideal_temp='15C')
+        refresh_bundle(keep=1)
+        self.assertFalse(os.path.exists(stale[0]))
+
+        # Version 1 looked up just before the export pruned it: the new version is looked up again
+        current = (os.path.join(bundle_dir(), bundle_name(2)), 2, False)
+        with mock.patch('API.bundles.bundle_file', side_effect=[stale, current]):
+            response, bundle = self.get()
+        self.assertEqual((response['X-Catalog-Version'], bundle['version']), ('2', 2))
+
+        # Pruned again by the next export
+        with mock.patch('API.bundles.bundle_file', return_value=stale), self.assertLogs('django.request', level='WARNING'):
+            self.assertEqual(self.get()[0].status_code, 404)
+
+    @override_settings(CATALOG_BUNDLE_BACKGROUND_EXPORT=True)
+    def test_requests_never_export(self):
+        with mock.patch('API.bundles._executor') as executor, mock.patch('API.bundles.export_bundle') as export:
+            with self.captureOnCommitCallbacks(execute=True), self.assertLogs('django.request', level='ERROR'):
+                response, _ = self.get()
+                second, _ = self.get()
+        self.assertEqual((response.status_code, response['Retry-After']), (503, str(BUNDLE_RETRY_AFTER)))
+        self.assertEqual(second.status_code, 503)
+        export.assert_not_called()
+        # One export queued for both requests
+        executor.submit.assert_called_once()
+
+        with mock.patch('API.bundles.connection'):
+            executor.submit.call_args.args[0]()
+        self.assertEqual(self.get()[0]['X-Catalog-Version'], '1')
+
+    @override_settings(CATALOG_BUNDLE_BACKGROUND_EXPORT=True)
+    def test_catalog_change_queues_export(self):
+        refresh_bundle()
+        with mock.patch('API.bundles._executor') as executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.rose.ideal_temp = '22C'
+                self.rose.save()
+                self.fern.delete()
+        executor.submit.assert_called_once()
+
+        # Exports wait for the one running elsewhere
+        catalog_cache().add(BUNDLE_EXPORT_LOCK_KEY, True)
+        with mock.patch('API.bundles.time.sleep', side_effect=lambda _: catalog_cache().delete(BUNDLE_EXPORT_LOCK_KEY)) as sleep:
+            with mock.patch('API.bundles.connection'):
+                executor.submit.call_args.args[0]()
+        sleep.assert_called_once()
+        self.assertIsNone(catalog_cache().get(BUNDLE_EXPORT_LOCK_KEY))
+        self.assertEqual(current_bundle_version(), 2)
+
+    def test_deploy_check_wants_shared_cache(self):
+        # Both aliases point at the 'shared' cache: a single warning
+        warnings = check_shared_caches(None)
+        self.assertEqual([warning.id for warning in warnings], ['API.W001'])
+        self.assertIn("'shared' cache (CATALOG_CACHE_ALIAS, CALENDAR_CACHE_ALIAS)", warnings[0].msg)
+        redis = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379'}
+        with self.settings(CACHES={'default': redis, 'shared': redis}):
+            self.assertEqual(check_shared_caches(None), [])
+
+    def test_old_versions_pruned(self):
+        for temp in ('21C', '22C', '23C'):
+            Plant.objects.filter(pk=self.rose.pk).update(ideal_temp=temp)
+            export_bundle(keep=2)
+        self.assertEqual([entry['version'] for entry in read_manifest()['versions']], [2, 3])
+        self.assertEqual(
+            sorted(name for name in os.listdir(bundle_dir()) if name.startswith('catalog-')),
+            sorted([bundle_name(2), bundle_name(3), delta_name(2, 3)]),
+        )
+
+
+class ReminderDispatcherTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(email='remind@example.com', username='remind', password='pw')
+        plant = make_plant('Monstera', scientific_name='Monstera deliciosa')
+        user_plant = UserPlant.objects.create(user=user, plant=plant, nickname='Monty')
+        cls.task = UserPlantTask.objects.create(user_plant=user_plant, name='watering', interval=1, unit='day')
+
+    def setUp(self):
+        self.time = datetime(2026, 3, 1, 12, 0, tzinfo=dt_timezone.utc)
+        self.sink = QueueSink()
+
+    def dispatcher(self, **kwargs):
+        return ReminderDispatcher(self.sink, since=self.time, clock=lambda: self.time, **kwargs)
+
+    def check(self, due_date):
+        return TaskToCheck.objects.create(user_plant_task=self.task, due_date=due_date)
+
+    def sent(self):
+        ids = []
+        while not self.sink.queue.empty():
+            ids.append(self.sink.queue.get()['task_id'])
+        return ids
+
+    def run_once(self, dispatcher):
+        dispatcher.load_window()
+        return dispatcher.dispatch_due()
+
+    def test_rows_tied_at_batch_cut_sent_once(self):
+        due = self.time + timedelta(minutes=5)
+        checks = [self.check(due) for _ in range(3)]
+        dispatcher = self.dispatcher(max_batch=2)
+        self.time = due
+        self.run_once(dispatcher)
+        self.run_once(dispatcher)
+        self.run_once(dispatcher)
+        self.assertEqual(self.sent(), [check.pk for check in checks])
+
+    def test_task_created_already_due_is_swept(self):
+        dispatcher = self.dispatcher()
+        self.check(self.time + timedelta(minutes=5))
+        self.time += timedelta(minutes=10)
+        self.run_once(dispatcher)
+        self.sent()
+
+        # Created after the watermark moved past its due date
+        late = self.check(self.time - timedelta(days=1))
+        completed = self.check(self.time - timedelta(days=1))
+        TaskToCheck.objects.filter(pk=completed.pk).update(is_completed=True)
+        self.assertEqual(self.run_once(dispatcher), 1)
+        self.assertEqual(self.sent(), [late.pk])
+        self.assertEqual(self.run_once(dispatcher), 0)
+
+    def test_tasks_older_than_dispatcher_not_swept(self):
+        self.check(self.time - timedelta(days=1))
+        self.assertEqual(self.run_once(self.dispatcher()), 0)
+
+    def test_resumes_from_state(self):
+        state_path = os.path.join(tempfile.mkdtemp(), 'state.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(state_path))
+        first = self.check(self.time + timedelta(minutes=1))
+        dispatcher = self.dispatcher(state_path=state_path)
+        self.time += timedelta(minutes=1)
+        self.run_once(dispatcher)
+
+        second = self.check(self.time)
+        self.time += timedelta(minutes=1)
+        resumed = self.dispatcher(state_path=state_path)
+        self.assertTrue(resumed.resumed)
+        self.run_once(resumed)
+        self.assertEqual(self.sent(), [first.pk, second.pk])
+
+    def test_get_sink_passes_declared_options(self):
+        with override_settings(REMINDER_SINK='API.reminders.QueueSink'):
+            self.assertIsInstance(get_sink(path='reminders.jsonl'), QueueSink)
+        sink = get_sink(path='reminders.jsonl')
+        self.assertIsInstance(sink, JsonlFileSink)
+        self.assertEqual(sink.path, 'reminders.jsonl')
+
+    def test_command_once(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        check = self.check(now() - timedelta(minutes=1))
+        output = os.path.join(directory, 'reminders.jsonl')
+        stdout = StringIO()
+        call_command(
+            'dispatch_reminders', '--once', '--output', output,
+            '--state-file', os.path.join(directory, 'state.json'),
+            '--since', (now() - timedelta(hours=1)).isoformat(), stdout=stdout,
+        )
+        self.assertIn('1 reminder(s) sent.', stdout.getvalue())
+        with open(output) as f:
+            self.assertEqual(json.loads(f.readline())['task_id'], check.pk)
+
+    def test_command_naive_since(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        check = self.check(now() - timedelta(minutes=1))
+        output = os.path.join(directory, 'reminders.jsonl')
+        stdout = StringIO()
+        since = localtime(now() - timedelta(hours=1)).replace(tzinfo=None)
+        call_command(
+            'dispatch_reminders', '--once', '--output', output,
+            '--state-file', os.path.join(directory, 'state.json'),
+            '--since', since.strftime('%Y-%m-%dT%H:%M'), stdout=stdout,
+        )
+        self.assertIn('1 reminder(s) sent.', stdout.getvalue())
+        with open(output) as f:
+            self.assertEqual(json.loads(f.readline())['task_id'], check.pk)
+
+    def test_naive_watermarks_made_aware(self):
+        dispatcher = ReminderDispatcher(self.sink, since=self.time.replace(tzinfo=None), clock=lambda: self.time)
+        self.assertTrue(is_aware(dispatcher.watermark))
+
+        state_path = os.path.join(tempfile.mkdtemp(), 'state.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(state_path))
+        with open(state_path, 'w') as f:
+            json.dump({'watermark': '2026-03-01T12:00:00', 'watermark_id': 0, 'swept_id': 0}, f)
+        check = self.check(self.time + timedelta(minutes=1))
+        self.time += timedelta(minutes=1)
+        resumed = self.dispatcher(state_path=state_path)
+        self.assertEqual(resumed.watermark, datetime(2026, 3, 1, 12, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(self.run_once(resumed), 1)
+        self.assertEqual(self.sent(), [check.pk])
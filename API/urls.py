@@ -2,6 +2,7 @@ from django.urls import path
 from .views import (
     PlantListView,
     PlantDetailView,
+    CatalogBundleView,
     UserPlantListView,
     UserPlantDetailView,
     SiteDetailView,
@@ -10,16 +11,24 @@ from .views import (
     UpdateTaskFrequencyView,
     DeleteUserPlantTaskView,
     CompletedTasksView,
+    CompletedTasksHistoryView,
     MarkTaskAsCompletedView,
+    MarkTasksAsCompletedView,
     HomepageTasksView,
     UserPlantTasksView,
     RemovePlantFromSiteView,
 )
+from .async_views import (
+    AsyncHomepageTasksView,
+    AsyncUserPlantDetailView,
+    AsyncCompletedTasksView,
+)
 
 urlpatterns = [
     # Plant-related URLs
     path('plants/', PlantListView.as_view(), name='plant-list'),
     path('plants/<int:plant_id>/', PlantDetailView.as_view(), name='plant-detail'),
+    path('catalog/bundle/', CatalogBundleView.as_view(), name='catalog-bundle'),
 
     # UserPlant-related URLs
     path('user-plants/', UserPlantListView.as_view(), name='userPlant-list-create'),
@@ -37,8 +46,13 @@ urlpatterns = [
     path('tasks/<int:task_id>/update/', UpdateTaskFrequencyView.as_view(), name='update-task-frequency'),
     path('tasks/<int:task_id>/delete/', DeleteUserPlantTaskView.as_view(), name='delete-task'),
     path('tasks/completed/<str:date_str>/', CompletedTasksView.as_view(), name='completed-tasks-by-date'),
+    path('tasks/history/', CompletedTasksHistoryView.as_view(), name='completed-tasks-history'),
     path('tasks/<int:task_id>/complete/', MarkTaskAsCompletedView.as_view(), name='mark-task-completed'),
+    path('tasks/complete/', MarkTasksAsCompletedView.as_view(), name='mark-tasks-completed'),
     path('tasks/homepage-tasks/', HomepageTasksView.as_view(), name='homepage-tasks'),
-]
-
 
+    # Async versions of the read-heavy endpoints (for ASGI deployments, see async_views.py)
+    path('async/tasks/homepage-tasks/', AsyncHomepageTasksView.as_view(), name='async-homepage-tasks'),
+    path('async/userPlant-details/<int:userPlant_id>/', AsyncUserPlantDetailView.as_view(), name='async-userPlant-detail'),
+    path('async/tasks/completed/<str:date_str>/', AsyncCompletedTasksView.as_view(), name='async-completed-tasks-by-date'),
+]
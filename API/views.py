@@ -1,40 +1,127 @@
-from .models import UserPlant, Plant, Site, UserPlantTask, TaskToCheck
+from .models import UserPlant, Plant, Site, UserPlantTask, TaskToCheck, TasksAlreadyCompleted
 from .serializers import PlantSerializer, UserPlantSerializer, SiteSerializer, UserPlantTaskSerializer
-from django.http import JsonResponse
+from .fast_serializers import PlantFastSerializer, UserPlantFastSerializer
+from .catalog import catalog_etag
+from .bundles import open_bundle_file, BundleNotReady, BUNDLE_RETRY_AFTER
+from .pagination import IdCursorPagination
+from .search import search_plants, PLANT_SEARCH_LIMIT
+from .calendar_cache import get_homepage_feed, invalidate_calendar
+from .feed import plant_task_checks, partition_task_checks
+from .history import parse_history_range, daily_counts, completed_task_details, HISTORY_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE
+from plantApp.renderers import JsonResponse
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import patch_vary_headers
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import generics, permissions
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from django.db import models
+from rest_framework.utils.urls import replace_query_param
+import gzip
 from datetime import datetime
-from django.utils.timezone import make_aware
-from django.utils.timezone import now, localtime, timedelta
+from django.utils.timezone import now
 from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 
 
 # List all plants that matches the search query
 class PlantListView(APIView):
+    # Answer 304 Not Modified while the catalog version hasn't changed
+    @method_decorator(condition(etag_func=catalog_etag))
     def get(self, request):
         queryset = Plant.objects.all()
 
-        # Get search query from the URL parameters (e.g., /plants/?search=rose)
+        # Get search query from the URL parameters (e.g., /plants/?search=rose&limit=20)
         search = request.query_params.get('search', None)
         
         if search:
-            queryset = queryset.filter(
-                models.Q(species_name__icontains=search) | 
-                models.Q(scientific_name__icontains=search)
-            )
-        
-        # Serialize the filtered queryset with the request context
-        serializer = PlantSerializer(queryset, many=True, context={'request': request})
-        return JsonResponse(serializer.data, safe=False)
+            try:
+                limit = int(request.query_params.get('limit', PLANT_SEARCH_LIMIT))
+            except ValueError:
+                return JsonResponse({'error': 'limit must be an integer.'}, status=400)
+
+            # Ranked prefix search through the full-text index (capped by limit, not paginated)
+            serializer = PlantSerializer(search_plants(search, limit), many=True, context={'request': request})
+            return JsonResponse(serializer.data, safe=False)
+
+        # Read-only listing: rows go through the compiled serializer
+        serializer = PlantFastSerializer(request)
+        queryset = serializer.values(queryset)
+
+        # Browse the catalog page by page when the client asks for it (?page_size= / ?cursor=)
+        paginator = IdCursorPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return JsonResponse(paginator.get_paginated_data(serializer.data(page)))
+
+        return JsonResponse(serializer.data(queryset), safe=False)
+
+
+def accepts_gzip(request):
+    """Whether the Accept-Encoding header allows gzip (explicitly or through *, with a q-value above 0)."""
+    qualities = {}
+    for coding in request.headers.get('Accept-Encoding', '').split(','):
+        name, *params = [part.strip() for part in coding.split(';')]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            qualities[name.lower()] = quality
+    quality = qualities.get('gzip', qualities.get('x-gzip', qualities.get('*', 0.0)))
+    return quality > 0
+
+
+# Offline copy of the plant and pet catalogs (see bundles.py): the full bundle,
+# or the delta from the version the client already has (?since=<version>)
+class CatalogBundleView(APIView):
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return JsonResponse({'error': 'since must be a bundle version.'}, status=400)
+
+        try:
+            found = open_bundle_file(since)
+        except BundleNotReady:
+            # The first export is running in the background
+            response = JsonResponse({'error': 'The catalog bundle is being prepared.'}, status=503)
+            response['Retry-After'] = BUNDLE_RETRY_AFTER
+            return response
+        except FileNotFoundError:
+            # Pruned twice by background exports while being looked up
+            raise Http404("Catalog bundle not found.")
+        if found is None:
+            # Already up to date
+            response = HttpResponse(status=204)
+            response['X-Catalog-Version'] = since
+            return response
+        f, version, is_delta = found
+
+        # Files are stored gzipped: sent as they are to clients accepting it
+        if accepts_gzip(request):
+            response = FileResponse(f, content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            with f, gzip.open(f) as unzipped:
+                response = HttpResponse(unzipped.read(), content_type='application/json')
+        patch_vary_headers(response, ['Accept-Encoding'])
+        response['X-Catalog-Version'] = version
+        response['X-Catalog-Bundle'] = 'delta' if is_delta else 'full'
+        return response
 
 
 # Retreive a specific Plant details (When the user wants to add it)
 class PlantDetailView(APIView):
+    @method_decorator(condition(etag_func=catalog_etag))
     def get(self, request, plant_id):
         try:
             plant = Plant.objects.get(pk=plant_id)
@@ -49,9 +136,17 @@ class UserPlantListView(APIView):
 
     # List all the UserPlants
     def get(self, request):
-        queryset = UserPlant.objects.filter(user=request.user)
-        serializer = UserPlantSerializer(queryset, many=True, context={'request': request})
-        return JsonResponse(serializer.data, safe=False)
+        # The plant and site columns come in the same query (joined by .values())
+        serializer = UserPlantFastSerializer(request)
+        queryset = serializer.values(UserPlant.objects.filter(user=request.user))
+
+        # Paginate when the client asks for it (?page_size= / ?cursor=)
+        paginator = IdCursorPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return JsonResponse(paginator.get_paginated_data(serializer.data(page)))
+
+        return JsonResponse(serializer.data(queryset), safe=False)
 
     # Add a UserPlant
     def post(self, request):
@@ -91,8 +186,8 @@ class UserPlantDetailView(APIView):
 
     def get(self, request, userPlant_id):
         try:
-            # Retrieve the UserPlant instance for the authenticated user
-            user_plant = UserPlant.objects.get(pk=userPlant_id, user=request.user)
+            # Retrieve the UserPlant instance for the authenticated user (with what the serializer reads)
+            user_plant = UserPlant.objects.select_related('plant', 'site').get(pk=userPlant_id, user=request.user)
         except UserPlant.DoesNotExist:
             return Response({'error': 'Not found'}, status=404)
 
@@ -111,58 +206,14 @@ class UserPlantDetailView(APIView):
             for task in tasks
         ]
 
-        # Define today's time range
-        today_start = localtime(now()).replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = localtime(now()).replace(hour=23, minute=59, second=59, microsecond=999999)
-
-        # Retrieve incomplete TaskToCheck instances related to the UserPlantTask
-        incomplete_tasks = TaskToCheck.objects.filter(user_plant_task__user_plant=user_plant, is_completed=False)
-
-        # Filter overdue tasks
-        overdue_tasks = incomplete_tasks.filter(due_date__lt=today_start)
-        overdue_task_data = [
-            {
-                'task_name': task.user_plant_task.name,
-                'due_date': task.due_date,
-                'interval': task.user_plant_task.interval,
-                'unit': task.user_plant_task.unit
-            }
-            for task in overdue_tasks
-        ]
-
-        # Filter tasks due today
-        due_today_tasks = incomplete_tasks.filter(due_date__gte=today_start, due_date__lte=today_end)
-        due_today_data = [
-            {
-                'task_name': task.user_plant_task.name,
-                'due_date': task.due_date,
-                'interval': task.user_plant_task.interval,
-                'unit': task.user_plant_task.unit
-            }
-            for task in due_today_tasks
-        ]
-
-        # Filter upcoming tasks (due after today)
-        upcoming_tasks = incomplete_tasks.filter(due_date__gt=today_end)
-        upcoming_task_data = [
-            {
-                'task_name': task.user_plant_task.name,
-                'due_date': task.due_date,
-                'interval': task.user_plant_task.interval,
-                'unit': task.user_plant_task.unit
-            }
-            for task in upcoming_tasks
-        ]
+        # Incomplete checks with their parent task (one query), split by due date in one pass
+        task_checks = partition_task_checks(plant_task_checks(user_plant))
 
         # Combine all the data
         response_data = {
             'user_plant': user_plant_data,
             'tasks': task_data,
-            'task_checks': {
-                'overdue_tasks': overdue_task_data,
-                'tasks_due_today': due_today_data,
-                'upcoming_tasks': upcoming_task_data
-            }
+            'task_checks': task_checks
         }
 
         return Response(response_data, status=200)
@@ -241,94 +292,8 @@ class HomepageTasksView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        # Get start date (today) and end date (30 days from now)
-        today = localtime(now()).replace(hour=0, minute=0, second=0, microsecond=0)
-        end_date = today + timedelta(days=30)
-
-        # Query all tasks due within 30 days or overdue tasks
-        all_tasks = TaskToCheck.objects.filter(
-            user_plant_task__user_plant__user=request.user,
-            due_date__lte=end_date
-        ).order_by('due_date')
-
-        overdue_tasks = TaskToCheck.objects.filter(
-            user_plant_task__user_plant__user=request.user,
-            is_completed=False,
-            due_date__lt=today
-        ).order_by('due_date')
-
-        # Initialize response dictionary with date as key
-        tasks_by_date = {}
-
-        # Process each task and organize by date
-        for task in all_tasks:
-            task_date = task.due_date.date().isoformat()
-            
-            task_data = {
-                "id": task.id,
-                "task_name": task.user_plant_task.name,
-                "plant_nickname": task.user_plant_task.user_plant.nickname,
-                "site_name": task.user_plant_task.user_plant.site.name if task.user_plant_task.user_plant.site else 'No location',
-                "plant_image": task.user_plant_task.user_plant.image.url if task.user_plant_task.user_plant.image else None,
-                "description": task.user_plant_task.description,
-                "due_date": task.due_date,
-                "interval": task.user_plant_task.interval,
-                "unit": task.user_plant_task.unit,
-                "is_completed": task.is_completed,
-                "overdue_since": None,  # Default value for non-overdue tasks
-            }
-
-            if task_date not in tasks_by_date:
-                tasks_by_date[task_date] = {
-                    "due_tasks": [],
-                    "overdue": False
-                }
-
-            # Mark as overdue if the task's date is before today
-            if task.due_date.date() < today.date():
-                tasks_by_date[task_date]["overdue"] = True
-                task_data["overdue_since"] = task.due_date.date().isoformat()
-
-            tasks_by_date[task_date]["due_tasks"].append(task_data)
-
-        # Add overdue tasks to today's date
-        overdue_task_data = []
-        for task in overdue_tasks:
-            overdue_task_data.append({
-                "id": task.id,
-                "task_name": task.user_plant_task.name,
-                "plant_nickname": task.user_plant_task.user_plant.nickname,
-                "site_name": task.user_plant_task.user_plant.site.name if task.user_plant_task.user_plant.site else 'No location',
-                "plant_image": task.user_plant_task.user_plant.image.url if task.user_plant_task.user_plant.image else None,
-                "description": task.user_plant_task.description,
-                "due_date": task.due_date,
-                "interval": task.user_plant_task.interval,
-                "unit": task.user_plant_task.unit,
-                "is_completed": task.is_completed,
-                "overdue_since": task.due_date.date().isoformat(),  # Add overdue date
-            })
-
-        today_str = today.date().isoformat()
-        if today_str not in tasks_by_date:
-            tasks_by_date[today_str] = {"due_tasks": [], "overdue": False}
-        tasks_by_date[today_str]["due_tasks"].extend(overdue_task_data)
-
-        # Add empty entries for dates with no tasks
-        current_date = today
-        while current_date <= end_date:
-            date_str = current_date.date().isoformat()
-            if date_str not in tasks_by_date:
-                tasks_by_date[date_str] = {
-                    "due_tasks": [],
-                    "overdue": False
-                }
-            current_date += timedelta(days=1)
-
-        return Response({
-            "tasks_by_date": tasks_by_date,
-            "start_date": today.date().isoformat(),
-            "end_date": end_date.date().isoformat()
-        }, status=status.HTTP_200_OK)
+        # Tasks due within 30 days plus overdue tasks, bucketed by date (cached per user)
+        return Response(get_homepage_feed(request.user), status=status.HTTP_200_OK)
 
 
 #View History of completed tasks
@@ -342,27 +307,8 @@ class CompletedTasksView(APIView):
             if not date:
                 raise ValueError
             
-            # Convert to datetime range for the full day
-            start_date = make_aware(datetime.combine(date, datetime.min.time()))
-            end_date = make_aware(datetime.combine(date, datetime.max.time()))
-            
-            # Filter tasks completed on the specified date
-            completed_tasks = TaskToCheck.objects.filter(
-                completed_at__range=(start_date, end_date),
-                is_completed=True,
-                user_plant_task__user_plant__user=request.user
-            ).select_related('user_plant_task__user_plant')  # Optimize database queries
-            
-            # Serialize the tasks
-            task_data = [
-                {
-                    'id': task.id,
-                    'task_name': task.user_plant_task.name,
-                    'plant_name': task.user_plant_task.user_plant.nickname or task.user_plant_task.user_plant.plant.species_name,
-                    'completed_at': task.completed_at,
-                }
-                for task in completed_tasks
-            ]
+            # Tasks completed on the specified date, recent or archived
+            task_data = completed_task_details(request.user, date, date)
 
             return Response(task_data, status=status.HTTP_200_OK)
                 
@@ -373,6 +319,39 @@ class CompletedTasksView(APIView):
             )
 
 
+# History of completed tasks over a date range (heatmap), counted per day and task type
+class CompletedTasksHistoryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            start, end = parse_history_range(request.query_params.get('start'), request.query_params.get('end'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = daily_counts(request.user, start, end)
+
+        # The completed tasks themselves, page by page, only when asked for (?details=1).
+        # Pages are keyed on the last task id (?after=), since rows come from two tables.
+        if request.query_params.get('details') in ('1', 'true'):
+            try:
+                page_size = min(int(request.query_params.get('page_size', HISTORY_PAGE_SIZE)), HISTORY_MAX_PAGE_SIZE)
+                after = request.query_params.get('after')
+                after = int(after) if after else None
+            except ValueError:
+                return Response({"error": "page_size and after must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+            if page_size < 1:
+                return Response({"error": "page_size must be positive."}, status=status.HTTP_400_BAD_REQUEST)
+
+            rows = completed_task_details(request.user, start, end, after=after, limit=page_size + 1)
+            next_link = None
+            if len(rows) > page_size:
+                next_link = replace_query_param(request.build_absolute_uri(), 'after', rows[page_size - 1]['id'])
+            data['details'] = {'next': next_link, 'results': rows[:page_size]}
+
+        return Response(data, status=status.HTTP_200_OK)
+
+
 # Add a UserPlantTask (predefined choices)
 class AddUserPlantTaskView(APIView):
     permission_classes = [IsAuthenticated]
@@ -413,6 +392,7 @@ class AddUserPlantTaskView(APIView):
             # Create a TaskToCheck for this UserPlantTask
             TaskToCheck.objects.create(
                 user_plant_task=task,
+                owner=request.user,
                 due_date=initial_due_date,
                 is_completed=False
             )
@@ -512,7 +492,7 @@ class MarkTaskAsCompletedView(APIView):
     def post(self, request, task_id):
         try:
             # Retrieve the task to be marked as completed
-            task = TaskToCheck.objects.get(pk=task_id, user_plant_task__user_plant__user=request.user)
+            task = TaskToCheck.objects.get(pk=task_id, owner=request.user, user_plant_task__isnull=False)
         except TaskToCheck.DoesNotExist:
             return Response({"error": "Task not found or not owned by user."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -533,6 +513,77 @@ class MarkTaskAsCompletedView(APIView):
         )
 
 
+# Complete a batch of tasks at once (e.g. watering a whole shelf) in one transaction
+class MarkTasksAsCompletedView(APIView):
+    permission_classes = [IsAuthenticated]
+    # All the tasks are completed in one transaction: keep it (and its IN list) short
+    max_task_ids = 200
+
+    def post(self, request):
+        task_ids = request.data.get('task_ids')
+
+        # Validate input
+        if not isinstance(task_ids, list) or not task_ids:
+            return Response({"error": "task_ids must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(task_ids) > self.max_task_ids:
+            return Response(
+                {"error": f"At most {self.max_task_ids} task_ids can be completed at once."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Only real integers: int() would turn True or 1.7 into the id 1
+        if not all(isinstance(task_id, int) and not isinstance(task_id, bool) for task_id in task_ids):
+            return Response({"error": "task_ids must only contain integers."}, status=status.HTTP_400_BAD_REQUEST)
+        task_ids = list(dict.fromkeys(task_ids))
+
+        tasks = list(
+            TaskToCheck.objects.filter(pk__in=task_ids, owner=request.user, user_plant_task__isnull=False)
+            .select_related('user_plant_task')
+            .order_by('pk')
+        )
+
+        found_ids = {task.id for task in tasks}
+        missing_ids = [task_id for task_id in task_ids if task_id not in found_ids]
+        if missing_ids:
+            return Response(
+                {"error": "Tasks not found or not owned by user.", "task_ids": missing_ids},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        completed_ids = [task.id for task in tasks if task.is_completed]
+        if not completed_ids:
+            try:
+                new_tasks = TaskToCheck.complete_many(tasks)
+            except TasksAlreadyCompleted:
+                # Completed by an overlapping request since they were loaded
+                completed_ids = list(
+                    TaskToCheck.objects.filter(pk__in=task_ids, is_completed=True)
+                    .order_by('pk').values_list('pk', flat=True)
+                )
+        if completed_ids:
+            return Response(
+                {"error": "Tasks are already completed.", "task_ids": completed_ids},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Bulk writes skip the model signals, so drop the cached calendar here
+        invalidate_calendar(request.user.pk)
+
+        return Response(
+            {
+                "message": "Tasks marked as completed successfully.",
+                "tasks": [
+                    {
+                        "task_id": task.id,
+                        "new_task_id": new_task.id,
+                        "new_task_due_date": new_task.due_date,
+                    }
+                    for task, new_task in zip(tasks, new_tasks)
+                ],
+            },
+            status=status.HTTP_200_OK
+        )
+
+
 class UpdateLastCompletedView(APIView):
     permission_classes = [IsAuthenticated]
 
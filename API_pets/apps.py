@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApiPetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'API_pets'
+
+    def ready(self):
+        # Register the catalog version handlers
+        from . import signals  # noqa: F401
@@ -0,0 +1,38 @@
+from API.fast_serializers import FastSerializer
+from .models import Pet, age_in_years
+from .serializers import PetSerializer, UserPetSerializer
+
+
+# Pet columns returned in UserPetSerializer.pet_details, as they are stored
+PET_DETAILS_FIELDS = [
+    'species_name', 'breed_name', 'scientific_name', 'lifespan', 'daily_sleep',
+    'gestation', 'description', 'diet',
+]
+
+
+class PetFastSerializer(FastSerializer):
+    serializer_class = PetSerializer
+    method_columns = ('image',)
+    derivative_columns = ('image',)
+
+    def get_image_derivatives(self, row):
+        return self.image_derivatives(row[self.column('image')])
+
+
+class UserPetFastSerializer(FastSerializer):
+    serializer_class = UserPetSerializer
+    method_columns = ('image', 'birth_date', 'pet__image', *(f'pet__{name}' for name in PET_DETAILS_FIELDS))
+    derivative_columns = ('image',)
+
+    def get_age(self, row):
+        return age_in_years(row[self.column('birth_date')])
+
+    def get_image_derivatives(self, row):
+        return self.image_derivatives(row[self.column('image')])
+
+    def get_pet_details(self, row):
+        details = {name: row[self.column(f'pet__{name}')] for name in PET_DETAILS_FIELDS}
+        # Relative URL, like obj.pet.image.url
+        pet_images = self.media_urls(Pet._meta.get_field('image').storage, absolute=False)
+        details['image'] = pet_images.url(row[self.column('pet__image')])
+        return details
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('API_pets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['species_name', 'breed_name'], name='pet_species_breed_idx'),
+        ),
+    ]
@@ -4,6 +4,17 @@ from datetime import date
 from django.core.exceptions import ValidationError
 
 
+def age_in_years(birth_date):
+    """Age in full years of someone born on `birth_date` (None when unknown)."""
+    if birth_date:
+        today = date.today()
+        age = today.year - birth_date.year
+        if (today.month, today.day) < (birth_date.month, birth_date.day):
+            age -= 1
+        return age
+    return None
+
+
 # The pets species stored in the database
 class Pet(models.Model):
     species_name = models.CharField(max_length=255)
@@ -16,6 +27,12 @@ class Pet(models.Model):
     diet = models.TextField(blank=True, null=True)
     image = models.ImageField(upload_to='pets/', null=True, blank=True)  
 
+    class Meta:
+        indexes = [
+            # Natural key of catalog imports (API.catalog_import)
+            models.Index(fields=['species_name', 'breed_name'], name='pet_species_breed_idx'),
+        ]
+
     def __str__(self):
         return self.breed_name
 
@@ -42,13 +59,7 @@ class UserPet(models.Model):
     @property
     def age(self):
         """Calculate the pet's age in years."""
-        if self.birth_date:
-            today = date.today()
-            age = today.year - self.birth_date.year
-            if (today.month, today.day) < (self.birth_date.month, self.birth_date.day):
-                age -= 1
-            return age
-        return None
+        return age_in_years(self.birth_date)
 
     def __str__(self):
         return f"{self.nickname or self.pet.species_name} ({self.user.username})"
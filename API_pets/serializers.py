@@ -1,15 +1,20 @@
 from rest_framework import serializers
 from .models import UserPet, Pet
+from API.images import derivative_urls
 
 
 class UserPetSerializer(serializers.ModelSerializer):
 
     pet_details = serializers.SerializerMethodField()
     age = serializers.ReadOnlyField()
+    image_derivatives = serializers.SerializerMethodField()
 
     class Meta:
         model = UserPet
-        fields = ['id', 'nickname', 'birth_date', 'age', 'image', 'pet_details']
+        fields = ['id', 'nickname', 'birth_date', 'age', 'image', 'image_derivatives', 'pet_details']
+
+    def get_image_derivatives(self, obj):
+        return derivative_urls(obj.image, self.context.get('request'))
 
     def get_pet_details(self, obj):
         return {
@@ -26,14 +31,19 @@ class UserPetSerializer(serializers.ModelSerializer):
 
 
 class PetSerializer(serializers.ModelSerializer):
+    image_derivatives = serializers.SerializerMethodField()
+
     class Meta:
         model = Pet
         fields = [
             'id', 'species_name', 'breed_name', 'scientific_name', 
             'lifespan', 'daily_sleep', 'gestation', 'description', 
-            'diet', 'image'
+            'diet', 'image', 'image_derivatives'
         ]
 
+    def get_image_derivatives(self, obj):
+        return derivative_urls(obj.image, self.context.get('request'))
+
     def get_image(self, obj):
         request = self.context.get('request')
         if obj.image:
@@ -0,0 +1,55 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+from API.catalog import bump_catalog_version, bump_user_pets_version
+from API.images import schedule_derivatives
+from API.storage import release, release_replaced_file, remember_file_name
+from .models import Pet, UserPet
+
+
+# New catalog / collection versions (and ETags) whenever pets change
+
+@receiver([post_save, post_delete], sender=Pet)
+def bump_pet_catalog_version(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver([post_save, post_delete], sender=UserPet)
+def bump_owner_pets_version(sender, instance, **kwargs):
+    bump_user_pets_version(instance.user_id)
+
+
+# Generate thumbnails / WebP copies of uploaded images in the background.
+# The catalog and pet lists show their URLs: new versions once they are written.
+
+@receiver(post_save, sender=Pet)
+def generate_pet_image_derivatives(sender, instance, **kwargs):
+    schedule_derivatives(instance.image, on_generated=bump_catalog_version)
+
+
+@receiver(post_save, sender=UserPet)
+def generate_image_derivatives(sender, instance, **kwargs):
+    user_id = instance.user_id
+    schedule_derivatives(instance.image, on_generated=lambda: bump_user_pets_version(user_id))
+
+
+# Shared content-addressed files are deleted with the last row using them,
+# when it is deleted or given another image (API, admin)
+
+@receiver(post_delete, sender=Pet)
+@receiver(post_delete, sender=UserPet)
+def release_image(sender, instance, **kwargs):
+    if instance.image:
+        transaction.on_commit(lambda: release(instance.image.name))
+
+
+@receiver(post_init, sender=Pet)
+@receiver(post_init, sender=UserPet)
+def remember_image(sender, instance, **kwargs):
+    remember_file_name(instance, 'image')
+
+
+@receiver(post_save, sender=Pet)
+@receiver(post_save, sender=UserPet)
+def release_replaced_image(sender, instance, created, update_fields=None, **kwargs):
+    release_replaced_file(instance, 'image', created=created, update_fields=update_fields)
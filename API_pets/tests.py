@@ -1,3 +1,110 @@
+import json
+from datetime import date
 from django.test import TestCase
+from rest_framework.test import APIClient, APIRequestFactory
+from API.catalog import catalog_cache
+from users.models import User
+from .fast_serializers import PetFastSerializer, UserPetFastSerializer
+from .models import Pet, UserPet
+from .serializers import PetSerializer, UserPetSerializer
 
-# Create your tests here.
+
+def make_pet(species_name, breed_name):
+    return Pet.objects.create(
+        species_name=species_name, scientific_name=species_name, breed_name=breed_name,
+        lifespan='10 years', daily_sleep='12 hours', gestation='60 days',
+    )
+
+
+class UserPetViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='pets@example.com', username='pets', password='pw')
+        cls.dog = make_pet('Dog', 'Labrador')
+        cls.poodle = make_pet('Dog', 'Poodle')
+        cls.cat = make_pet('Cat', 'Siamese')
+        cls.rabbit = make_pet('Rabbit', 'Angora')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_pets(self, *pets):
+        for pet in pets:
+            UserPet.objects.create(user=self.user, pet=pet, nickname=pet.breed_name)
+
+    def test_species_one_pet_per_species(self):
+        # A poodle owner gets the first Dog of the catalog, like for a labrador owner
+        self.add_pets(self.poodle, self.poodle, self.cat)
+        response = self.client.get('/api/user-pets/species/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([pet['id'] for pet in response.json()], [self.dog.pk, self.cat.pk])
+
+    def test_species_query_count_does_not_grow_with_species(self):
+        self.add_pets(self.dog)
+        with self.assertNumQueries(1):
+            self.client.get('/api/user-pets/species/')
+
+        self.add_pets(self.poodle, self.cat, self.rabbit)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/user-pets/species/')
+        self.assertEqual(len(response.json()), 3)
+
+    def test_list_query_count_does_not_grow_with_pets(self):
+        self.add_pets(self.dog)
+        with self.assertNumQueries(1):
+            self.client.get('/api/user-pets/')
+
+        self.add_pets(self.poodle, self.cat, self.rabbit)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/user-pets/')
+        data = response.json()
+        self.assertEqual(len(data), 4)
+        self.assertEqual(data[2]['pet_details']['species_name'], 'Cat')
+
+    def test_paginated_list_query_count(self):
+        self.add_pets(self.dog, self.poodle, self.cat, self.rabbit)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/user-pets/?page_size=2')
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_species_not_modified_until_pets_change(self):
+        catalog_cache().clear()
+        self.add_pets(self.dog)
+        etag = self.client.get('/api/user-pets/species/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/user-pets/species/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        # A new pet of the user, then a catalog change, each give a new ETag
+        self.add_pets(self.cat)
+        response = self.client.get('/api/user-pets/species/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+        etag = response['ETag']
+
+        self.rabbit.delete()
+        response = self.client.get('/api/user-pets/species/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_fast_serializers_match_drf(self):
+        self.add_pets(self.cat, self.rabbit)
+        Pet.objects.filter(pk=self.cat.pk).update(image='pets/siamese cat.jpg', description='Vocal', diet='Meat')
+        UserPet.objects.filter(pet=self.cat).update(birth_date=date(2020, 2, 29), image='user_pets/tom.png')
+        request = APIRequestFactory().get('/api/user-pets/')
+
+        user_pets = UserPet.objects.filter(user=self.user).order_by('pk')
+        serializer = UserPetFastSerializer(request)
+        self.assertEqual(
+            json.dumps(serializer.data(serializer.values(user_pets))),
+            json.dumps(UserPetSerializer(user_pets, many=True, context={'request': request}).data),
+        )
+
+        pets = Pet.objects.order_by('pk')
+        serializer = PetFastSerializer(request)
+        self.assertEqual(
+            json.dumps(serializer.data(serializer.values(pets))),
+            json.dumps(PetSerializer(pets, many=True, context={'request': request}).data),
+        )
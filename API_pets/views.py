@@ -1,36 +1,45 @@
 from django.shortcuts import render
 from rest_framework.permissions import IsAuthenticated
 from .models import UserPet, Pet
-from django.http import JsonResponse
+from plantApp.renderers import JsonResponse
 from rest_framework.views import APIView
-from .serializers import UserPetSerializer, PetSerializer
+from .fast_serializers import UserPetFastSerializer, PetFastSerializer
+from API.pagination import IdCursorPagination
+from API.catalog import user_pets_etag
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 
 
 class UserPetListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        queryset = UserPet.objects.filter(user=request.user)
-        serializer = UserPetSerializer(queryset, many=True, context={'request': request})
-        return JsonResponse(serializer.data, safe=False)
+        # The species of every pet comes in the same query (pet_details, joined by .values())
+        serializer = UserPetFastSerializer(request)
+        queryset = serializer.values(UserPet.objects.filter(user=request.user))
+
+        # Paginate when the client asks for it (?page_size= / ?cursor=)
+        paginator = IdCursorPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return JsonResponse(paginator.get_paginated_data(serializer.data(page)))
+
+        return JsonResponse(serializer.data(queryset), safe=False)
 
 
 class UserPetSpeciesView(APIView):
     permission_classes = [IsAuthenticated]
 
+    # Answer 304 Not Modified while neither the catalog nor the user's pets changed
+    @method_decorator(condition(etag_func=user_pets_etag))
     def get(self, request):
-        # Get unique species from user's pets
-        user_pets = UserPet.objects.filter(user=request.user)
-        species_names = Pet.objects.filter(
-            id__in=user_pets.values_list('pet', flat=True)
-        ).values_list('species_name', flat=True).distinct()
-        
-        # Get one pet record for each unique species
-        user_species = []
-        for species_name in species_names:
-            species = Pet.objects.filter(species_name=species_name).first()
-            if species:
-                user_species.append(species)
-        
-        serializer = PetSerializer(user_species, many=True, context={'request': request})
-        return JsonResponse(serializer.data, safe=False)
\ No newline at end of file
+        # One query: the first pet (lowest id) of each species the user has a pet of
+        user_species_names = Pet.objects.filter(user_pet__user=request.user).values('species_name')
+        user_species = Pet.objects.annotate(
+            species_rank=Window(RowNumber(), partition_by=F('species_name'), order_by=F('pk').asc()),
+        ).filter(species_name__in=user_species_names, species_rank=1).order_by('pk')
+
+        serializer = PetFastSerializer(request)
+        return JsonResponse(serializer.data(serializer.values(user_species)), safe=False)
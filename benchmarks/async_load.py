@@ -0,0 +1,131 @@
+"""
+Concurrent throughput of the read-heavy task endpoints: WSGI vs ASGI.
+
+WSGI: the APIViews called through django.test.Client from a pool of worker
+threads (like a threaded WSGI server). ASGI: the async views in
+API/async_views.py called through django.test.AsyncClient (ASGIHandler) as
+concurrent coroutines on one event loop.
+
+    python -m benchmarks.async_load [--requests 600] [--concurrency 16]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from benchmarks.setup_django import setup, percentile
+
+
+def populate(users, plants_per_user, tasks_per_plant):
+    from django.utils.timezone import now
+    from rest_framework.authtoken.models import Token
+    from API.models import Plant, Site, UserPlant, UserPlantTask, TaskToCheck
+    from users.models import User
+
+    species = Plant.objects.create(
+        species_name='Monstera', scientific_name='Monstera deliciosa', preferred_light='Bright',
+        ideal_temp='20C', toxicity='Toxic', ideal_water='Weekly',
+    )
+    tokens, plant_ids = [], []
+    for u in range(users):
+        user = User.objects.create(email=f'bench{u}@example.com', username=f'bench{u}')
+        tokens.append(Token.objects.create(user=user).key)
+        site = Site.objects.create(user=user, name='Living room', light='medium', location='indoor')
+        for p in range(plants_per_user):
+            user_plant = UserPlant.objects.create(user=user, plant=species, site=site, nickname=f'plant {p}')
+            plant_ids.append(user_plant.id)
+            for t in range(tasks_per_plant):
+                task = UserPlantTask.objects.create(user_plant=user_plant, name='watering', interval=t + 1, unit='day')
+                TaskToCheck.objects.create(user_plant_task=task, due_date=now() + timedelta(days=t - 2))
+                TaskToCheck.objects.create(
+                    user_plant_task=task, due_date=now() - timedelta(days=t + 1),
+                    is_completed=True, completed_at=now() - timedelta(days=1),
+                )
+    return tokens, plant_ids
+
+
+def summarize(label, durations, elapsed):
+    print(
+        f"{label:<34} {len(durations) / elapsed:8.1f} req/s  "
+        f"p50={percentile(durations, 50):7.2f}ms p95={percentile(durations, 95):7.2f}ms "
+        f"p99={percentile(durations, 99):7.2f}ms mean={statistics.mean(durations):7.2f}ms"
+    )
+
+
+def run_wsgi(paths, tokens, concurrency):
+    from django.test import Client
+
+    def call(i):
+        client = Client(headers={'Authorization': f'Token {tokens[i % len(tokens)]}'})
+        start = time.perf_counter()
+        response = client.get(paths[i])
+        assert response.status_code == 200, response.status_code
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        durations = list(executor.map(call, range(len(paths))))
+    return durations, time.perf_counter() - start
+
+
+def run_asgi(paths, tokens, concurrency):
+    from django.test import AsyncClient
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(i):
+            async with semaphore:
+                client = AsyncClient()
+                start = time.perf_counter()
+                response = await client.get(paths[i], headers={'Authorization': f'Token {tokens[i % len(tokens)]}'})
+                assert response.status_code == 200, response.status_code
+                return (time.perf_counter() - start) * 1000
+
+        return await asyncio.gather(*(call(i) for i in range(len(paths))))
+
+    start = time.perf_counter()
+    durations = asyncio.run(main())
+    return durations, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=600)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--plants', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=3)
+    args = parser.parse_args()
+
+    setup()
+    from django.core.cache import caches
+    from API.calendar_cache import CALENDAR_CACHE_ALIAS
+    from django.utils.timezone import now
+
+    tokens, plant_ids = populate(args.users, args.plants, args.tasks)
+    today = (now() - timedelta(days=1)).date().isoformat()
+    plants_per_user = args.plants
+
+    endpoints = {
+        'homepage': lambda prefix, i: f'/api/{prefix}tasks/homepage-tasks/',
+        'plant detail': lambda prefix, i: (
+            f'/api/{prefix}userPlant-details/'
+            f'{plant_ids[(i % len(tokens)) * plants_per_user + (i // len(tokens)) % plants_per_user]}/'
+        ),
+        'completed': lambda prefix, i: f'/api/{prefix}tasks/completed/{today}/',
+    }
+
+    print(f"{args.requests} requests per run, concurrency {args.concurrency}")
+    for name, build in endpoints.items():
+        for label, prefix, runner in (('WSGI', '', run_wsgi), ('ASGI', 'async/', run_asgi)):
+            caches[CALENDAR_CACHE_ALIAS].clear()
+            paths = [build(prefix, i) for i in range(args.requests)]
+            durations, elapsed = runner(paths, tokens, args.concurrency)
+            summarize(f"{label} {name}", durations, elapsed)
+
+
+if __name__ == '__main__':
+    main()
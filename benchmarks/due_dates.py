@@ -0,0 +1,59 @@
+"""
+Due-date computation for many tasks: per-task loop vs API.scheduling.next_due_dates.
+
+The per-task loop reproduces the previous calculate_next_due_date (a month
+counted as 4 weeks); next_due_dates uses calendar months.
+
+    python -m benchmarks.due_dates [--tasks 1000000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from API.scheduling import next_due_dates
+
+
+def legacy_next_due_date(last_completed_at, interval, unit):
+    if not last_completed_at:
+        return datetime.now()
+    if unit == 'day':
+        return last_completed_at + timedelta(days=interval)
+    elif unit == 'week':
+        return last_completed_at + timedelta(weeks=interval)
+    elif unit == 'month':
+        return last_completed_at + timedelta(weeks=4 * interval)
+    return last_completed_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    last_completed_ats = [start + timedelta(minutes=rng.randrange(60 * 24 * 700)) for _ in range(args.tasks)]
+    intervals = [rng.randint(1, 6) for _ in range(args.tasks)]
+    units = [rng.choice(('day', 'week', 'month')) for _ in range(args.tasks)]
+
+    t = time.perf_counter()
+    legacy = [legacy_next_due_date(*task) for task in zip(last_completed_ats, intervals, units)]
+    legacy_elapsed = time.perf_counter() - t
+
+    t = time.perf_counter()
+    batched = next_due_dates(last_completed_ats, intervals, units)
+    batched_elapsed = time.perf_counter() - t
+
+    drift = [
+        (old - new).total_seconds() / 86400
+        for old, new, unit in zip(legacy, batched, units) if unit == 'month'
+    ]
+    print(f"{args.tasks} tasks")
+    print(f"per-task loop (4-week months) {legacy_elapsed:7.3f}s  {args.tasks / legacy_elapsed / 1e6:5.2f}M tasks/s")
+    print(f"next_due_dates (calendar)     {batched_elapsed:7.3f}s  {args.tasks / batched_elapsed / 1e6:5.2f}M tasks/s")
+    print(f"monthly tasks: legacy result off by {min(drift):.1f} to {max(drift):.1f} days")
+
+
+if __name__ == '__main__':
+    main()
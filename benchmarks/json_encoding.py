@@ -0,0 +1,50 @@
+"""
+Encoding of a large homepage calendar payload to response bytes.
+
+The payload is the real 30-day calendar (API.calendar_cache) of a user with
+many plants and daily tasks. It is encoded the ways the views used to do it
+(django.http.JsonResponse with DjangoJSONEncoder, DRF's JSONRenderer) and
+with plantApp.renderers (orjson when installed, and its stdlib fallback).
+
+    python -m benchmarks.json_encoding [--plants 200] [--repeat 50]
+"""
+import argparse
+
+from benchmarks.setup_django import setup, timed, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--plants', type=int, default=200, help="Plants of the user (2 daily tasks each).")
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+    import json
+    from django.core.serializers.json import DjangoJSONEncoder
+    from rest_framework.renderers import JSONRenderer as DRFJSONRenderer
+    from API.calendar_cache import get_homepage_feed
+    from API.models import UserPlantTask
+    from benchmarks.synthetic import generate
+    from plantApp import renderers
+    from users.models import User
+
+    generate(users=1, plants_per_user=args.plants, tasks_per_plant=2, history_days=30, pets_per_user=0)
+    UserPlantTask.objects.update(interval=1, unit='day')
+    user = User.objects.get()
+    payload = get_homepage_feed(user)
+    print(f"Payload: {len(renderers.dumps(payload)) / 1024:.0f} KiB, orjson {'installed' if renderers.orjson else 'missing'}")
+
+    stdlib_encoder = renderers.StdlibEncoder(ensure_ascii=False, separators=(',', ':'))
+    encoders = {
+        'JsonResponse (DjangoJSONEncoder)': lambda: json.dumps(payload, cls=DjangoJSONEncoder).encode(),
+        'DRF JSONRenderer': lambda: DRFJSONRenderer().render(payload),
+        'plantApp.renderers stdlib fallback': lambda: stdlib_encoder.encode(payload).encode(),
+        'plantApp.renderers.dumps': lambda: renderers.dumps(payload),
+    }
+    for label, encode in encoders.items():
+        report(label, timed(encode, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Login throughput with synchronous vs background (queued) logging.
+
+Logins are sent by a pool of threads (like a threaded WSGI server) through
+django.test.Client. The log output goes to a sink that can be made slow
+(--sink-latency-ms) to emulate a blocked stdout pipe or a slow log
+collector. Three setups are compared:
+
+  sync        StreamHandler writing JSON on the request thread (what print()
+              or a plain handler does: the request waits for the write)
+  background  plantApp.log.BackgroundHandler (the default configuration)
+  off         no log output at all
+
+Passwords are hashed with MD5 here, so that PBKDF2 (several hundred ms per
+login) doesn't hide the cost of the logging itself.
+
+    python -m benchmarks.login_logging [--requests 400] [--concurrency 8] [--sink-latency-ms 2]
+"""
+import argparse
+import json
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.setup_django import setup, percentile
+
+
+class SlowSink:
+    """File-like object that takes `latency` seconds per write, like a full pipe."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.lines = 0
+
+    def write(self, text):
+        time.sleep(self.latency)
+        self.lines += text.count('\n')
+
+    def flush(self):
+        pass
+
+
+def configure(mode, sink):
+    from plantApp.log import BackgroundHandler, JsonFormatter, SamplingFilter
+
+    logger = logging.getLogger('users')
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        if isinstance(handler, BackgroundHandler):
+            handler.close()
+    if mode == 'off':
+        return None
+    if mode == 'sync':
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler = BackgroundHandler(sink)
+    handler.addFilter(SamplingFilter())
+    logger.addHandler(handler)
+    return handler
+
+
+def run(emails, password, requests, concurrency):
+    from django.test import Client
+
+    def call(i):
+        client = Client()
+        body = json.dumps({'email': emails[i % len(emails)], 'password': password})
+        start = time.perf_counter()
+        response = client.post('/api/login', body, content_type='application/json')
+        assert response.status_code == 200, response.status_code
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        durations = list(executor.map(call, range(requests)))
+    return durations, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--sink-latency-ms', type=float, default=2.0)
+    parser.add_argument('--no-sampling', action='store_true', help="Log every login (LOG_SAMPLE_RATES ignored).")
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from users.models import User
+
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    if args.no_sampling:
+        settings.LOG_SAMPLE_RATES = {}
+
+    password = 'bench-password'
+    emails = []
+    for u in range(args.users):
+        user = User.objects.create_user(email=f'login{u}@example.com', username=f'login{u}', password=password)
+        emails.append(user.email)
+
+    print(
+        f"{args.requests} logins, concurrency {args.concurrency}, sink latency {args.sink_latency_ms}ms, "
+        f"sampling {'off' if args.no_sampling else settings.LOG_SAMPLE_RATES}"
+    )
+    for mode in ('off', 'sync', 'background'):
+        sink = SlowSink(args.sink_latency_ms / 1000)
+        handler = configure(mode, sink)
+        run(emails, password, 20, args.concurrency)  # Warm-up
+        durations, elapsed = run(emails, password, args.requests, args.concurrency)
+        if mode == 'background':
+            handler.close()  # Flush what is still queued before counting
+        print(
+            f"{mode:<11} {len(durations) / elapsed:8.1f} logins/s  "
+            f"p50={percentile(durations, 50):7.2f}ms p99={percentile(durations, 99):7.2f}ms "
+            f"mean={statistics.mean(durations):7.2f}ms  log lines={sink.lines}"
+        )
+
+
+if __name__ == '__main__':
+    main()
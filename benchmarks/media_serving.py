@@ -0,0 +1,89 @@
+"""
+Media serving throughput: django.views.static.serve vs API.media.serve_media.
+
+Both views are called in-process through RequestFactory and the response
+body is fully consumed, so the numbers compare the Python-side cost of each
+view. Under a real WSGI server serve_media's full responses go through
+wsgi.file_wrapper (sendfile), and with MEDIA_SENDFILE_HEADER set Django
+only emits headers.
+
+    python -m benchmarks.media_serving [--repeat 200]
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.setup_django import setup, timed, report
+
+
+SIZES = {'thumbnail-30KB': 30 * 1024, 'photo-2MB': 2 * 1024 * 1024}
+
+
+def consume(response):
+    total = 0
+    for chunk in response:
+        total += len(chunk)
+    if hasattr(response, 'close'):
+        response.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.test import RequestFactory
+    from django.views.static import serve
+    from API import media
+    from API.media import serve_media
+
+    media_root = tempfile.mkdtemp(prefix='plantapp-media-')
+    settings.MEDIA_ROOT = media_root
+    for label, size in SIZES.items():
+        with open(os.path.join(media_root, f'{label}.jpg'), 'wb') as f:
+            f.write(os.urandom(size))
+
+    factory = RequestFactory()
+    for label, size in SIZES.items():
+        name = f'{label}.jpg'
+
+        def static_view():
+            consume(serve(factory.get('/media/' + name), name, document_root=media_root))
+
+        def media_view():
+            consume(serve_media(factory.get('/media/' + name), name))
+
+        def media_range():
+            consume(serve_media(factory.get('/media/' + name, HTTP_RANGE='bytes=0-65535'), name))
+
+        def media_sendfile():
+            consume(serve_media(factory.get('/media/' + name), name))
+
+        def media_revalidate():
+            consume(serve_media(factory.get('/media/' + name, HTTP_IF_NONE_MATCH=etag), name))
+
+        etag = serve_media(factory.get('/media/' + name), name)['ETag']
+
+        for title, func in (
+            ('static.serve', static_view),
+            ('serve_media', media_view),
+            ('serve_media Range 64KB', media_range),
+            ('serve_media 304', media_revalidate),
+        ):
+            durations = timed(func, args.repeat)
+            report(f"{label} {title}", durations)
+            total = sum(durations) / 1000
+            print(f"{'':<40} {args.repeat / total:10.0f} req/s")
+
+        media.MEDIA_SENDFILE_HEADER = 'X-Accel-Redirect'
+        durations = timed(media_sendfile, args.repeat)
+        media.MEDIA_SENDFILE_HEADER = None
+        report(f"{label} serve_media X-Accel-Redirect", durations)
+        print(f"{'':<40} {args.repeat / (sum(durations) / 1000):10.0f} req/s")
+
+
+if __name__ == '__main__':
+    main()
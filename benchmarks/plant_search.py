@@ -0,0 +1,63 @@
+"""
+Plant catalog search latency: LIKE scan vs the FTS5 index.
+
+    python -m benchmarks.plant_search [--plants 100000] [--repeat 50]
+"""
+import argparse
+import random
+
+from benchmarks.setup_django import setup, timed, report
+
+
+GENERA = [
+    'Monstera', 'Ficus', 'Calathea', 'Philodendron', 'Pothos', 'Sansevieria',
+    'Aloe', 'Begonia', 'Peperomia', 'Dracaena', 'Anthurium', 'Hoya',
+    'Alocasia', 'Maranta', 'Pilea', 'Echeveria', 'Haworthia', 'Spathiphyllum',
+]
+EPITHETS = [
+    'deliciosa', 'elastica', 'lyrata', 'orbifolia', 'aurea', 'trifasciata',
+    'vera', 'rex', 'obtusifolia', 'marginata', 'andraeanum', 'carnosa',
+    'zebrina', 'leuconeura', 'peperomioides', 'elegans', 'fasciata', 'wallisii',
+]
+QUERIES = ['mon', 'monstera', 'ficus lyr', 'cal orb', 'hoya', 'zz', 'peperomia obt']
+
+
+def populate(count):
+    from API.models import Plant
+
+    rng = random.Random(42)
+    batch = []
+    for i in range(count):
+        genus, epithet = rng.choice(GENERA), rng.choice(EPITHETS)
+        batch.append(Plant(
+            species_name=f"{genus} {epithet} {i}",
+            scientific_name=f"{genus} {epithet} var. {i}",
+            preferred_light='Bright indirect', ideal_temp='18-27C',
+            toxicity='Toxic to pets', ideal_water='Weekly',
+        ))
+        if len(batch) == 5000:
+            Plant.objects.bulk_create(batch)
+            batch = []
+    Plant.objects.bulk_create(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--plants', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+    from API.search import search_plants, _like_search
+
+    populate(args.plants)
+    print(f"catalog: {args.plants} plants, limit={args.limit}, {args.repeat} runs per query")
+
+    for query in QUERIES:
+        report(f"LIKE  {query!r}", timed(lambda: _like_search(query, args.limit), args.repeat))
+        report(f"FTS5  {query!r}", timed(lambda: search_plants(query, args.limit), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
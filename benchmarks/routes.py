@@ -0,0 +1,282 @@
+"""
+Benchmark every API route on a synthetic dataset.
+
+Drives each route of API/urls.py, API_pets/urls.py and users/urls.py through
+django.test.Client as one of the synthetic users, and reports latency
+percentiles, serial throughput (one client) and the number of SQL queries
+per request. Writes, deletes and other mutating calls run inside a
+transaction that is rolled back, so every repetition sees the same data.
+Routes not covered by the harness are listed at the end, so new ones get
+noticed.
+
+Results are saved as JSON (one file per run, named after the time and the
+git commit) and can be compared with an earlier run:
+
+    python -m benchmarks.routes [--users 20 --plants 10 --tasks 2] [--repeat 30]
+    python -m benchmarks.routes --compare benchmarks/results/<earlier run>.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from benchmarks.setup_django import setup, percentile
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# method, URL pattern (as in the urlconfs, for coverage), path, JSON body, label suffix, untimed setup callable
+Route = namedtuple('Route', 'method pattern path data variant before', defaults=(None, '', None))
+
+MUTATING_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+def build_routes(ctx):
+    """The requests sent for each route, filled in with ids from the synthetic dataset."""
+    from django.core.cache import caches
+    from API.calendar_cache import CALENDAR_CACHE_ALIAS
+
+    plant, user_plant, site = ctx['plant_id'], ctx['user_plant_id'], ctx['site_id']
+    task, check, checks = ctx['task_id'], ctx['check_id'], ctx['check_ids']
+    day, start, end = ctx['day'], ctx['history_start'], ctx['history_end']
+
+    return [
+        # users/urls.py
+        Route('POST', 'api/register', 'api/register', {'email': 'new-user@example.com', 'username': 'new', 'password': 'pw-12345'}),
+        Route('POST', 'api/login', 'api/login', {'email': ctx['email'], 'password': ctx['password']}),
+        Route('GET', 'api/user', 'api/user'),
+
+        # API/urls.py: catalog
+        Route('GET', 'api/plants/', 'api/plants/'),
+        Route('GET', 'api/plants/', 'api/plants/?page_size=50', variant='page'),
+        Route('GET', 'api/plants/', 'api/plants/?search=species 1', variant='search'),
+        Route('GET', 'api/plants/<int:plant_id>/', f'api/plants/{plant}/'),
+        Route('GET', 'api/catalog/bundle/', 'api/catalog/bundle/'),
+        Route('GET', 'api/catalog/bundle/', 'api/catalog/bundle/?since=1', variant='up to date'),
+
+        # User plants and sites
+        Route('GET', 'api/user-plants/', 'api/user-plants/'),
+        Route('POST', 'api/user-plants/', 'api/user-plants/', {'plant_id': plant, 'nickname': 'Bench', 'site_id': site}),
+        Route('PATCH', 'api/user-plants/<int:userPlant_id>/', f'api/user-plants/{user_plant}/', {'nickname': 'Renamed'}),
+        Route('DELETE', 'api/user-plants/<int:userPlant_id>/', f'api/user-plants/{user_plant}/'),
+        Route('GET', 'api/userPlant-details/<int:userPlant_id>/', f'api/userPlant-details/{user_plant}/'),
+        Route('GET', 'api/sites/', 'api/sites/'),
+        Route('POST', 'api/sites/', 'api/sites/', {'name': 'Office', 'light': 'low', 'location': 'indoor'}),
+        Route('GET', 'api/sites/<int:pk>/', f'api/sites/{site}/'),
+        Route('PATCH', 'api/sites/<int:pk>/', f'api/sites/{site}/', {'name': 'Kitchen'}),
+        Route('DELETE', 'api/sites/<int:pk>/', f'api/sites/{site}/'),
+        Route('POST', 'api/sites/<int:site_id>/plants/<int:userPlant_id>/remove/', f'api/sites/{site}/plants/{user_plant}/remove/'),
+
+        # Tasks
+        Route('GET', 'api/plants/<int:userPlant_id>/tasks/', f'api/plants/{user_plant}/tasks/'),
+        Route('POST', 'api/plants/<int:userPlant_id>/add-tasks/', f'api/plants/{user_plant}/add-tasks/', {'name': 'misting', 'interval': 3, 'unit': 'day'}),
+        Route('PUT', 'api/tasks/<int:task_id>/update/', f'api/tasks/{task}/update/', {'interval': 5, 'unit': 'day'}),
+        Route('DELETE', 'api/tasks/<int:task_id>/delete/', f'api/tasks/{task}/delete/'),
+        Route('GET', 'api/tasks/completed/<str:date_str>/', f'api/tasks/completed/{day}/'),
+        Route('GET', 'api/tasks/history/', f'api/tasks/history/?start={start}&end={end}'),
+        Route('GET', 'api/tasks/history/', f'api/tasks/history/?start={start}&end={end}&details=1', variant='details'),
+        Route('POST', 'api/tasks/<int:task_id>/complete/', f'api/tasks/{check}/complete/'),
+        Route('POST', 'api/tasks/complete/', 'api/tasks/complete/', {'task_ids': checks}),
+        Route('GET', 'api/tasks/homepage-tasks/', 'api/tasks/homepage-tasks/'),
+        Route('GET', 'api/tasks/homepage-tasks/', 'api/tasks/homepage-tasks/', variant='cold cache', before=caches[CALENDAR_CACHE_ALIAS].clear),
+
+        # Async versions
+        Route('GET', 'api/async/tasks/homepage-tasks/', 'api/async/tasks/homepage-tasks/'),
+        Route('GET', 'api/async/userPlant-details/<int:userPlant_id>/', f'api/async/userPlant-details/{user_plant}/'),
+        Route('GET', 'api/async/tasks/completed/<str:date_str>/', f'api/async/tasks/completed/{day}/'),
+
+        # API_pets/urls.py
+        Route('GET', 'api/user-pets/', 'api/user-pets/'),
+        Route('GET', 'api/user-pets/species/', 'api/user-pets/species/'),
+
+        # Last: deletes the token (rolled back, but it drops the token cache entry)
+        Route('POST', 'api/logout', 'api/logout'),
+    ]
+
+
+def api_patterns():
+    """Every URL pattern under api/, as 'api/<pattern>' strings."""
+    from django.urls import get_resolver, URLResolver
+
+    def walk(patterns, prefix):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns, prefix + str(pattern.pattern))
+            else:
+                yield prefix + str(pattern.pattern)
+
+    return sorted({p for p in walk(get_resolver().url_patterns, '') if p.startswith('api/')})
+
+
+def dataset_context(data):
+    """Pick the user and the ids the routes are called with."""
+    from django.utils.timezone import now
+    from API.models import Plant, UserPlant, TaskToCheck
+
+    user = data['users'][0]
+    user_plant = UserPlant.objects.filter(user_id=user['id'], site__isnull=False).order_by('pk').first()
+    task = user_plant.tasks.order_by('pk').first()
+    pending = list(
+        TaskToCheck.objects.filter(owner_id=user['id'], is_completed=False).order_by('pk').values_list('pk', flat=True)[:10]
+    )
+    today = now().date()
+    return {
+        'token': user['token'],
+        'email': user['email'],
+        'password': data['password'],
+        'plant_id': Plant.objects.order_by('pk').values_list('pk', flat=True).first(),
+        'user_plant_id': user_plant.pk,
+        'site_id': user_plant.site_id,
+        'task_id': task.pk,
+        'check_id': pending[0],
+        'check_ids': pending,
+        'day': (today - timedelta(days=1)).isoformat(),
+        'history_start': (today - timedelta(days=364)).isoformat(),
+        'history_end': today.isoformat(),
+    }
+
+
+def run_route(client, route, repeat, max_seconds):
+    """Call a route `repeat` times (or until max_seconds) and return its measurements."""
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+
+    send = getattr(client, route.method.lower())
+    path = '/' + route.path
+
+    def call():
+        if route.before:
+            route.before()
+        kwargs = {'data': json.dumps(route.data), 'content_type': 'application/json'} if route.data is not None else {}
+        if route.method in MUTATING_METHODS:
+            with transaction.atomic():
+                start = time.perf_counter()
+                response = send(path, **kwargs)
+                elapsed = time.perf_counter() - start
+                transaction.set_rollback(True)
+        else:
+            start = time.perf_counter()
+            response = send(path, **kwargs)
+            elapsed = time.perf_counter() - start
+        return response, elapsed * 1000
+
+    # Warm-up (token cache, calendar cache...), then one untimed call for the status and query count
+    call()
+    with CaptureQueriesContext(connection) as queries:
+        response, _ = call()
+    status = response.status_code
+    query_count = len(queries)
+    db_ms = sum(float(query['time']) for query in queries.captured_queries) * 1000
+
+    durations = []
+    deadline = time.perf_counter() + max_seconds
+    while len(durations) < repeat and (len(durations) < 3 or time.perf_counter() < deadline):
+        durations.append(call()[1])
+
+    return {
+        'method': route.method,
+        'path': route.path,
+        'status': status,
+        'queries': query_count,
+        'db_ms': round(db_ms, 3),
+        'samples': len(durations),
+        'p50_ms': round(percentile(durations, 50), 3),
+        'p95_ms': round(percentile(durations, 95), 3),
+        'p99_ms': round(percentile(durations, 99), 3),
+        'mean_ms': round(statistics.mean(durations), 3),
+        'req_per_s': round(1000 / statistics.mean(durations), 1),
+    }
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return revision + ('-dirty' if dirty else '')
+
+
+def print_results(results, previous=None):
+    previous = (previous or {}).get('routes', {})
+    print(f"{'route':<64} {'status':>6} {'queries':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+    for name, result in results['routes'].items():
+        line = (
+            f"{name:<64} {result['status']:>6} {result['queries']:>7} {result['p50_ms']:>9.2f} "
+            f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['req_per_s']:>8.1f}"
+        )
+        before = previous.get(name)
+        if before:
+            change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+            line += f"   p50 {change:+6.1f}%  queries {before['queries']} -> {result['queries']}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--plants', type=int, default=10, help="Plants per user.")
+    parser.add_argument('--tasks', type=int, default=2, help="Tasks per plant (at most 4).")
+    parser.add_argument('--history-days', type=int, default=365)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=30, help="Timed calls per route.")
+    parser.add_argument('--max-seconds', type=float, default=5.0,
+                        help="Stop timing a slow route (e.g. login, password hashing) after this long.")
+    parser.add_argument('--only', help="Only run the routes whose name contains this text.")
+    parser.add_argument('--output', help="Where to save the results (default: benchmarks/results/<time>-<commit>.json).")
+    parser.add_argument('--compare', help="Results file of an earlier run to compare with.")
+    args = parser.parse_args()
+
+    setup()
+    import django
+    from django.test import Client
+    from benchmarks.synthetic import generate
+
+    data = generate(args.users, args.plants, args.tasks, args.history_days, seed=args.seed)
+    # The bundle endpoint only serves bundles already exported
+    from API.bundles import refresh_bundle
+    refresh_bundle()
+    ctx = dataset_context(data)
+    client = Client(headers={'Authorization': f"Token {ctx['token']}"})
+
+    results = {
+        'revision': git_revision(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'dataset': dict(data['counts'], history_days=args.history_days, seed=args.seed),
+        'routes': {},
+    }
+
+    routes = build_routes(ctx)
+    for route in routes:
+        name = f"{route.method} {route.pattern}" + (f" ({route.variant})" if route.variant else '')
+        if args.only and args.only not in name:
+            continue
+        results['routes'][name] = run_route(client, route, args.repeat, args.max_seconds)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        print(f"Compared with {previous['revision']} ({previous['date']})")
+    print(f"Dataset: {results['dataset']}")
+    print_results(results, previous)
+
+    uncovered = sorted(set(api_patterns()) - {route.pattern for route in routes})
+    if uncovered:
+        print("Not benchmarked:", ', '.join(uncovered))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{results['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
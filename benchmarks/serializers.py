@@ -0,0 +1,74 @@
+"""
+DRF serializers vs the compiled read-only serializers (API.fast_serializers).
+
+For each list endpoint's serializer, the same rows are serialized both ways
+(query included: select_related model instances for DRF, `.values()` rows
+for the compiled serializer), after checking that both give identical JSON.
+Every row has an image, so the absolute URL building is part of the cost.
+
+    python -m benchmarks.serializers [--rows 2000] [--repeat 20]
+"""
+import argparse
+import json
+
+from benchmarks.setup_django import setup, timed, percentile
+
+
+def cases(request):
+    from API.fast_serializers import PlantFastSerializer, UserPlantFastSerializer
+    from API.models import Plant, UserPlant
+    from API.serializers import PlantSerializer, UserPlantSerializer
+    from API_pets.fast_serializers import PetFastSerializer, UserPetFastSerializer
+    from API_pets.models import Pet, UserPet
+    from API_pets.serializers import PetSerializer, UserPetSerializer
+
+    return [
+        ('PlantSerializer', Plant.objects.order_by('pk'), PlantSerializer, PlantFastSerializer),
+        ('UserPlantSerializer', UserPlant.objects.select_related('plant', 'site').order_by('pk'),
+         UserPlantSerializer, UserPlantFastSerializer),
+        ('PetSerializer', Pet.objects.order_by('pk'), PetSerializer, PetFastSerializer),
+        ('UserPetSerializer', UserPet.objects.select_related('pet').order_by('pk'), UserPetSerializer, UserPetFastSerializer),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000, help="Rows per model (about).")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    from django.test import RequestFactory
+    from API.models import Plant, UserPlant
+    from API_pets.models import Pet, UserPet
+    from benchmarks.synthetic import generate
+
+    users = max(1, args.rows // 20)
+    generate(users=users, plants_per_user=20, tasks_per_plant=0, history_days=0,
+             pets_per_user=20, species=args.rows, seed=0)
+    for model, folder in ((Plant, 'plants'), (UserPlant, 'user_plants'), (Pet, 'pets'), (UserPet, 'user_pets')):
+        for pk in model.objects.values_list('pk', flat=True):
+            model.objects.filter(pk=pk).update(image=f'{folder}/image-{pk}.jpg')
+
+    request = RequestFactory().get('/api/user-plants/')
+    print(f"{'serializer':<22}{'rows':>7}{'DRF µs/row':>13}{'fast µs/row':>13}{'speedup':>9}")
+    for label, queryset, drf_class, fast_class in cases(request):
+        def drf():
+            return drf_class(queryset.all(), many=True, context={'request': request}).data
+
+        def fast():
+            serializer = fast_class(request)
+            return serializer.data(serializer.values(queryset.all()))
+
+        assert json.dumps(drf()) == json.dumps(fast()), f"{label}: outputs differ"
+        rows = queryset.count()
+        drf_ms = percentile(timed(drf, args.repeat), 50)
+        fast_ms = percentile(timed(fast, args.repeat), 50)
+        print(
+            f"{label:<22}{rows:>7}{drf_ms * 1000 / rows:>13.2f}{fast_ms * 1000 / rows:>13.2f}"
+            f"{drf_ms / fast_ms:>8.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Bootstrap Django for the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite database (never db.sqlite3) so they
+can create as much synthetic data as they need. Run them from the project
+root, e.g. `python -m benchmarks.plant_search`.
+"""
+import os
+import statistics
+import tempfile
+import time
+
+
+def setup(db_path=None):
+    """Configure Django on a fresh, migrated database and return its path."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plantApp.settings')
+
+    import django
+    from django.conf import settings
+
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='plantapp-bench-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.CATALOG_BUNDLE_DIR = os.path.join(os.path.dirname(db_path), 'catalog_bundles')
+    # Requests are sent through django.test clients
+    settings.ALLOWED_HOSTS = list(settings.ALLOWED_HOSTS) + ['testserver']
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def timed(func, repeat):
+    """Call func `repeat` times and return the individual durations in milliseconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def percentile(durations, pct):
+    ordered = sorted(durations)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def report(label, durations):
+    print(
+        f"{label:<40} p50={percentile(durations, 50):8.3f}ms "
+        f"p95={percentile(durations, 95):8.3f}ms "
+        f"mean={statistics.mean(durations):8.3f}ms"
+    )
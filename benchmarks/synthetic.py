@@ -0,0 +1,179 @@
+"""
+Synthetic data for benchmarks and load tests.
+
+Creates N users x M plants x K tasks per plant, with a realistic completion
+history: every task was completed roughly on schedule (sometimes late,
+sometimes skipped) over the last `history_days` days and has one pending
+check, overdue for about a fifth of them. Users also get sites and pets. The
+same seed always produces the same data.
+
+Used by benchmarks/routes.py, or on its own to fill a database for manual
+load tests (e.g. against runserver):
+
+    python -m benchmarks.synthetic --db /tmp/load.sqlite3 --users 100 --plants 20 --tasks 2
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+
+# Password of every synthetic user (hashed once, shared by all of them)
+PASSWORD = 'bench-password'
+
+TASK_INTERVALS = {
+    'day': (1, 14),
+    'week': (1, 4),
+    'month': (1, 2),
+}
+
+
+def _interval_delta(interval, unit):
+    if unit == 'month':
+        return timedelta(days=30 * interval)
+    if unit == 'week':
+        return timedelta(weeks=interval)
+    return timedelta(days=interval)
+
+
+def generate(users=10, plants_per_user=10, tasks_per_plant=2, history_days=180,
+             pets_per_user=2, species=50, seed=0, batch_size=2000):
+    """
+    Fill the current database and return what the benchmarks need to call
+    the API: {'users': [{'id', 'email', 'token'}, ...], 'password', 'counts'}.
+    """
+    from django.contrib.auth.hashers import make_password
+    from django.utils.timezone import now
+    from rest_framework.authtoken.models import Token
+    from API.models import Plant, Site, UserPlant, UserPlantTask, TaskToCheck
+    from API_pets.models import Pet, UserPet
+    from users.models import User
+
+    rng = random.Random(seed)
+    current_time = now()
+
+    plants = Plant.objects.bulk_create([
+        Plant(
+            species_name=f"Species {i}", scientific_name=f"Plantae synthetica {i}",
+            preferred_light=rng.choice(['Low', 'Medium', 'Bright indirect']), ideal_temp='18-27C',
+            toxicity=rng.choice(['Toxic to pets', 'Non-toxic']), ideal_water=rng.choice(['Weekly', 'Every 2 weeks']),
+            description=f"Synthetic species number {i}.",
+        )
+        for i in range(species)
+    ], batch_size=batch_size)
+    pets = Pet.objects.bulk_create([
+        Pet(
+            species_name=rng.choice(['Dog', 'Cat', 'Rabbit', 'Parrot']), scientific_name=f"Animalia synthetica {i}",
+            breed_name=f"Breed {i}", lifespan='10-15 years', daily_sleep='12h', gestation='60 days',
+        )
+        for i in range(max(1, species // 5))
+    ], batch_size=batch_size)
+
+    password = make_password(PASSWORD)
+    user_rows = User.objects.bulk_create([
+        User(email=f"bench{u}@example.com", username=f"bench{u}", password=password)
+        for u in range(users)
+    ], batch_size=batch_size)
+    tokens = Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in user_rows])
+
+    sites = Site.objects.bulk_create([
+        Site(user=user, name=name, light=light, location=location)
+        for user in user_rows
+        for name, light, location in (('Living room', 'medium', 'indoor'), ('Balcony', 'high', 'outdoor'))
+    ], batch_size=batch_size)
+    sites_by_user = {}
+    for site in sites:
+        sites_by_user.setdefault(site.user_id, []).append(site)
+
+    user_plants = UserPlant.objects.bulk_create([
+        UserPlant(
+            user=user, plant=rng.choice(plants), nickname=f"{user.username} plant {p}" if rng.random() < 0.7 else None,
+            site=rng.choice(sites_by_user[user.pk] + [None]),
+        )
+        for user in user_rows
+        for p in range(plants_per_user)
+    ], batch_size=batch_size)
+
+    tasks = []
+    for user_plant in user_plants:
+        for name, label in rng.sample(UserPlantTask.TASK_CHOICES, min(tasks_per_plant, len(UserPlantTask.TASK_CHOICES))):
+            unit = rng.choice(list(TASK_INTERVALS))
+            tasks.append(UserPlantTask(
+                user_plant=user_plant, name=name, unit=unit, interval=rng.randint(*TASK_INTERVALS[unit]),
+            ))
+
+    # Walk each task's schedule over the history window
+    checks = []
+    for task in tasks:
+        owner_id = task.user_plant.user_id
+        step = _interval_delta(task.interval, task.unit)
+        due_date = current_time - timedelta(days=history_days) + rng.random() * step
+        last_completed_at = None
+        while True:
+            completed_at = due_date + timedelta(hours=rng.expovariate(1 / 12))
+            if completed_at >= current_time or (due_date + step >= current_time and rng.random() < 0.2):
+                break  # Stays pending (overdue when due_date is in the past)
+            if rng.random() < 0.9:
+                checks.append(TaskToCheck(
+                    user_plant_task=task, owner_id=owner_id, due_date=due_date,
+                    is_completed=True, completed_at=completed_at,
+                ))
+                last_completed_at = completed_at
+            due_date = (last_completed_at or due_date) + step
+        task.last_completed_at = last_completed_at
+        checks.append(TaskToCheck(user_plant_task=task, owner_id=owner_id, due_date=due_date))
+
+    UserPlantTask.objects.bulk_create(tasks, batch_size=batch_size)
+    TaskToCheck.objects.bulk_create(checks, batch_size=batch_size)
+
+    user_pets = UserPet.objects.bulk_create([
+        UserPet(
+            user=user, pet=rng.choice(pets), nickname=f"{user.username} pet {p}",
+            birth_date=(current_time - timedelta(days=rng.randint(100, 4000))).date(),
+        )
+        for user in user_rows
+        for p in range(pets_per_user)
+    ], batch_size=batch_size)
+
+    return {
+        'users': [
+            {'id': user.pk, 'email': user.email, 'token': token.key}
+            for user, token in zip(user_rows, tokens)
+        ],
+        'password': PASSWORD,
+        'counts': {
+            'users': len(user_rows),
+            'plants': len(plants),
+            'user_plants': len(user_plants),
+            'tasks': len(tasks),
+            'task_checks': len(checks),
+            'user_pets': len(user_pets),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help="SQLite file to create (default: a temporary one).")
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--plants', type=int, default=10, help="Plants per user.")
+    parser.add_argument('--tasks', type=int, default=2, help="Tasks per plant (at most 4).")
+    parser.add_argument('--history-days', type=int, default=180)
+    parser.add_argument('--pets', type=int, default=2, help="Pets per user.")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    from benchmarks.setup_django import setup
+    db_path = setup(args.db)
+
+    start = time.perf_counter()
+    data = generate(args.users, args.plants, args.tasks, args.history_days, args.pets, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"Database: {db_path}")
+    for name, count in data['counts'].items():
+        print(f"  {name:<12} {count}")
+    print(f"Generated in {elapsed:.1f}s. Users log in as bench<N>@example.com / {data['password']}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Structured, non-blocking logging.
+
+Records are formatted as one JSON object per line by a background thread:
+request threads only put the record on a bounded queue (BackgroundHandler),
+so a slow or blocked stdout never holds up a request. When the queue is
+full, records are dropped and counted rather than waiting; the count is
+logged as a `log.dropped` warning once the queue has room again, and when
+the handler is closed.
+
+Keyword data goes in `extra`, and an `event` name makes records easy to
+filter and lets high-volume events be sampled (settings.LOG_SAMPLE_RATES):
+
+    logger.info("User logged in", extra={'event': 'login.success', 'user_id': user.pk})
+"""
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from django.conf import settings
+
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as a single-line JSON object, with its `extra` fields at the top level."""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of the records of high-volume events, as set in
+    settings.LOG_SAMPLE_RATES ({'event name': rate between 0 and 1}).
+    Warnings and errors are always kept. Kept records carry their
+    `sample_rate` so counts can be scaled back up.
+    """
+
+    def filter(self, record):
+        rate = getattr(settings, 'LOG_SAMPLE_RATES', {}).get(getattr(record, 'event', None))
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        record.sample_rate = rate
+        return random.random() < rate
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    Hand records to a background thread that formats them as JSON and
+    writes them to `stream` (stdout by default). Dropped records are
+    reported at most every `report_interval` seconds.
+    """
+
+    def __init__(self, stream=None, maxsize=10000, report_interval=10):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+        # Drops already logged, and when
+        self.reported = 0
+        self.report_interval = report_interval
+        self.last_report = float('-inf')
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.target.setFormatter(JsonFormatter())
+        self.listener = QueueListener(self.queue, self.target)
+        # Stopped (pending records flushed) by close(), which logging calls at exit
+        self.listener.start()
+
+    def prepare(self, record):
+        # Render the message and traceback now (the arguments may change
+        # before the writer thread gets to them), but keep the extra fields
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def dropped_record(self):
+        """Warning about the records dropped since the last report."""
+        count = self.dropped - self.reported
+        return logging.makeLogRecord({
+            'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+            'msg': f"{count} log record(s) dropped: the logging queue was full",
+            'event': 'log.dropped', 'dropped': count, 'dropped_total': self.dropped,
+        })
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        # Room again: report what was dropped meanwhile
+        if self.dropped > self.reported and time.monotonic() - self.last_report >= self.report_interval:
+            try:
+                self.queue.put_nowait(self.dropped_record())
+            except queue.Full:
+                return
+            self.reported = self.dropped
+            self.last_report = time.monotonic()
+
+    def close(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+        # Queue flushed: the last drops are written directly
+        if self.dropped > self.reported:
+            self.target.handle(self.dropped_record())
+            self.reported = self.dropped
+        super().close()
+
+
+def parse_log_levels(value):
+    """Levels per module from the LOG_LEVELS environment variable ("users.views=DEBUG,API=WARNING")."""
+    return dict(item.strip().split('=', 1) for item in value.split(',') if '=' in item)
+
+
+def logging_config(levels, root_level='WARNING'):
+    """
+    Build the LOGGING setting: every logger goes through one BackgroundHandler,
+    with a level per module ({'users.views': 'INFO', ...}).
+    """
+    return {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'filters': {
+            'sampling': {'()': 'plantApp.log.SamplingFilter'},
+        },
+        'handlers': {
+            'background': {
+                'class': 'plantApp.log.BackgroundHandler',
+                'filters': ['sampling'],
+            },
+        },
+        'root': {'handlers': ['background'], 'level': root_level},
+        'loggers': {
+            name: {'level': level, 'handlers': ['background'], 'propagate': False}
+            for name, level in levels.items()
+        },
+    }
@@ -0,0 +1,146 @@
+import logging
+import os
+import time
+import traceback
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+logger = logging.getLogger(__name__)
+
+# Queries slower than this (milliseconds) are logged with the line that ran them
+SLOW_QUERY_MS = getattr(settings, 'SLOW_QUERY_MS', 100)
+
+_PROJECT_ROOT = str(settings.BASE_DIR)
+_THIS_FILE = os.path.abspath(__file__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised (in tests) when a request runs more queries than its URL's budget."""
+
+
+def call_site():
+    """The innermost frame of project code (not Django, DRF or this module) on the stack, as 'file:line in func'."""
+    for frame in reversed(traceback.extract_stack()):
+        path = os.path.abspath(frame.filename)
+        if path.startswith(_PROJECT_ROOT) and path != _THIS_FILE and 'site-packages' not in path:
+            return f"{os.path.relpath(path, _PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+    return 'unknown'
+
+
+class QueryStats:
+    """Database execute wrapper counting the queries of one request and their total time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if elapsed * 1000 >= SLOW_QUERY_MS:
+                logger.warning(
+                    "Slow query (%.1f ms) at %s: %s", elapsed * 1000, call_site(), sql[:500]
+                )
+
+
+# Stats of the request being handled. Connections are per thread and, under
+# ASGI, the ORM runs in sync_to_async threads: those inherit the context of
+# the request, so every connection carries one wrapper reading it.
+_request_stats = ContextVar('request_query_stats', default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def install_query_counter(connection, **kwargs):
+    if count_query not in connection.execute_wrappers:
+        # First, so the temporary wrappers added (and popped) around it are left alone
+        connection.execute_wrappers.insert(0, count_query)
+
+
+connection_created.connect(install_query_counter)
+
+
+class QueryBudgetMiddleware:
+    """
+    Count the ORM queries and DB time of every request.
+
+    Requests whose URL has a budget in settings.QUERY_BUDGETS (keyed by URL
+    name, or by route for unnamed URLs) and goes over it are logged, or fail
+    when settings.QUERY_BUDGET_RAISE is set (it is by the test runner, see
+    plantApp/test_runner.py), so N+1 regressions break the tests. With DEBUG
+    on, the numbers are sent back in the X-Query-Count and Server-Timing
+    headers.
+
+    Sync and async capable: under ASGI the async views keep running on the
+    event loop instead of a thread per request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        for connection in connections.all():
+            # Connections opened before this module was loaded
+            install_query_counter(connection)
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        return self.process_stats(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        return self.process_stats(request, response, stats)
+
+    def process_stats(self, request, response, stats):
+        self.check_budget(request, stats)
+
+        if settings.DEBUG:
+            response['X-Query-Count'] = str(stats.count)
+            response['Server-Timing'] = f'db;desc="{stats.count} queries";dur={stats.duration * 1000:.2f}'
+        return response
+
+    def check_budget(self, request, stats):
+        match = request.resolver_match
+        if match is None:
+            return
+        budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        budget = budgets.get(match.url_name, budgets.get(match.route))
+        if budget is None or stats.count <= budget:
+            return
+
+        message = (
+            f"{request.method} {request.path} ({match.url_name or match.route}) ran {stats.count} queries, "
+            f"over its budget of {budget} ({stats.duration * 1000:.1f} ms in the database)"
+        )
+        if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,97 @@
+"""
+JSON encoding shared by every API response.
+
+Payloads are encoded straight to UTF-8 bytes with orjson when it is
+installed, and with the standard library json module otherwise. Both give
+the same output: compact, non-ASCII characters kept as they are, and
+datetimes in ISO 8601 with a 'Z' for UTC.
+
+Views use JsonResponse from here (a drop-in for django.http.JsonResponse),
+and DRF's Response goes through JSONRenderer (settings.REST_FRAMEWORK).
+"""
+import datetime
+import decimal
+import json
+import uuid
+from django.db.models.query import QuerySet
+from django.http import HttpResponse
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def default(obj):
+    """Encode the types neither encoder handles on its own (Decimal, lazy strings, querysets...)."""
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        # As a string, like DRF's DecimalField and Django's JsonResponse: no float rounding
+        return str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if isinstance(obj, QuerySet) or hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class StdlibEncoder(json.JSONEncoder):
+    """Fallback encoder giving the same output as orjson for the types it handles natively."""
+
+    def default(self, obj):
+        if isinstance(obj, datetime.datetime):
+            representation = obj.isoformat()
+            return representation[:-6] + 'Z' if representation.endswith('+00:00') else representation
+        if isinstance(obj, (datetime.date, datetime.time)):
+            return obj.isoformat()
+        if isinstance(obj, uuid.UUID):
+            return str(obj)
+        return default(obj)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def dumps(data, indent=False):
+        """Encode `data` as JSON bytes (indented by 2 spaces with `indent`)."""
+        option = _ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else _ORJSON_OPTIONS
+        return orjson.dumps(data, default=default, option=option)
+
+else:
+    _encoder = StdlibEncoder(ensure_ascii=False, separators=(',', ':'))
+    _indent_encoder = StdlibEncoder(ensure_ascii=False, indent=2)
+
+    def dumps(data, indent=False):
+        """Encode `data` as JSON bytes (indented by 2 spaces with `indent`)."""
+        return (_indent_encoder if indent else _encoder).encode(data).encode()
+
+
+class JSONRenderer(BaseRenderer):
+    """DRF renderer encoding with dumps(). Indented when asked to (browsable API, `; indent=` in Accept)."""
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = (renderer_context or {}).get('indent') or 'indent=' in (accepted_media_type or '')
+        return dumps(data, indent=bool(indent))
+
+
+class JsonResponse(HttpResponse):
+    """
+    django.http.JsonResponse encoding with dumps(). Like Django's, `data`
+    must be a dict unless `safe` is False.
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError("In order to allow non-dict objects to be serialized set the safe parameter to False.")
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
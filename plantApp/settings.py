@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+from plantApp.log import logging_config, parse_log_levels
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -36,6 +37,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so the queries of every other middleware are counted too
+    'plantApp.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,6 +81,31 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# 'shared' holds the state every worker must see the same: the catalog and
+# pet version counters behind the ETags, the bundle export lock and the
+# per-user homepage calendars. LocMemCache is per process, so with several
+# workers (gunicorn, uvicorn) a write handled by one of them isn't seen by
+# the others: point 'shared' at Redis or Memcached in production, e.g.
+#     'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#     'LOCATION': 'redis://127.0.0.1:6379',
+# (`manage.py check --deploy` warns while it is still LocMemCache).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'plantApp',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'plantApp-shared',
+    },
+}
+CATALOG_CACHE_ALIAS = 'shared'
+CALENDAR_CACHE_ALIAS = 'shared'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -153,14 +181,116 @@ ALLOWED_HOSTS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        # Token issued by LoginView, resolved through an in-process cache
+        'users.authentication.CachedTokenAuthentication',
+        # Kept for clients that still send Basic credentials
         'rest_framework.authentication.BasicAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson (or stdlib json) encoding, shared with plantApp.renderers.JsonResponse
+    'DEFAULT_RENDERER_CLASSES': [
+        'plantApp.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# In-process token -> user cache used by CachedTokenAuthentication
+TOKEN_CACHE_SIZE = 1024
+TOKEN_CACHE_TTL = 300  # seconds
+
+# Maximum number of SQL queries per request, by URL name (or route for the
+# unnamed users/ URLs). Over budget: a warning in the logs, a failure under
+# `manage.py test`. Measured with benchmarks/routes.py, plus one query for a
+# token cache miss.
+QUERY_BUDGETS = {
+    'plant-list': 5,
+    'plant-detail': 2,
+    'catalog-bundle': 3,
+    'userPlant-list-create': 7,
+    'userPlant-update-delete': 11,
+    'userPlant-detail': 4,
+    'site-list-create': 4,
+    'site-detail': 7,
+    'remove-plant-from-site': 7,
+    'plant-tasks': 3,
+    'add-task': 7,
+    'update-task-frequency': 6,
+    'delete-task': 10,
+    'completed-tasks-by-date': 3,
+    'completed-tasks-history': 5,
+    'mark-task-completed': 9,
+    'mark-tasks-completed': 9,
+    'homepage-tasks': 2,
+    'async-homepage-tasks': 2,
+    'async-userPlant-detail': 4,
+    'async-completed-tasks-by-date': 3,
+    'userPet-list': 2,
+    'user-pet-species': 2,
+    'api/register': 6,
+    'api/login': 5,
+    'api/user': 2,
+    'api/logout': 4,
+}
+# Fail over-budget requests instead of logging them. Turned on by the test
+# runner (plantApp/test_runner.py).
+QUERY_BUDGET_RAISE = False
+TEST_RUNNER = 'plantApp.test_runner.TestRunner'
+
+# Queries slower than this (ms) are logged with their call site
+SLOW_QUERY_MS = 100
+
+# Logs are written as JSON lines by a background thread (see plantApp/log.py).
+# Level per module; override from the environment, e.g.
+# LOG_LEVELS="users.views=DEBUG,API=WARNING"
+LOG_LEVELS = {
+    'django': 'WARNING',
+    'django.server': 'INFO',
+    'plantApp': 'INFO',
+    'API': 'INFO',
+    'API_pets': 'INFO',
+    'users': 'INFO',
+}
+LOG_LEVELS.update(parse_log_levels(os.environ.get('LOG_LEVELS', '')))
+LOGGING = logging_config(LOG_LEVELS)
+
+# Fraction of the records kept for high-volume events (warnings are always kept)
+LOG_SAMPLE_RATES = {
+    'login.success': 0.1,
+    'logout': 0.1,
+}
+
+# Completed task checks older than this are moved to the history table by
+# `manage.py archive_tasks` (they no longer show on the homepage calendar)
+TASK_ARCHIVE_AFTER_DAYS = 90
+
+# Offline catalog bundles (API/bundles.py): where they are written, and how
+# many versions are kept for delta downloads
+CATALOG_BUNDLE_DIR = BASE_DIR / 'catalog_bundles'
+CATALOG_BUNDLE_KEEP = 10
+# Export a new bundle in the background after catalog writes (otherwise only
+# `manage.py export_catalog_bundle` does)
+CATALOG_BUNDLE_BACKGROUND_EXPORT = True
+
+# Uploaded files are stored once per content (see API/storage.py)
+STORAGES = {
+    'default': {
+        'BACKEND': 'API.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
 }
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media served by API.media.serve_media. Behind nginx, set MEDIA_SENDFILE_HEADER
+# to 'X-Accel-Redirect' (with an internal location at MEDIA_SENDFILE_PREFIX)
+# so the web server sends the bytes itself.
+SERVE_MEDIA = True
+MEDIA_SENDFILE_HEADER = None
+MEDIA_SENDFILE_PREFIX = '/protected-media/'
+
 AUTH_PASSWORD_VALIDATORS = []
@@ -0,0 +1,19 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Django's test runner, with requests over their query budget failing the
+    tests (see QueryBudgetMiddleware), and no catalog bundle exports running
+    in threads outside the test transactions (tests export explicitly).
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.budget_settings = override_settings(QUERY_BUDGET_RAISE=True, CATALOG_BUNDLE_BACKGROUND_EXPORT=False)
+        self.budget_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.budget_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -1,7 +1,8 @@
+import re
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from API.media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -11,5 +12,9 @@ urlpatterns = [
 
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+# Media files, with caching headers, Range support and optional X-Sendfile handoff (see API/media.py).
+# Set SERVE_MEDIA = False when the web server maps MEDIA_URL to MEDIA_ROOT directly.
+if getattr(settings, 'SERVE_MEDIA', True):
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+    ]
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def _row(instance):
+    """Field values of a model instance, enough to build an identical one with from_db()."""
+    return instance._state.db, tuple(getattr(instance, field.attname) for field in instance._meta.concrete_fields)
+
+
+def _from_row(model, row):
+    db, values = row
+    return model.from_db(db, [field.attname for field in model._meta.concrete_fields], values)
+
+
+class TokenCache:
+    """
+    Bounded LRU of token key -> (user, token) with a time-to-live.
+
+    Entries are evicted when the cache is full (least recently used first),
+    when they are older than `ttl` seconds, or explicitly on revocation. The
+    cache is per process: other workers notice a revoked token once their own
+    entry expires, so keep the TTL short.
+
+    Only the field values are kept: every hit builds a new User and Token, so
+    one request changing its request.user doesn't leak into the others.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(user, token) of a cached key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user_id, user_row, token_row, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+        user = _from_row(get_user_model(), user_row)
+        token = _from_row(Token, token_row)
+        token.user = user
+        return user, token
+
+    def set(self, key, user, token):
+        with self._lock:
+            self._entries[key] = (user.pk, _row(user), _row(token), time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def revoke(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def revoke_user(self, user_id):
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(
+    maxsize=getattr(settings, 'TOKEN_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'TOKEN_CACHE_TTL', 300),
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication ("Authorization: Token <key>") that resolves keys
+    through the in-process token cache, so a warm request touches neither the
+    database nor the password hasher.
+    """
+
+    def authenticate_credentials(self, key):
+        # (user, Token) on a hit as on a miss
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Raises AuthenticationFailed for unknown keys and inactive users
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token)
+        return (user, token)
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .models import User
+from .authentication import token_cache
+
+
+# Drop cached principals as soon as a token is revoked (logout) or its user changes
+
+@receiver(post_delete, sender=Token)
+def revoke_cached_token(sender, instance, **kwargs):
+    token_cache.revoke(instance.key)
+
+
+@receiver([post_save, post_delete], sender=User)
+def revoke_cached_user(sender, instance, **kwargs):
+    token_cache.revoke_user(instance.pk)
@@ -1,3 +1,89 @@
+from unittest import mock
 from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+from .authentication import CachedTokenAuthentication, TokenCache, token_cache
+from .models import User
 
-# Create your tests here.
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(email='cache@example.com', username='cache', password='pw')
+        self.token = Token.objects.create(user=self.user)
+
+    def authenticate(self):
+        request = APIRequestFactory().get('/api/user', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        return CachedTokenAuthentication().authenticate(request)
+
+    def test_hit_returns_token_like_miss(self):
+        with self.assertNumQueries(1):
+            user, auth = self.authenticate()
+        self.assertIsInstance(auth, Token)
+
+        with self.assertNumQueries(0):
+            cached_user, cached_auth = self.authenticate()
+        self.assertIsInstance(cached_auth, Token)
+        self.assertEqual(cached_auth.key, self.token.key)
+        self.assertEqual(cached_user.pk, self.user.pk)
+        self.assertIs(cached_auth.user, cached_user)
+
+    def test_hits_get_their_own_user(self):
+        self.authenticate()
+        first, _ = self.authenticate()
+        first.username = 'changed'
+        second, _ = self.authenticate()
+        self.assertIsNot(first, second)
+        self.assertEqual(second.username, 'cache')
+
+    def test_entries_expire(self):
+        cache = TokenCache(ttl=10)
+        with mock.patch('users.authentication.time.monotonic', return_value=100):
+            cache.set(self.token.key, self.user, self.token)
+        with mock.patch('users.authentication.time.monotonic', return_value=109):
+            self.assertIsNotNone(cache.get(self.token.key))
+        with mock.patch('users.authentication.time.monotonic', return_value=110):
+            self.assertIsNone(cache.get(self.token.key))
+
+    def test_least_recently_used_evicted(self):
+        cache = TokenCache(maxsize=2)
+        cache.set('a', self.user, self.token)
+        cache.set('b', self.user, self.token)
+        cache.get('a')
+        cache.set('c', self.user, self.token)
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_logout_revokes(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(client.get('/api/user').status_code, 200)
+        self.assertIsNotNone(token_cache.get(self.token.key))
+
+        self.assertEqual(client.post('/api/logout').status_code, 200)
+        self.assertIsNone(token_cache.get(self.token.key))
+        with self.assertLogs('django.request', level='WARNING'):
+            self.assertEqual(client.get('/api/user').status_code, 401)
+
+    def test_token_delete_revokes(self):
+        self.authenticate()
+        self.token.delete()
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_user_save_revokes(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(token_cache.get(self.token.key))
+
+
+class LoginTests(TestCase):
+    def test_failed_login_logged_without_address(self):
+        with self.assertLogs('users.views', level='INFO') as logs, \
+                self.assertLogs('django.request', level='WARNING'):
+            response = APIClient().post('/api/login', {'email': 'Nobody@example.com', 'password': 'wrong'})
+        self.assertEqual(response.status_code, 401)
+        record = logs.records[0]
+        self.assertEqual((record.levelname, record.event), ('INFO', 'login.failed'))
+        self.assertNotIn('nobody', str(vars(record)).lower())
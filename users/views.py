@@ -1,24 +1,29 @@
+import hashlib
+import logging
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.authtoken.models import Token
 from .serializers import UserSerializer
 from django.contrib.auth import authenticate
 from rest_framework.permissions import AllowAny
 from rest_framework.permissions import IsAuthenticated
 
 
+logger = logging.getLogger(__name__)
+
+
 class RegisterView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
-        print("Received registration request with data:", request.data)
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
-            print("Registration successful:", serializer.data)
+            user = serializer.save()
+            logger.info("User registered", extra={'event': 'register.success', 'user_id': user.pk})
             return Response(serializer.data, status=201)
         else:
-            print("Registration failed with errors:", serializer.errors)
+            logger.info("Registration failed", extra={'event': 'register.failed', 'errors': serializer.errors})
             return Response(serializer.errors, status=400)
 
 
@@ -27,30 +32,29 @@ class LoginView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
-        # Log request details
-        print("Login request received")
-        print(f"Email: {request.data.get('email')}")
-        print(f"Password length: {len(request.data.get('password', ''))}")  # Avoid printing actual password
-
         email = request.data.get('email')
         password = request.data.get('password')
 
         if not email or not password:
-            print("Missing email or password")
+            logger.info("Login without email or password", extra={'event': 'login.missing_credentials'})
             raise AuthenticationFailed('Email and password are required!')
 
         user = authenticate(username=email, password=password)
 
         if user is None:
-            print(f"Authentication failed for email: {email}")
+            # INFO and no address: anyone can send failed logins, warnings are never sampled
+            email_hash = hashlib.sha256(str(email).strip().lower().encode()).hexdigest()[:16]
+            logger.info("Authentication failed", extra={'event': 'login.failed', 'email_hash': email_hash})
             raise AuthenticationFailed('Invalid credentials')
 
-        # Log successful authentication
-        print(f"User authenticated: {user.username}")
+        # Sampled (settings.LOG_SAMPLE_RATES): one of the busiest events
+        logger.info("User logged in", extra={'event': 'login.success', 'user_id': user.pk})
+
+        # Issue the token used to authenticate the following requests
+        token, _ = Token.objects.get_or_create(user=user)
 
         serializer = UserSerializer(user)
-        response_data = serializer.data
-        print(f"Login response data: {response_data}")
+        response_data = dict(serializer.data, token=token.key)
 
         return Response(response_data)
 
@@ -60,7 +64,7 @@ class UserView(APIView):
     permission_classes = [IsAuthenticated]  # Ensure the user is authenticated
 
     def get(self, request):
-        # With Basic Authentication, `request.user` will automatically be populated
+        # With Token (or Basic) Authentication, `request.user` will automatically be populated
         user = request.user  # Get the authenticated user
 
         serializer = UserSerializer(user)
@@ -72,17 +76,15 @@ class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        print(f"Logout request received from user: {request.user.username}")
-
         try:
-            if hasattr(request.user, 'auth_token'):
+            has_token = hasattr(request.user, 'auth_token')
+            if has_token:
                 request.user.auth_token.delete()
-                print(f"Auth token deleted for user: {request.user.username}")
-            else:
-                print(f"No auth token found for user: {request.user.username}")
         except Exception as e:
-            print(f"Error during logout: {e}")
+            logger.exception("Logout failed", extra={'event': 'logout.failed', 'user_id': request.user.pk})
             return Response({'error': str(e)}, status=500)
 
+        logger.info("User logged out", extra={'event': 'logout', 'user_id': request.user.pk, 'had_token': has_token})
+
         return Response({'message': 'Successfully logged out'})
 